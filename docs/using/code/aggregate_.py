@@ -0,0 +1,6 @@
+ds = open_dataset(dataset, aggregate={"frequency": "1d", "method": "mean"})
+
+# Same as above
+ds = open_dataset(dataset, aggregate="1d")
+
+ds = open_dataset(dataset, aggregate={"frequency": "7d", "method": "max"})
@@ -0,0 +1,4 @@
+ds = open_dataset(dataset, start=2020, end=2020)
+
+ds.statistics  # Statistics of the period used when the dataset was built
+ds.exact_statistics  # Statistics of 2020
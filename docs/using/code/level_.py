@@ -0,0 +1 @@
+ds = open_dataset(dataset, level=2)
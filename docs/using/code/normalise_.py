@@ -0,0 +1,11 @@
+ds = open_dataset(
+    dataset,
+    normalise={
+        "default": "mean-std",
+        "tp": "max",
+        "lsm": "none",
+    },
+)
+
+values = ds[0]
+original = ds.denormalise(values)
@@ -0,0 +1,14 @@
+from anemoi.datasets.data.server import SampleClient
+from anemoi.datasets.data.server import SampleServer
+
+# In one process of the node
+server = SampleServer(open_dataset(dataset), "era5", slots=64).start()
+
+# In each reader, e.g. in the DataLoader workers
+client = SampleClient("era5")
+
+with client.batch([10, 11, 12, 13]) as samples:
+    batch = np.stack(samples)
+
+# When done
+server.stop()
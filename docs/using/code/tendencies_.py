@@ -0,0 +1,4 @@
+# With a dataset with a frequency of 6 hours
+ds = open_dataset(dataset, tendencies="12h")
+
+# ds[i] is equal to x[i + 2] - x[i], where x = open_dataset(dataset)
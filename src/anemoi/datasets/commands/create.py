@@ -119,9 +119,10 @@ class Create(Command):
 
         parallel = threads + processes
         with ExecutorClass(max_workers=parallel) as executor:
-            for n in range(total):
+            # Each worker loads the next group of dates not claimed by the others
+            for n in range(min(parallel, total)):
                 opt = options.copy()
-                opt["parts"] = f"{n+1}/{total}"
+                opt["worker"] = True
                 futures.append(executor.submit(task, "load", opt))
 
             for future in tqdm.tqdm(
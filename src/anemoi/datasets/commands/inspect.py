@@ -270,6 +270,11 @@ class Version:
     def build_lengths(self):
         return self.zarr.get("_build_lengths")
 
+    @property
+    def latest_write(self):
+        latest_write_timestamp = self.zarr.attrs.get("latest_write_timestamp")
+        return datetime.datetime.fromisoformat(latest_write_timestamp) if latest_write_timestamp else None
+
     def progress(self):
         if self.copy_in_progress:
             copy_flags = self.copy_flags
@@ -293,8 +298,7 @@ class Version:
         build_lengths = self.build_lengths
         assert build_flags.size == build_lengths.size
 
-        latest_write_timestamp = self.zarr.attrs.get("latest_write_timestamp")
-        latest = datetime.datetime.fromisoformat(latest_write_timestamp) if latest_write_timestamp else None
+        latest = self.latest_write
 
         if not all(build_flags):
             if latest:
@@ -537,12 +541,32 @@ class Version0_12(Version0_6):
 
 
 class Version0_13(Version0_12):
+    @property
+    def build_markers(self):
+        """The marker files of the groups of dates loaded, while the dataset is being loaded."""
+        path = os.path.join(self.path, "_build", "done")
+        if not os.path.isdir(path):
+            return None
+        return {name: os.path.join(path, name) for name in os.listdir(path) if not name.startswith(".")}
+
     @property
     def build_flags(self):
         if "_build" not in self.zarr:
             return None
         build = self.zarr["_build"]
-        return build.get("flags")
+        flags = build.get("flags")
+        markers = self.build_markers
+        if flags is None or markers is None:
+            return flags
+        return np.array([str(i) in markers for i in range(flags.size)])
+
+    @property
+    def latest_write(self):
+        markers = self.build_markers
+        if not markers:
+            return super().latest_write
+        latest = max(os.path.getmtime(path) for path in markers.values())
+        return datetime.datetime.fromtimestamp(latest, datetime.timezone.utc).replace(tzinfo=None)
 
     @property
     def build_lengths(self):
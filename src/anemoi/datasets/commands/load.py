@@ -28,6 +28,11 @@ class Load(Command):
     def add_arguments(self, subparser):
 
         subparser.add_argument("--parts", nargs="+", help="Only load the specified parts of the dataset.")
+        subparser.add_argument(
+            "--worker",
+            action="store_true",
+            help="Load the groups of dates not claimed by other workers, until all of them are loaded.",
+        )
         # subparser.add_argument(
         #        "--delta",
         #        help="Compute statistics tendencies on a given time delta, if possible. Must be a multiple of the frequency.",
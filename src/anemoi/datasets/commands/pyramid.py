@@ -0,0 +1,56 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import logging
+import time
+
+from anemoi.utils.humanize import seconds_to_human
+
+from anemoi.datasets.commands.create import task
+
+from . import Command
+
+LOG = logging.getLogger(__name__)
+
+
+class Pyramid(Command):
+    """Add coarsened copies of the data to a dataset."""
+
+    internal = True
+    timestamp = True
+
+    def add_arguments(self, command_parser):
+        command_parser.add_argument(
+            "--levels",
+            help="Levels of the pyramid to build. Level n averages the grid over cells 2**n times larger.",
+            nargs="+",
+            type=int,
+            required=True,
+        )
+        command_parser.add_argument("path", help="Path of the dataset.")
+        command_parser.add_argument("--trace", action="store_true")
+
+    def run(self, args):
+        options = vars(args)
+        options.pop("command")
+        now = time.time()
+        step = "pyramid"
+
+        if "version" in options:
+            options.pop("version")
+
+        if "debug" in options:
+            options.pop("debug")
+
+        task(step, options)
+
+        LOG.info(f"Create step '{step}' completed in {seconds_to_human(time.time()-now)}")
+
+
+command = Pyramid
@@ -23,6 +23,7 @@ from anemoi.utils.dates import as_datetime
 from anemoi.utils.dates import frequency_to_string
 from anemoi.utils.dates import frequency_to_timedelta
 from anemoi.utils.humanize import compress_dates
+from anemoi.utils.humanize import human_to_bytes
 from anemoi.utils.humanize import seconds_to_human
 from anemoi.utils.sanitise import sanitise
 from earthkit.data.core.order import build_remapping
@@ -36,24 +37,33 @@ from anemoi.datasets.data.misc import as_last_date
 from anemoi.datasets.dates.groups import Groups
 
 from .check import DatasetName
-from .check import check_data_values
 from .chunks import ChunkFilter
 from .config import build_output
 from .config import loader_config
 from .input import build_input
+from .leases import Leases
+from .pipeline import Pipeline
+from .pipeline import Stage
 from .statistics import Summary
 from .statistics import TmpStatistics
 from .statistics import check_variance
 from .statistics import compute_statistics
 from .statistics import default_statistics_dates
 from .statistics import fix_variance
+from .statistics.tendencies import Tendencies
+from .statistics.tendencies import tendencies_name
 from .utils import normalize_and_check_dates
 from .writer import ViewCacheArray
+from .writer import chunk_aligned_blocks
+from .writer import contiguous_runs
 
 LOG = logging.getLogger(__name__)
 
 VERSION = "0.30"
 
+# Maximum size of the blocks of dates read by `load-additions`
+ADDITIONS_BLOCK_BYTES = 256 * 1024 * 1024
+
 
 def json_tidy(o):
 
@@ -202,6 +212,12 @@ class WritableDataset(Dataset):
 
         return zarr.open(self.path, mode="r+")["data"]
 
+    def synchronized_data_array(self, synchronizer):
+        """The data array, with a lock on each chunk, for groups of dates that share chunks."""
+        import zarr
+
+        return zarr.open(self.path, mode="r+", synchronizer=synchronizer)["data"]
+
 
 class NewDataset(Dataset):
     def __init__(self, path, overwrite=False):
@@ -311,6 +327,10 @@ class HasStatisticTempMixin:
         directory = self.statistics_temp_dir or os.path.join(self.path + ".storage_for_statistics.tmp")
         return TmpStatistics(directory)
 
+    def tmp_tendencies(self, delta):
+        """The statistics of each date of the tendencies over `delta`, next to those of the data."""
+        return TmpStatistics(f"{self.tmp_statistics.dirname}_tendencies_{frequency_to_string(delta)}")
+
 
 class HasElementForDataMixin:
     def create_elements(self, config):
@@ -320,7 +340,8 @@ class HasElementForDataMixin:
 
         LOG.info(dict(config.dates))
 
-        self.groups = Groups(**config.dates)
+        # Groups of dates are aligned with the chunks, so that they never write to the same chunk
+        self.groups = Groups(**config.dates, chunk=config.output.chunking.get("dates"))
         LOG.info(self.groups)
 
         self.output = build_output(config.output, parent=self)
@@ -433,6 +454,7 @@ class Init(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
 
         chunks = self.output.get_chunking(coords)
         LOG.info(f"{chunks=}")
+        aligned = self.check_groups_alignment(chunks[0])
         dtype = self.output.dtype
 
         LOG.info(f"Creating Dataset '{self.path}', with {total_shape=}, {chunks=} and {dtype=}")
@@ -523,8 +545,15 @@ class Init(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         self.dataset.add_dataset(name="latitudes", array=grid_points[0], dimensions=("cell",))
         self.dataset.add_dataset(name="longitudes", array=grid_points[1], dimensions=("cell",))
 
-        self.registry.create(lengths=lengths)
-        self.tmp_statistics.create(exist_ok=False)
+        tendencies = self.tendencies_deltas(frequency)
+        self.registry.create(lengths=lengths, aligned=aligned, tendencies=tendencies)
+        # The groups of dates write their statistics concurrently, without locking
+        statistics_chunk = self.groups.largest_aligned_chunk()
+        self.tmp_statistics.create(dates, variables, chunk=statistics_chunk, exist_ok=False)
+        for delta in tendencies:
+            tmp = self.tmp_tendencies(frequency_to_timedelta(delta))
+            tmp.delete()
+            tmp.create(dates, variables, chunk=statistics_chunk, exist_ok=False)
         self.registry.add_to_history("tmp_statistics_initialised", version=self.tmp_statistics.version)
 
         statistics_start, statistics_end = build_statistics_dates(
@@ -542,16 +571,60 @@ class Init(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         # Return the number of groups to process, so we can show a nice progress bar
         return len(lengths)
 
+    def check_groups_alignment(self, chunk):
+        """Return True if no chunk of the dataset is written by more than one group of dates,
+        so that the groups can be loaded in parallel without locking the chunks.
+        """
+        shared = self.groups.shared_chunks(chunk)
+        if not shared:
+            LOG.info(f"Groups of dates are aligned with the chunks of {chunk} dates")
+            return True
+
+        LOG.warning(
+            f"{len(shared)} chunks of {chunk} dates are shared by several groups of dates"
+            f" (group_by={self.main_config.build.group_by!r}, chunking.dates={chunk})."
+            " Writing these chunks requires locking them, which is slow, and the 'write' stage"
+            " of the pipeline will use a single thread. The groups can only be aligned with"
+            " the chunks if they are made of consecutive dates: use 'group_by: auto',"
+            " or a number of dates that is a multiple of the chunking of the dates."
+        )
+        return False
+
+    def tendencies_deltas(self, frequency):
+        """The deltas of the tendencies whose statistics are computed while loading, see `statistics.tendencies`."""
+        deltas = []
+        for delta in self.main_config.statistics.get("tendencies", []):
+            delta = frequency_to_timedelta(delta)
+            if delta.total_seconds() % frequency.total_seconds():
+                raise ValueError(
+                    f"statistics.tendencies: {frequency_to_string(delta)} is not a multiple"
+                    f" of the frequency {frequency_to_string(frequency)}"
+                )
+            deltas.append(frequency_to_string(delta))
+        if deltas:
+            LOG.info(f"Statistics of the tendencies will be computed for {deltas}")
+        return deltas
+
 
 class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixin):
     def __init__(
-        self, path, parts=None, use_threads=False, statistics_temp_dir=None, progress=None, cache=None, **kwargs
+        self,
+        path,
+        parts=None,
+        worker=False,
+        use_threads=False,
+        statistics_temp_dir=None,
+        progress=None,
+        cache=None,
+        **kwargs,
     ):
         super().__init__(path, cache=cache)
         self.use_threads = use_threads
         self.statistics_temp_dir = statistics_temp_dir
         self.progress = progress
         self.parts = parts
+        self.worker = worker
+        self.leases = None
         self.dataset = WritableDataset(self.path)
 
         self.main_config = self.dataset.get_main_config()
@@ -561,54 +634,173 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         total = len(self.registry.get_flags())
         self.chunk_filter = ChunkFilter(parts=self.parts, total=total)
 
-        self.data_array = self.dataset.data_array
+        # Groups of dates that share chunks must lock them while writing
+        self.aligned = self.registry.aligned()
+        if self.aligned:
+            self.data_array = self.dataset.data_array
+        else:
+            self.data_array = self.dataset.synchronized_data_array(self.registry.synchronizer)
         self.n_groups = len(self.groups)
 
+        self.tendencies = [
+            Tendencies(
+                self.tmp_tendencies(frequency_to_timedelta(delta)),
+                frequency_to_timedelta(delta),
+                self.groups.provider.frequency,
+                self.variables_names,
+                allow_nans=self._get_allow_nans(),
+                threads=self.statistics_threads,
+            )
+            for delta in self.registry.tendencies()
+        ]
+
     def run(self):
         with self._cache_context():
             self._run()
 
     def _run(self):
+        if self.worker:
+            # Groups are claimed one at a time from a queue shared by all the workers
+            with Leases(self.path) as self.leases:
+                self.pipeline(self.claim_groups)
+        else:
+            self.pipeline(self.todo_groups)
+
+        self.registry.add_provenance(name="provenance_load")
+        self.tmp_statistics.add_provenance(name="provenance_load", config=self.main_config)
+
+        self.dataset.print_info()
+
+    def todo_groups(self, stop):
+        """The groups of the parts to load, that have not been loaded yet."""
+        todo = []
         for igroup, group in enumerate(self.groups):
             if not self.chunk_filter(igroup):
                 continue
             if self.registry.get_flag(igroup):
                 LOG.info(f" -> Skipping {igroup} total={len(self.groups)} (already done)")
                 continue
+            todo.append((igroup, group))
+        return todo
+
+    def claim_groups(self, stop):
+        """Claim the groups that have not been loaded yet, as the pipeline needs them. When
+        all of them are claimed, wait for the other workers to finish, or for their leases to
+        expire if they have died. Stop claiming groups when `stop` is set, because the
+        pipeline has failed.
+        """
+        groups = list(self.groups)
+        while not stop.is_set():
+            flags = self.registry.get_flags()
+            if all(flags):
+                return
+
+            igroup = self.leases.claim(i for i, flag in enumerate(flags) if not flag)
+            if igroup is None:
+                stop.wait(min(10, self.leases.timeout / 10))
+                continue
+
+            LOG.info(f"Claimed group {igroup} total={len(groups)}")
+            yield igroup, groups[igroup]
+
+    def pipeline(self, groups):
+        """Fetch, decode and write the groups returned by `groups`, a function called with the
+        event set when the pipeline fails. If enabled in the recipe, the three stages run
+        concurrently: a group is fetched while the previous one is decoded and the one before
+        is written. Otherwise, the groups are processed one after the other.
+        """
+        options = self.main_config.build.pipeline
+        concurrent = options is True or isinstance(options, dict)
+        if not isinstance(options, dict):
+            options = {}
+
+        writers = options.get("write", 1)
+        if writers > 1 and not self.aligned:
+            LOG.warning("The groups of dates are not aligned with the chunks, using a single 'write' thread")
+            writers = 1
+
+        pipeline = Pipeline(
+            [
+                Stage("fetch", self.fetch_group, workers=options.get("fetch", 1)),
+                Stage("decode", self.decode_group, workers=options.get("decode", 1)),
+                Stage("write", self.write_group, workers=writers),
+            ],
+            queue_size=options.get("queue", 1),
+            memory=human_to_bytes(options["memory"]) if options.get("memory") else None,
+            size=self.group_size,
+            failed=self.release_group,
+        )
 
-            # assert isinstance(group[0], datetime.datetime), type(group[0])
-            LOG.debug(f"Building data for group {igroup}/{self.n_groups}")
+        if not concurrent:
+            pipeline.run_sequentially(groups(pipeline.stop))
+            return
 
-            result = self.input.select(group_of_dates=group)
-            assert result.group_of_dates == group, (len(result.group_of_dates), len(group), group)
+        LOG.debug(f"Loading groups with {pipeline.stages}")
+        pipeline.run(groups(pipeline.stop))
 
-            # There are several groups.
-            # There is one result to load for each group.
-            self.load_result(result)
-            self.registry.set_flag(igroup)
+    def release_group(self, item):
+        """Release the lease of a group that failed to load, so that another worker can retry it."""
+        igroup, _ = item
+        if self.leases is not None:
+            LOG.warning(f"Failed to load group {igroup}, releasing it")
+            self.leases.release(igroup)
 
-        self.registry.add_provenance(name="provenance_load")
-        self.tmp_statistics.add_provenance(name="provenance_load", config=self.main_config)
+    def group_size(self, item):
+        """The number of bytes of the decoded fields of a group."""
+        _, group = item
+        return len(group) * int(np.prod(self.data_array.shape[1:])) * self.data_array.dtype.itemsize
 
-        self.dataset.print_info()
+    def fetch_group(self, item):
+        igroup, group = item
+
+        # assert isinstance(group[0], datetime.datetime), type(group[0])
+        LOG.debug(f"Building data for group {igroup}/{self.n_groups}")
 
-    def load_result(self, result):
-        # There is one cube to load for each result.
+        result = self.input.select(group_of_dates=group)
+        assert result.group_of_dates == group, (len(result.group_of_dates), len(group), group)
+
+        # There are several groups.
+        # There is one result to load for each group.
+        return igroup, result, result.get_placement()
+
+    def decode_group(self, item):
+        igroup, result, placement = item
+        return (igroup,) + self.decode_result(result, placement)
+
+    def write_group(self, item):
+        igroup, array, indexes, stats, dates, tendencies = item
+        if self.leases is not None and self.registry.get_flag(igroup):
+            # Loaded by another worker after our lease expired
+            LOG.warning(f"Group {igroup} already loaded by another worker, skipping")
+            self.leases.release(igroup)
+            return
+
+        self.tmp_statistics.write(indexes, stats, dates=dates)
+        for t, result in zip(self.tendencies, tendencies):
+            if result is not None:
+                positions, tendencies_stats = result
+                t.tmp_statistics.write(positions, tendencies_stats, dates=self.dates[positions])
+        array.flush()
+        self.registry.set_flag(igroup)
+        if self.leases is not None:
+            self.leases.release(igroup)
+
+    def decode_result(self, result, placement):
+        # There is one placement of the fields to load for each result.
         dates = list(result.group_of_dates)
 
-        cube = result.get_cube()
-        shape = cube.extended_user_shape
-        dates_in_data = cube.user_coords["valid_datetime"]
+        shape = placement.extended_user_shape
+        dates_in_data = placement.user_coords["valid_datetime"]
 
         LOG.debug(f"Loading {shape=} in {self.data_array.shape=}")
 
-        def check_shape(cube, dates, dates_in_data):
-            if cube.extended_user_shape[0] != len(dates):
+        def check_shape(placement, dates, dates_in_data):
+            if placement.extended_user_shape[0] != len(dates):
                 print(
-                    f"Cube shape does not match the number of dates got {cube.extended_user_shape[0]}, expected {len(dates)}"
+                    f"Data shape does not match the number of dates got {placement.extended_user_shape[0]}, expected {len(dates)}"
                 )
                 print("Requested dates", compress_dates(dates))
-                print("Cube dates", compress_dates(dates_in_data))
+                print("Data dates", compress_dates(dates_in_data))
 
                 a = set(as_datetime(_) for _ in dates)
                 b = set(as_datetime(_) for _ in dates_in_data)
@@ -617,10 +809,10 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
                 print("Extra dates", compress_dates(b - a))
 
                 raise ValueError(
-                    f"Cube shape does not match the number of dates got {cube.extended_user_shape[0]}, expected {len(dates)}"
+                    f"Data shape does not match the number of dates got {placement.extended_user_shape[0]}, expected {len(dates)}"
                 )
 
-        check_shape(cube, dates, dates_in_data)
+        check_shape(placement, dates, dates_in_data)
 
         def check_dates_in_data(dates_in_data, requested_dates):
             requested_dates = [np.datetime64(_) for _ in requested_dates]
@@ -633,6 +825,12 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
 
         check_dates_in_data(dates_in_data, dates)
 
+        variables_in_data = list(placement.user_coords.values())[1]
+        if list(variables_in_data) != list(self.variables_names):
+            raise ValueError(
+                f"Variables in data are not those of the dataset: {list(variables_in_data)} != {self.variables_names}"
+            )
+
         def dates_to_indexes(dates, all_dates):
             x = np.array(dates, dtype=np.datetime64)
             y = np.array(all_dates, dtype=np.datetime64)
@@ -642,12 +840,42 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
         indexes = dates_to_indexes(self.dates, dates_in_data)
 
         array = ViewCacheArray(self.data_array, shape=shape, indexes=indexes)
-        self.load_cube(cube, array)
+        self.load_fields(placement, array)
+
+        # The fields are checked when computing the statistics, in a single pass over the values
+        stats = compute_statistics(
+            array.cache,
+            self.variables_names,
+            allow_nans=self._get_allow_nans(),
+            threads=self.statistics_threads,
+            check_fields=True,
+        )
 
-        stats = compute_statistics(array.cache, self.variables_names, allow_nans=self._get_allow_nans())
-        self.tmp_statistics.write(indexes, stats, dates=dates_in_data)
+        # The tendencies are computed while the values of the group are in memory
+        tendencies = [t.compute(array.cache, indexes, read=self.read_written_date) for t in self.tendencies]
 
-        array.flush()
+        return array, indexes, stats, dates_in_data, tendencies
+
+    @cached_property
+    def groups_of_dates(self):
+        """The index of the group of each date of the dataset, -1 for the missing dates."""
+        lengths = self.registry.get_lengths()
+        result = np.full(len(self.dates), -1)
+        missing = np.array(self.missing_dates, dtype=self.dates.dtype)
+        result[~np.isin(self.dates, missing)] = np.repeat(np.arange(len(lengths)), lengths)
+        return result
+
+    def read_written_date(self, i):
+        """Return the values of the `i`-th date of the dataset if its group has already been written."""
+        igroup = self.groups_of_dates[i]
+        if igroup < 0 or not self.registry.get_flag(igroup):
+            return None
+        return self.data_array[i]
+
+    @property
+    def statistics_threads(self):
+        options = self.main_config.build.pipeline
+        return options.get("statistics", 1) if isinstance(options, dict) else 1
 
     def _get_allow_nans(self):
         config = self.main_config
@@ -656,15 +884,14 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
 
         return config.statistics.get("allow_nans", [])
 
-    def load_cube(self, cube, array):
-        # There are several cubelets for each cube
+    def load_fields(self, placement, array):
+        # The fields are decoded in the order of the source and written straight to their slot
         start = time.time()
         load = 0
         save = 0
 
-        reading_chunks = None
-        total = cube.count(reading_chunks)
-        LOG.debug(f"Loading datacube: {cube}")
+        total = len(placement)
+        LOG.debug(f"Loading fields: {placement}")
 
         def position(x):
             if isinstance(x, str) and "/" in x:
@@ -673,27 +900,18 @@ class Load(Actor, HasRegistryMixin, HasStatisticTempMixin, HasElementForDataMixi
             return None
 
         bar = tqdm.tqdm(
-            iterable=cube.iterate_cubelets(reading_chunks),
+            iterable=placement,
             total=total,
-            desc=f"Loading datacube {cube}",
+            desc=f"Loading fields {placement}",
             position=position(self.parts),
         )
-        for i, cubelet in enumerate(bar):
+        for i, (local_indexes, field) in enumerate(bar):
             bar.set_description(f"Loading {i}/{total}")
 
             now = time.time()
-            data = cubelet.to_numpy()
-            local_indexes = cubelet.coords
+            data = field.to_numpy(flatten=placement.flatten_values)
             load += time.time() - now
 
-            name = self.variables_names[local_indexes[1]]
-            check_data_values(
-                data[:],
-                name=name,
-                log=[i, data.shape, local_indexes],
-                allow_nans=self._get_allow_nans(),
-            )
-
             now = time.time()
             array[local_indexes] = data
             save += time.time() - now
@@ -720,6 +938,8 @@ class Cleanup(Actor, HasRegistryMixin, HasStatisticTempMixin):
 
     def run(self):
         self.tmp_statistics.delete()
+        for delta in self.registry.tendencies():
+            self.tmp_tendencies(frequency_to_timedelta(delta)).delete()
         self.registry.clean()
         for actor in self.actors:
             actor.cleanup()
@@ -766,6 +986,9 @@ class AdditionsMixin:
         idelta = int(idelta)
         self.ds = DeltaDataset(ds, idelta)
 
+        # Position of the first date in the dataset, to align the blocks of dates with its chunks
+        self.offset = int(np.searchsorted(self.dataset.anemoi_dataset.dates, np.datetime64(self.start)))
+
 
 class DeltaDataset:
     def __init__(self, ds, idelta):
@@ -778,6 +1001,27 @@ class DeltaDataset:
             raise MissingDateError(f"Missing date {j}")
         return self.ds[i : i + 1, ...] - self.ds[j : j + 1, ...]
 
+    def read(self, start, stop):
+        """Return the differences of the dates from `start` to `stop`, reading each date once."""
+        if start < self.idelta:
+            raise MissingDateError(f"Missing date {start - self.idelta}")
+        values = self.ds[start - self.idelta : stop]
+        return values[self.idelta :] - values[: len(values) - self.idelta]
+
+    def runs(self, start, stop):
+        """Split the dates from `start` to `stop` into runs whose differences can be read at
+        once, returned as (start, stop, True) tuples, and single dates that need a date which
+        is missing, returned as (i, i + 1, False) tuples.
+        """
+        blocked = set(range(min(self.idelta, stop)))
+        for m in self.ds.missing:
+            blocked.update(range(m, m + self.idelta + 1))
+
+        readable = [i for i in range(start, stop) if i not in blocked]
+        runs = [(a, b, True) for _, a, b in contiguous_runs(readable)]
+        runs += [(i, i + 1, False) for i in range(start, stop) if i in blocked]
+        return sorted(runs)
+
 
 class _InitAdditions(Actor, HasRegistryMixin, AdditionsMixin):
     def __init__(self, path, delta, use_threads=False, progress=None, **kwargs):
@@ -821,19 +1065,38 @@ class _RunAdditions(Actor, HasRegistryMixin, AdditionsMixin):
         self.read_from_dataset()
 
         chunk_filter = ChunkFilter(parts=self.parts, total=self.total)
-        for i in range(0, self.total):
-            if not chunk_filter(i):
-                continue
-            date = self.dates[i]
-            try:
-                arr = self.ds[i]
-                stats = compute_statistics(arr, self.variables, allow_nans=self.allow_nans)
-                self.tmp_storage.add([date, i, stats], key=date)
-            except MissingDateError:
-                self.tmp_storage.add([date, i, "missing"], key=date)
+        indexes = [i for i in range(0, self.total) if chunk_filter(i)]
+        for _, start, stop in contiguous_runs(indexes):
+            for a, b, _ in chunk_aligned_blocks(start + self.offset, stop + self.offset, self.block_size):
+                self.run_block(a - self.offset, b - self.offset)
         self.tmp_storage.flush()
         LOG.debug(f"Dataset {self.path} additions run.")
 
+    @cached_property
+    def block_size(self):
+        """The number of dates read at once, a multiple of the chunking of the dates."""
+        chunk = self.dataset.get_zarr_chunks()[0]
+        size = int(np.prod(self.ds.ds.shape[1:])) * self.ds.ds.dtype.itemsize
+        return max(1, ADDITIONS_BLOCK_BYTES // (size * chunk)) * chunk
+
+    def run_block(self, start, stop):
+        """Compute the statistics of the differences of the dates from `start` to `stop`."""
+        for a, b, readable in self.ds.runs(start, stop):
+            if not readable:
+                date = self.dates[a]
+                try:
+                    arr = self.ds[a]
+                    stats = compute_statistics(arr, self.variables, allow_nans=self.allow_nans)
+                    self.tmp_storage.add([date, a, stats], key=date)
+                except MissingDateError:
+                    self.tmp_storage.add([date, a, "missing"], key=date)
+                continue
+
+            stats = compute_statistics(self.ds.read(a, b), self.variables, allow_nans=self.allow_nans)
+            for n, i in enumerate(range(a, b)):
+                date = self.dates[i]
+                self.tmp_storage.add([date, i, {k: v[n : n + 1] for k, v in stats.items()}], key=date)
+
     def allow_nans(self):
         if self.dataset.anemoi_dataset.metadata.get("allow_nans", False):
             return True
@@ -1014,13 +1277,51 @@ class Statistics(Actor, HasStatisticTempMixin, HasRegistryMixin):
 
         if not all(self.registry.get_flags(sync=False)):
             raise Exception(f"❗Zarr {self.path} is not fully built, not writing statistics into dataset.")
+        self.registry.consolidate()
 
         for k in ["mean", "stdev", "minimum", "maximum", "sums", "squares", "count", "has_nans"]:
             self.dataset.add_dataset(name=k, array=stats[k], dimensions=("variable",))
 
+        # Keep the statistics of each date, so that exact statistics can be computed for any subset of dates
+        partial = self.tmp_statistics.get_per_date(self.dataset.anemoi_dataset.dates, variables)
+        for k, v in partial.items():
+            self.dataset.add_dataset(name=f"partial_{k}", array=v, dimensions=("time", "variable"))
+
         self.registry.add_to_history("compute_statistics_end")
         LOG.info(f"Wrote statistics in {self.path}")
 
+        for delta in self.registry.tendencies():
+            self.write_tendencies(frequency_to_timedelta(delta), start, end)
+
+    def write_tendencies(self, delta, start, end):
+        """Aggregate the statistics of the tendencies over `delta` computed while loading."""
+        ds = self.dataset.anemoi_dataset
+        tendencies = Tendencies(
+            self.tmp_tendencies(delta),
+            delta,
+            frequency_to_timedelta(ds.frequency),
+            ds.variables,
+            allow_nans=self.allow_nans,
+        )
+
+        positions = tendencies.positions(ds.dates, start, end, ds.missing)
+        if len(positions) < 2:
+            LOG.warning(f"Not enough dates to compute the statistics of {tendencies}. Skipped.")
+            return
+
+        # Dates whose earlier date was not written yet when they were loaded
+        tendencies.complete(ds, positions)
+
+        stats = tendencies.tmp_statistics.get_aggregated(ds.dates[positions], ds.variables, self.allow_nans)
+        LOG.info(stats)
+
+        name = tendencies_name(delta)
+        for k in ["mean", "stdev", "minimum", "maximum", "sums", "squares", "count", "has_nans"]:
+            self.dataset.add_dataset(name=f"{name}_{k}", array=stats[k], dimensions=("variable",))
+
+        self.registry.add_to_history("compute_statistics_tendencies_end", delta=frequency_to_string(delta))
+        LOG.info(f"Wrote statistics of {tendencies} in {self.path}")
+
     @cached_property
     def allow_nans(self):
         import zarr
@@ -1036,6 +1337,37 @@ class Statistics(Actor, HasStatisticTempMixin, HasRegistryMixin):
         return True
 
 
+class Pyramid(Actor, HasRegistryMixin):
+    def __init__(self, path, levels=None, use_threads=False, progress=None, **kwargs):
+        super().__init__(path)
+        self.levels = [int(level) for level in levels or []]
+        # Used by the registry
+        self.use_threads = use_threads
+        # Wraps the iterable of the chunks written, like tqdm.tqdm
+        self.progress = progress if progress is not None else tqdm.tqdm
+
+    def run(self):
+        import zarr
+
+        from .pyramid import build_pyramid_level
+
+        if not self.levels:
+            LOG.warning("No levels given, no pyramid will be built.")
+            return
+
+        if not all(self.registry.get_flags(sync=False)):
+            raise Exception(f"❗Zarr {self.path} is not fully built, not building the pyramid.")
+
+        z = zarr.open(self.path, mode="r+")
+        for level in self.levels:
+            if level < 1:
+                raise ValueError(f"Pyramid levels must be positive, got {level}")
+            build_pyramid_level(z, level, progress=self.progress)
+
+        self.registry.add_to_history("pyramid_end", levels=self.levels)
+        LOG.info(f"Wrote pyramid levels {self.levels} in {self.path}")
+
+
 def chain(tasks):
     class Chain(Actor):
         def __init__(self, **kwargs):
@@ -1059,6 +1391,7 @@ def creator_factory(name, trace=None, **kwargs):
         load=Load,
         size=Size,
         patch=Patch,
+        pyramid=Pyramid,
         statistics=Statistics,
         finalise=chain([Statistics, Size, Cleanup]),
         cleanup=Cleanup,
@@ -139,11 +139,15 @@ class StatisticsValueError(ValueError):
     pass
 
 
+def _allows_nans(name, allow_nans):
+    return (isinstance(allow_nans, (set, list, tuple, dict)) and name in allow_nans) or allow_nans
+
+
 def check_data_values(arr, *, name: str, log=[], allow_nans=False):
 
     shape = arr.shape
 
-    if (isinstance(allow_nans, (set, list, tuple, dict)) and name in allow_nans) or allow_nans:
+    if _allows_nans(name, allow_nans):
         arr = arr[~np.isnan(arr)]
 
     if arr.size == 0:
@@ -155,6 +159,29 @@ def check_data_values(arr, *, name: str, log=[], allow_nans=False):
     min, max = arr.min(), arr.max()
     assert not (np.isnan(arr).any()), (name, min, max, *log)
 
+    _check_data_range(name, min, max)
+
+
+def check_data_summary(*, name: str, shape, count, minimum, maximum, log=[], allow_nans=False):
+    """Same checks as :func:`check_data_values`, from the number of values that are not NaN
+    and the minimum and maximum of these values, as computed by ``compute_statistics``.
+    """
+
+    size = count if _allows_nans(name, allow_nans) else int(np.prod(shape))
+
+    if size == 0:
+        warnings.warn(f"Empty array for {name} ({shape})")
+        return
+
+    if count < size:
+        # The minimum and maximum of an array with NaNs are NaN
+        raise AssertionError((name, np.nan, np.nan, *log))
+
+    _check_data_range(name, minimum, maximum)
+
+
+def _check_data_range(name, min, max):
+
     if min == 9999.0:
         warnings.warn(f"Min value 9999 for {name}")
 
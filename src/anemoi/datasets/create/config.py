@@ -137,6 +137,9 @@ class LoadersConfig(Config):
         self.build.setdefault("group_by", "monthly")
         self.build.setdefault("use_grib_paramid", False)
         self.build.setdefault("variable_naming", "default")
+        # Set to true, or to the number of threads of each stage, to fetch, decode and write
+        # the groups of dates concurrently
+        self.build.setdefault("pipeline", False)
         variable_naming = dict(
             param="{param}",
             param_levelist="{param}_{levelist}",
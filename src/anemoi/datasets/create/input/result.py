@@ -244,6 +244,78 @@ def _data_request(data):
     return dict(param_level=params_levels, param_step=params_steps, area=area, grid=grid)
 
 
+def _ordered(values, order):
+    """Order the unique `values` of a coordinate as `order_by` would."""
+    if isinstance(order, (list, tuple)):
+        return [v for v in order if v in values] + [v for v in values if v not in order]
+    if order == "ascending":
+        return sorted(values)
+    if order == "descending":
+        return sorted(values, reverse=True)
+    return list(values)
+
+
+class Placement:
+    """The position of each field of a fieldlist in the hypercube described by `order_by`.
+
+    This is an alternative to ``ds.cube(order_by, ...)`` that reads the metadata of each field
+    once and does not sort the fieldlist, so that the fields can be decoded in the order they
+    come from the source and written straight to their slot in the output.
+
+    Raises a ValueError if the fields do not form a full hypercube.
+    """
+
+    def __init__(self, fields, order_by, remapping, patches, flatten_values):
+        self.fields = fields
+        self.flatten_values = flatten_values
+
+        names = list(order_by.keys())
+        remapping = build_remapping(remapping, patches)
+
+        keys = []
+        found = {n: {} for n in names}
+        for f in fields:
+            metadata = remapping(f.metadata)
+            key = tuple(metadata(n, default=None) for n in names)
+            keys.append(key)
+            for n, v in zip(names, key):
+                found[n][v] = True
+
+        self.user_coords = {n: tuple(_ordered(list(found[n]), order_by[n])) for n in names}
+        self.user_shape = tuple(len(v) for v in self.user_coords.values())
+
+        positions = [{v: i for i, v in enumerate(values)} for values in self.user_coords.values()]
+        self.index = [tuple(p[v] for p, v in zip(positions, key)) for key in keys]
+
+        if len(self.index) != math.prod(self.user_shape) or len(set(self.index)) != len(self.index):
+            raise ValueError(
+                f"Shape {self.user_shape} [{math.prod(self.user_shape):,}]"
+                f" does not match number of available fields {len(self.index):,}"
+            )
+
+    @cached_property
+    def field_shape(self):
+        shape = tuple(self.fields[0].shape)
+        if self.flatten_values:
+            shape = (math.prod(shape),)
+        return shape
+
+    @property
+    def extended_user_shape(self):
+        return self.user_shape + self.field_shape
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        """Iterate over the fields, in the order of the source, with their position."""
+        return zip(self.index, self.fields)
+
+    def __str__(self):
+        content = ", ".join([f"{k}:{len(v)}" for k, v in self.user_coords.items()])
+        return f"{self.__class__.__name__}({content} ({len(self)} fields))"
+
+
 class Result:
     empty = False
     _coords_already_built = False
@@ -306,6 +378,32 @@ class Result:
 
         return cube
 
+    def get_placement(self):
+        """Return the :class:`Placement` of the fields of the datasource, without building a cube."""
+        trace("🧊", f"getting placement from {self.__class__.__name__}")
+        ds = self.datasource
+
+        remapping = self.context.remapping
+        order_by = self.context.order_by
+        patches = {"number": {None: 0}}
+        start = time.time()
+        assert order_by, order_by
+
+        try:
+            placement = Placement(
+                ds,
+                order_by,
+                remapping=remapping,
+                patches=patches,
+                flatten_values=self.context.flatten_grid,
+            )
+            LOG.debug(f"Placement done in {seconds_to_human(time.time()-start)}.")
+        except ValueError:
+            self.explain(ds, order_by, remapping=remapping, patches=patches)
+            exit(1)
+
+        return placement
+
     def explain(self, ds, *args, remapping, patches):
 
         METADATA = (
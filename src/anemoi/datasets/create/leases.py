@@ -0,0 +1,155 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""A queue of the groups of dates to load, shared by any number of workers.
+
+A worker claims a group by creating its lease, a file in ``_build/leases`` created with
+``O_EXCL``, so that only one worker can claim it. The worker renews its leases, by updating
+their modification time, while it loads the groups, and releases them when the groups are
+loaded or when it fails. A lease that has not been renewed for `timeout` seconds, because its
+worker has died, has expired: it is renamed, atomically, by the worker that reclaims it. That
+worker then checks that it has renamed the expired lease, and not a lease created by another
+worker that reclaimed it first.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+LOG = logging.getLogger(__name__)
+
+# Number of seconds after which a lease that has not been renewed can be reclaimed
+LEASE_TIMEOUT = 600
+
+
+class Leases:
+    """The leases of the groups of dates of the dataset in `path`, claimed by this worker.
+
+    Use as a context manager, to renew the leases held in the background and to release
+    them on exit.
+    """
+
+    def __init__(self, path, timeout=LEASE_TIMEOUT):
+        self.directory = os.path.join(path, "_build", "leases")
+        self.timeout = timeout
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.held = set()
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, i):
+        return os.path.join(self.directory, str(i))
+
+    def _create(self, i):
+        try:
+            fd = os.open(self._path(i), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.owner)
+        with self.lock:
+            self.held.add(i)
+        return True
+
+    def _expired(self, i):
+        """Return the modification time of the lease of group `i` if it has expired, or None."""
+        try:
+            mtime = os.path.getmtime(self._path(i))
+        except FileNotFoundError:
+            return None
+        return mtime if time.time() - mtime > self.timeout else None
+
+    def _reclaim(self, i):
+        mtime = self._expired(i)
+        if mtime is None:
+            return False
+
+        # Only one worker can rename the expired lease
+        expired = os.path.join(self.directory, f".{i}.{self.owner}.expired")
+        try:
+            os.rename(self._path(i), expired)
+        except FileNotFoundError:
+            return False
+
+        if os.path.getmtime(expired) != mtime:
+            # Another worker has reclaimed the expired lease first, or its owner has renewed
+            # it, since we saw it: put it back, unless a new lease has been created since
+            try:
+                os.link(expired, self._path(i))
+            except FileExistsError:
+                pass
+            os.remove(expired)
+            return False
+
+        os.remove(expired)
+        LOG.warning(f"Lease of group {i} has expired, reclaiming it")
+        return self._create(i)
+
+    def claim(self, candidates):
+        """Claim the first of `candidates` that is not leased, or whose lease has expired.
+        Return its index, or None if all of them are leased.
+        """
+        for i in candidates:
+            if self._create(i) or self._reclaim(i):
+                LOG.debug(f"Claimed group {i} ({self.owner})")
+                return i
+        return None
+
+    def _owned(self, i):
+        try:
+            with open(self._path(i)) as f:
+                return f.read() == self.owner
+        except FileNotFoundError:
+            return False
+
+    def release(self, i):
+        with self.lock:
+            self.held.discard(i)
+        if not self._owned(i):
+            return
+        try:
+            os.remove(self._path(i))
+        except FileNotFoundError:
+            pass
+
+    def renew(self):
+        with self.lock:
+            held = list(self.held)
+        for i in held:
+            if self._owned(i):
+                try:
+                    os.utime(self._path(i))
+                    continue
+                except FileNotFoundError:
+                    pass
+            LOG.warning(f"Lease of group {i} has been reclaimed by another worker")
+            with self.lock:
+                self.held.discard(i)
+
+    def _renew_until_stopped(self):
+        while not self.stop.wait(self.timeout / 4):
+            self.renew()
+
+    def __enter__(self):
+        self.stop.clear()
+        self.thread = threading.Thread(target=self._renew_until_stopped, name="anemoi-datasets-leases", daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop.set()
+        self.thread.join()
+        for i in list(self.held):
+            self.release(i)
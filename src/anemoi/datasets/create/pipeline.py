@@ -0,0 +1,186 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""Run items through a sequence of stages, so that the stages work on different items at the same time.
+
+Each stage runs in its own threads and passes its results to the next stage through a bounded
+queue. When the stages are fetching, decoding and writing, the network, the CPU and the disk
+are kept busy at the same time. An optional memory budget limits the number of items in flight.
+"""
+
+import logging
+import queue
+import threading
+
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+_END = object()
+
+
+class _Budget:
+    """The memory available to the items in flight. An item larger than the budget is let
+    through when nothing else is in flight, so that the pipeline cannot block forever.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.used = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, size, stop):
+        if self.total is None:
+            return
+        with self.condition:
+            while self.used and self.used + size > self.total and not stop.is_set():
+                self.condition.wait(1)
+            self.used += size
+
+    def release(self, size):
+        if self.total is None:
+            return
+        with self.condition:
+            self.used -= size
+            self.condition.notify_all()
+
+
+class Stage:
+    """A stage of a pipeline: `func` is called with the result of the previous stage."""
+
+    def __init__(self, name, func, workers=1):
+        if workers < 1:
+            raise ValueError(f"Stage {name}: workers must be at least 1, got {workers}")
+        self.name = name
+        self.func = func
+        self.workers = workers
+
+    def __repr__(self):
+        return f"Stage({self.name}, workers={self.workers})"
+
+
+class Pipeline:
+    """Run items through `stages`, a list of :class:`Stage`.
+
+    Parameters
+    ----------
+    stages : list of Stage
+        The stages, in order.
+    queue_size : int, optional
+        The number of items that can wait between two stages.
+    memory : int, optional
+        The maximum number of bytes of the items in flight, as estimated by `size`.
+    size : callable, optional
+        Return the estimated number of bytes an item will use while in the pipeline.
+    failed : callable, optional
+        Called with an item as soon as a stage fails on it.
+
+    Attributes
+    ----------
+    stop : threading.Event
+        Set when a stage fails. Sources of items that can wait for a long time should stop
+        waiting when it is set.
+    """
+
+    def __init__(self, stages, queue_size=1, memory=None, size=None, failed=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.memory = memory
+        self.size = size if size is not None else (lambda item: 0)
+        self.failed = failed
+        self.stop = threading.Event()
+
+    def run_sequentially(self, items):
+        for item in items:
+            value = item
+            try:
+                for stage in self.stages:
+                    value = stage.func(value)
+            except Exception:
+                self.stop.set()
+                if self.failed is not None:
+                    self.failed(item)
+                raise
+
+    def run(self, items):
+        """Run all the items through the stages, and raise the first error of any stage."""
+        stop = self.stop
+        stop.clear()
+        errors = []
+        budget = _Budget(self.memory)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        lock = threading.Lock()
+
+        # Floating point error handling is per thread, the workers use that of the caller
+        seterr = np.geterr()
+
+        def fail(e):
+            with lock:
+                errors.append(e)
+            stop.set()
+
+        def worker(i):
+            np.seterr(**seterr)
+            stage = self.stages[i]
+            while True:
+                entry = queues[i].get()
+                if entry is _END:
+                    break
+
+                size, item, value = entry
+                if not stop.is_set():
+                    try:
+                        value = stage.func(value)
+                    except Exception as e:
+                        LOG.exception("Pipeline stage %s failed", stage.name)
+                        fail(e)
+                        if self.failed is not None:
+                            self.failed(item)
+
+                if stop.is_set() or i == len(self.stages) - 1:
+                    # Done with this item, or dropped because of an error
+                    budget.release(size)
+                else:
+                    queues[i + 1].put((size, item, value))
+
+            with lock:
+                remaining[i] -= 1
+                last = remaining[i] == 0
+
+            if last and i + 1 < len(self.stages):
+                for _ in range(self.stages[i + 1].workers):
+                    queues[i + 1].put(_END)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), name=f"anemoi-datasets-{stage.name}-{n}", daemon=True)
+            for i, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                size = self.size(item)
+                budget.acquire(size, stop)
+                queues[0].put((size, item, item))
+        except BaseException as e:
+            fail(e)
+            raise
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_END)
+            for t in threads:
+                t.join()
+
+        if errors:
+            raise errors[0]
@@ -0,0 +1,152 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""Coarsened copies of the data, stored next to it as the levels of a pyramid.
+
+Level ``n`` averages the points of the grid over cells ``2**n`` times larger than the grid
+spacing in each direction. Regular grids are averaged over blocks of ``2**n`` by ``2**n``
+points. Other grids, such as reduced Gaussian grids, are averaged over the cells of a regular
+latitude/longitude grid with the same spacing. The cell of each point is computed once per
+level and stored as ``pyramid_{n}_index``, so that the coarse fields are a weighted sum of the
+fine ones.
+"""
+
+import logging
+
+import numpy as np
+
+from .zarr import add_zarr_dataset
+
+LOG = logging.getLogger(__name__)
+
+
+def _is_regular(field_shape, points):
+    return field_shape is not None and len(field_shape) == 2 and np.prod(field_shape) == points and field_shape[0] > 1
+
+
+def coarsening_index(latitudes, longitudes, level, field_shape=None):
+    """Return, for each point of a grid, the index of its cell at `level`, with the coordinates
+    of the cells and their spacing in degrees.
+
+    Parameters
+    ----------
+    latitudes, longitudes : numpy.ndarray
+        The coordinates of the points of the grid.
+    level : int
+        The level of the pyramid, cells are ``2**level`` times larger than the grid spacing.
+    field_shape : tuple, optional
+        The shape of the fields, for regular grids.
+
+    Returns
+    -------
+    tuple
+        The index of the cell of each point, the latitudes and longitudes of the cells
+        (the mean of the coordinates of their points), and the spacing of the cells.
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    factor = 2**level
+    points = len(latitudes)
+
+    if _is_regular(field_shape, points):
+        rows, cols = np.divmod(np.arange(points), field_shape[1])
+        ncols = -(-field_shape[1] // factor)
+        cells = (rows // factor) * ncols + cols // factor
+        spacing = abs(latitudes[field_shape[1]] - latitudes[0]) * factor
+    else:
+        longitudes = longitudes % 360
+        # Spacing of a regular grid with the same number of points
+        spacing = 180 / np.sqrt(points / 2) * factor
+        nrows = int(np.ceil(180 / spacing))
+        ncols = int(np.ceil(360 / spacing))
+        rows = np.clip(np.floor((90 - latitudes) / spacing), 0, nrows - 1).astype(np.int64)
+        cols = np.clip(np.floor(longitudes / spacing), 0, ncols - 1).astype(np.int64)
+        cells = rows * ncols + cols
+
+    _, index = np.unique(cells, return_inverse=True)
+    index = index.reshape(-1)
+    counts = np.bincount(index)
+
+    return (
+        index,
+        np.bincount(index, weights=latitudes) / counts,
+        np.bincount(index, weights=longitudes) / counts,
+        float(spacing),
+    )
+
+
+class Coarsening:
+    """Average the values of the points of each cell, ignoring NaNs.
+
+    The points are sorted by cell once, so that the averages are computed with a single
+    ``np.add.reduceat`` over the last axis, for any number of fields at once.
+    """
+
+    def __init__(self, index):
+        index = np.asarray(index)
+        self.order = np.argsort(index, kind="stable")
+        self.starts = np.flatnonzero(np.diff(index[self.order], prepend=-1))
+
+    def __call__(self, values):
+        values = values[..., self.order]
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0), self.starts, axis=-1, dtype=np.float64)
+        counts = np.add.reduceat(valid, self.starts, axis=-1, dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+def build_pyramid_level(zarr_root, level, progress=None):
+    """Write level `level` of the pyramid of the dataset in `zarr_root`, opened for writing.
+
+    The data is read and written one chunk of dates at a time.
+    """
+    data = zarr_root["data"]
+    field_shape = zarr_root.attrs.get("field_shape")
+
+    index, latitudes, longitudes, spacing = coarsening_index(
+        zarr_root["latitudes"][:],
+        zarr_root["longitudes"][:],
+        level,
+        field_shape,
+    )
+    coarsen = Coarsening(index)
+
+    name = f"pyramid_{level}"
+    shape = data.shape[:-1] + (len(latitudes),)
+    array = add_zarr_dataset(
+        zarr_root=zarr_root,
+        name=f"{name}_data",
+        shape=shape,
+        dtype=data.dtype,
+        chunks=data.chunks[:-1] + (len(latitudes),),
+        dimensions=("time", "variable", "ensemble", "cell"),
+    )
+    array.attrs["level"] = level
+    array.attrs["resolution"] = f"{spacing:g}"
+
+    if _is_regular(field_shape, len(index)):
+        factor = 2**level
+        array.attrs["field_shape"] = [-(-n // factor) for n in field_shape]
+
+    add_zarr_dataset(zarr_root=zarr_root, name=f"{name}_index", array=index.astype(np.int32), dimensions=("values",))
+    add_zarr_dataset(zarr_root=zarr_root, name=f"{name}_latitudes", array=latitudes, dimensions=("cell",))
+    add_zarr_dataset(zarr_root=zarr_root, name=f"{name}_longitudes", array=longitudes, dimensions=("cell",))
+
+    step = data.chunks[0]
+    starts = range(0, data.shape[0], step)
+    if progress is not None:
+        starts = progress(starts, desc=f"Pyramid level {level}")
+
+    for start in starts:
+        stop = min(start + step, data.shape[0])
+        array[start:stop] = coarsen(data[start:stop]).astype(data.dtype)
+
+    LOG.info(f"Pyramid level {level}: {data.shape[-1]} points coarsened to {len(latitudes)} cells of {spacing:g}°")
+    return array
@@ -8,19 +8,17 @@
 # nor does it submit to any jurisdiction.
 
 import datetime
-import glob
-import hashlib
-import json
 import logging
-import os
-import pickle
 import shutil
-import socket
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from anemoi.utils.provenance import gather_provenance_info
 
+from ..check import check_data_summary
 from ..check import check_data_values
+from ..writer import contiguous_runs
+from ..zarr import add_zarr_dataset
 from .summary import Summary
 
 LOG = logging.getLogger(__name__)
@@ -132,10 +130,43 @@ def check_variance(x, variables_names, minimum, maximum, mean, count, sums, squa
     raise ValueError("Negative variance")
 
 
-def compute_statistics(array, check_variables_names=None, allow_nans=False):
-    """Compute statistics for a given array, provides minimum, maximum, sum, squares, count and has_nans as a dictionary."""
+def _summarise(values, members):
+    """Scan the values of one date, shaped (variables, members * points), in a single vectorised pass.
+
+    Return the number of NaNs, the minimum and the maximum of each field (variable and member),
+    ignoring NaNs, and the sum and sum of squares of each variable. The reductions are the same
+    as those of ``np.nansum``, so that the results are identical to those of the NaN-aware numpy
+    functions, but the NaNs are only looked for once, and the dates without NaNs, the most
+    common case, are reduced directly.
+    """
+    nan = np.isnan(values)
+    fields = values.reshape((values.shape[0], members, -1))
+    nans = np.count_nonzero(nan.reshape(fields.shape), axis=2)
+
+    if not nans.any():
+        return nans, fields.min(axis=2), fields.max(axis=2), values.sum(axis=1), np.square(values).sum(axis=1)
+
+    filled = np.where(nan, 0, values)
+    return (
+        nans,
+        np.fmin.reduce(fields, axis=2),
+        np.fmax.reduce(fields, axis=2),
+        filled.sum(axis=1),
+        np.square(filled).sum(axis=1),
+    )
+
+
+def compute_statistics(array, check_variables_names=None, allow_nans=False, threads=None, check_fields=False):
+    """Compute statistics for a given array, provides minimum, maximum, sum, squares, count and has_nans as a dictionary.
+
+    The values of each date are scanned once, in `threads` parallel threads if more than one,
+    and checked with the same rules as :func:`check_data_values`, for each variable and, if
+    `check_fields` is True, for each field (variable and member) of an array of shape
+    (dates, variables, members, points).
+    """
 
     nvars = array.shape[1]
+    members = array.shape[2] if array.ndim > 3 else 1
 
     LOG.debug(f"Stats {nvars}, {array.shape}, {check_variables_names}")
     if check_variables_names:
@@ -149,22 +180,60 @@ def compute_statistics(array, check_variables_names=None, allow_nans=False):
     maximum = np.zeros(stats_shape, dtype=np.float64)
     has_nans = np.zeros(stats_shape, dtype=np.bool_)
 
-    for i, chunk in enumerate(array):
-        values = chunk.reshape((nvars, -1))
-
-        for j, name in enumerate(check_variables_names):
-            check_data_values(values[j, :], name=name, allow_nans=allow_nans)
-            if np.isnan(values[j, :]).all():
-                # LOG.warning(f"All NaN values for {name} ({j}) for date {i}")
+    def summarise(i):
+        return _summarise(array[i].reshape((nvars, -1)), members)
+
+    if threads is not None and threads > 1 and len(array) > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            summaries = list(executor.map(summarise, range(len(array))))
+    else:
+        summaries = [summarise(i) for i in range(len(array))]
+
+    names = check_variables_names or []
+    size = array[0].size // nvars if len(array) else 0
+
+    if check_fields:
+        points = size // members
+        for i, (nans, fields_minimum, fields_maximum, _, _) in enumerate(summaries):
+            for j, name in enumerate(names):
+                for k in range(members):
+                    check_data_summary(
+                        name=name,
+                        shape=(points,),
+                        count=points - nans[j, k],
+                        minimum=fields_minimum[j, k],
+                        maximum=fields_maximum[j, k],
+                        log=[(points,), (i, j, k)],
+                        allow_nans=allow_nans,
+                    )
+
+    for i, (nans, fields_minimum, fields_maximum, fields_sums, fields_squares) in enumerate(summaries):
+        sums[i] = fields_sums
+        squares[i] = fields_squares
+
+        nans = nans.sum(axis=1)
+        count[i] = size - nans
+        has_nans[i] = nans.any()
+
+        minimum[i] = np.fmin.reduce(fields_minimum, axis=1)
+        maximum[i] = np.fmax.reduce(fields_maximum, axis=1)
+
+        for j, name in enumerate(names):
+            check_data_summary(
+                name=name,
+                shape=(size,),
+                count=count[i, j],
+                minimum=minimum[i, j],
+                maximum=maximum[i, j],
+                allow_nans=allow_nans,
+            )
+            if count[i, j] == 0:
                 LOG.warning(f"All NaN values for {name} ({j}) for date {i}")
 
-        # Ignore NaN values
-        minimum[i] = np.nanmin(values, axis=1)
-        maximum[i] = np.nanmax(values, axis=1)
-        sums[i] = np.nansum(values, axis=1)
-        squares[i] = np.nansum(values * values, axis=1)
-        count[i] = np.sum(~np.isnan(values), axis=1)
-        has_nans[i] = np.isnan(values).any()
+        if has_nans[i].any():
+            # Same values, but warns about the variables with only NaNs, as np.nanmin does on the values
+            minimum[i] = np.nanmin(fields_minimum, axis=1)
+            maximum[i] = np.nanmax(fields_maximum, axis=1)
 
     return {
         "minimum": minimum,
@@ -177,26 +246,65 @@ def compute_statistics(array, check_variables_names=None, allow_nans=False):
 
 
 class TmpStatistics:
-    version = 3
-    # Used in parrallel, during data loading,
-    # to write statistics in pickled npz files.
-    # can provide statistics for a subset of dates.
+    version = 4
+    # Used in parallel, during data loading, to write the statistics of each date
+    # in a zarr group, with one row per date of the dataset, so that they can be
+    # aggregated with a few reductions over contiguous arrays.
+
+    NAMES = {
+        "minimum": (np.float64, np.nan),
+        "maximum": (np.float64, np.nan),
+        "sums": (np.float64, 0),
+        "squares": (np.float64, 0),
+        # A count of -1 marks the dates without statistics
+        "count": (np.int64, -1),
+        "has_nans": (np.bool_, False),
+    }
+
+    # Default number of dates per chunk of the arrays
+    CHUNK = 1024
 
     def __init__(self, dirname, overwrite=False):
         self.dirname = dirname
         self.overwrite = overwrite
 
+    def _open(self, mode="r"):
+        import zarr
+
+        return zarr.open_group(self.dirname, mode=mode)
+
     def add_provenance(self, **kwargs):
-        self.create(exist_ok=True)
-        path = os.path.join(self.dirname, "provenance.json")
-        if os.path.exists(path):
+        z = self._open("r+")
+        if "provenance" in z.attrs:
             return
-        out = dict(provenance=gather_provenance_info(), **kwargs)
-        with open(path, "w") as f:
-            json.dump(out, f)
+        z.attrs["provenance"] = dict(provenance=gather_provenance_info(), **kwargs)
+
+    def create(self, dates, variables_names, chunk=None, exist_ok=False):
+        """Create the arrays of statistics of `dates`.
 
-    def create(self, exist_ok):
-        os.makedirs(self.dirname, exist_ok=exist_ok)
+        Groups of dates written concurrently must not share chunks, see `Groups.largest_aligned_chunk`.
+        """
+        import zarr
+
+        z = zarr.open_group(self.dirname, mode="a" if exist_ok else "w-")
+        if "dates" in z and exist_ok:
+            return
+
+        z.attrs["version"] = self.version
+        z.attrs["variables_names"] = list(variables_names)
+
+        dates = np.array(to_datetimes(dates), dtype="datetime64[s]")
+        add_zarr_dataset(zarr_root=z, name="dates", array=dates, dimensions=("time",))
+
+        for name, (dtype, fill_value) in self.NAMES.items():
+            a = z.create_dataset(
+                name,
+                shape=(len(dates), len(variables_names)),
+                dtype=dtype,
+                fill_value=fill_value,
+                chunks=(chunk or self.CHUNK, len(variables_names)),
+            )
+            a.attrs["_ARRAY_DIMENSIONS"] = ("time", "variable")
 
     def delete(self):
         try:
@@ -205,33 +313,64 @@ class TmpStatistics:
             pass
 
     def write(self, key, data, dates):
-        self.create(exist_ok=True)
-        h = hashlib.sha256(str(dates).encode("utf-8")).hexdigest()
-        path = os.path.join(self.dirname, f"{h}.npz")
+        """Write the statistics `data` of `dates`, the dates at the positions `key` in the dataset."""
+        key = np.asarray(key)
+        z = self._open("r+")
+
+        stored = z["dates"].get_coordinate_selection(key)
+        assert (stored == np.array(to_datetimes(dates), dtype="datetime64[s]")).all(), (stored, dates)
 
         if not self.overwrite:
-            assert not os.path.exists(path), f"{path} already exists"
+            # Dates loaded twice, by a worker whose lease had expired, are written once
+            todo = z["count"].get_orthogonal_selection((key, slice(0, 1)))[:, 0] < 0
+            if not todo.all():
+                LOG.warning(f"Statistics already written for {int((~todo).sum())} of {len(dates)} dates, skipping them")
+                key = key[todo]
+                data = {name: data[name][todo] for name in self.NAMES}
+
+        for position, start, stop in contiguous_runs(key):
+            rows = slice(position, position + stop - start)
+            for name in self.NAMES:
+                z[name][start:stop] = data[name][rows]
 
-        tmp_path = path + f".tmp-{os.getpid()}-on-{socket.gethostname()}"
-        with open(tmp_path, "wb") as f:
-            pickle.dump((key, dates, data), f)
-        shutil.move(tmp_path, path)
+        LOG.debug(f"Written statistics data for {len(dates)} dates in {self.dirname} ({dates})")
 
-        LOG.debug(f"Written statistics data for {len(dates)} dates in {path} ({dates})")
+    def _read(self, dates, variables_names):
+        """Return the positions of `dates` and the arrays of statistics."""
+        z = self._open()
+        assert list(z.attrs["variables_names"]) == list(variables_names), (
+            z.attrs["variables_names"],
+            variables_names,
+        )
 
-    def _gather_data(self):
-        # use glob to read all pickles
-        files = glob.glob(self.dirname + "/*.npz")
-        LOG.debug(f"Reading stats data, found {len(files)} files in {self.dirname}")
-        assert len(files) > 0, f"No files found in {self.dirname}"
-        for f in files:
-            with open(f, "rb") as f:
-                yield pickle.load(f)
+        stored = z["dates"][:]
+        dates = np.array(to_datetimes(dates), dtype="datetime64[s]")
+        positions = np.searchsorted(stored, dates)
+        unknown = (positions >= len(stored)) | (stored[np.minimum(positions, len(stored) - 1)] != dates)
+        if unknown.any():
+            raise ValueError(f"Date {dates[unknown][0]} is not a date of the dataset")
+
+        return positions, {name: z[name][:] for name in self.NAMES}
 
     def get_aggregated(self, *args, **kwargs):
         aggregator = StatAggregator(self, *args, **kwargs)
         return aggregator.aggregate()
 
+    def get_per_date(self, dates, variables_names):
+        """Return the partial statistics of each date, in the order of `dates`.
+
+        Dates without precomputed statistics (e.g. missing dates) have a count of zero.
+        """
+        positions, stats = self._read(dates, variables_names)
+        missing = stats["count"][positions] < 0
+
+        result = {}
+        for k in ("sums", "squares", "count", "minimum", "maximum"):
+            result[k] = stats[k][positions]
+            result[k][missing] = np.nan if k in ("minimum", "maximum") else 0
+
+        return result
+
     def __str__(self):
         return f"TmpStatistics({self.dirname})"
 
@@ -271,58 +410,16 @@ class StatAggregator:
         self._read()
 
     def _read(self):
-        def check_type(a, b):
-            a = list(a)
-            b = list(b)
-            a = a[0] if a else None
-            b = b[0] if b else None
-            assert type(a) is type(b), (type(a), type(b))
-
-        found = set()
-        offset = 0
-
-        for _, _dates, stats in self.owner._gather_data():
-            assert isinstance(stats, dict), stats
-            assert stats["minimum"].shape[0] == len(_dates), (stats["minimum"].shape, len(_dates))
-            assert stats["minimum"].shape[1] == len(self.variables_names), (
-                stats["minimum"].shape,
-                len(self.variables_names),
-            )
-            for n in self.NAMES:
-                assert n in stats, (n, list(stats.keys()))
-            _dates = to_datetimes(_dates)
-            check_type(_dates, self.dates)
-            if found:
-                check_type(found, self.dates)
-                assert found.isdisjoint(_dates), "Duplicate dates found in precomputed statistics"
-
-            # filter dates
-            dates = set(_dates) & set(self.dates)
-
-            if not dates:
-                # dates have been completely filtered for this chunk
-                continue
-
-            # filter data
-            bitmap = np.isin(_dates, self.dates)
-            for k in self.NAMES:
-                stats[k] = stats[k][bitmap]
-
-            assert stats["minimum"].shape[0] == len(dates), (stats["minimum"].shape, len(dates))
-
-            # store data in self
-            found |= set(dates)
-            for name in self.NAMES:
-                array = getattr(self, name)
-                assert stats[name].shape[0] == len(dates), (stats[name].shape, len(dates))
-                array[offset : offset + len(dates)] = stats[name]
-            offset += len(dates)
-
-        for d in self.dates:
-            assert d in found, f"Statistics for date {d} not precomputed."
-        assert len(self.dates) == len(found), "Not all dates found in precomputed statistics"
-        assert len(self.dates) == offset, "Not all dates found in precomputed statistics."
-        LOG.debug(f"Statistics for {len(found)} dates found.")
+        positions, stats = self.owner._read(self.dates, self.variables_names)
+
+        missing = stats["count"][positions, 0] < 0
+        if missing.any():
+            raise AssertionError(f"Statistics for date {self.dates[np.argmax(missing)]} not precomputed.")
+
+        for name in self.NAMES:
+            setattr(self, name, stats[name][positions])
+
+        LOG.debug(f"Statistics for {len(self.dates)} dates found.")
 
     def aggregate(self):
         minimum = np.nanmin(self.minimum, axis=0)
@@ -0,0 +1,156 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""Statistics of the tendencies of the data, the differences ``x(t) - x(t - delta)``.
+
+They are computed by ``load`` while the values of each group of dates are in memory. The
+tendency of a date needs the values of the date ``delta`` earlier: it is found in the group
+itself, in a small buffer holding the last dates of the previous groups, or read back from the
+dataset if it belongs to a group already written by another part. The few tendencies that
+cannot be computed this way, because the earlier date had not been written yet, are computed
+by ``finalise``.
+"""
+
+import logging
+import threading
+
+import numpy as np
+from anemoi.utils.dates import frequency_to_string
+
+from . import compute_statistics
+
+LOG = logging.getLogger(__name__)
+
+
+def tendencies_name(delta):
+    """The name of the statistics of the tendencies over `delta`, a timedelta."""
+    return f"statistics_tendencies_{frequency_to_string(delta)}"
+
+
+class Tendencies:
+    """Compute the statistics of the tendencies over `delta` of the groups of dates being loaded.
+
+    Parameters
+    ----------
+    tmp_statistics : TmpStatistics
+        Where the statistics of each date are stored.
+    delta : datetime.timedelta
+        The time between the two dates of a tendency.
+    frequency : datetime.timedelta
+        The frequency of the dataset, `delta` must be a multiple of it.
+    variables_names : list of str
+        The variables of the dataset.
+    allow_nans : bool or list, optional
+        The variables that may contain NaNs, see :func:`compute_statistics`.
+    threads : int, optional
+        The number of threads used to compute the statistics.
+    """
+
+    def __init__(self, tmp_statistics, delta, frequency, variables_names, allow_nans=False, threads=None):
+        if delta.total_seconds() % frequency.total_seconds():
+            raise ValueError(f"Tendencies: {delta} is not a multiple of the frequency {frequency}")
+
+        self.tmp_statistics = tmp_statistics
+        self.delta = delta
+        self.idelta = int(delta.total_seconds() // frequency.total_seconds())
+        self.variables_names = variables_names
+        self.allow_nans = allow_nans
+        self.threads = threads
+
+        # The values of the last dates seen, by position in the dataset
+        self.buffer = {}
+        self.lock = threading.Lock()
+
+    def compute(self, values, indexes, read=None):
+        """Compute the statistics of the tendencies of a group of dates.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The values of the group, one row per date.
+        indexes : array-like
+            The positions of the dates of the group in the dataset.
+        read : callable, optional
+            Return the values of the date at a given position in the dataset, or None if they
+            are not available yet.
+
+        Returns
+        -------
+        tuple or None
+            The positions of the dates whose tendencies have been computed, and their statistics.
+        """
+        indexes = [int(i) for i in indexes]
+        rows = {i: n for n, i in enumerate(indexes)}
+
+        with self.lock:
+            previous = {i - self.idelta: self.buffer.get(i - self.idelta) for i in indexes}
+            # Keep the last dates for the next group
+            last = max(indexes) - self.idelta
+            self.buffer = {i: v for i, v in self.buffer.items() if i > last}
+            self.buffer.update({i: values[n].copy() for i, n in rows.items() if i > last})
+
+        positions = []
+        tendencies = []
+        for n, i in enumerate(indexes):
+            j = i - self.idelta
+            if j < 0:
+                continue
+
+            if j in rows:
+                before = values[rows[j]]
+            elif previous[j] is not None:
+                before = previous[j]
+            else:
+                before = read(j) if read is not None else None
+                if before is None:
+                    continue
+
+            positions.append(i)
+            tendencies.append(values[n] - before)
+
+        LOG.debug(f"Tendencies {frequency_to_string(self.delta)}: {len(positions)}/{len(indexes)} dates computed")
+
+        if not positions:
+            return None
+
+        stats = compute_statistics(
+            np.stack(tendencies),
+            self.variables_names,
+            allow_nans=self.allow_nans,
+            threads=self.threads,
+        )
+        return positions, stats
+
+    def complete(self, dataset, positions):
+        """Compute the tendencies of the dates at `positions` in `dataset` that were not
+        computed while loading, reading their values from the dataset.
+        """
+        dates = dataset.dates[positions]
+        done, stats = self.tmp_statistics._read(dates, self.variables_names)
+        todo = [i for i, p in zip(positions, done) if stats["count"][p, 0] < 0]
+
+        if todo:
+            LOG.info(f"Tendencies {frequency_to_string(self.delta)}: reading {len(todo)} dates from the dataset")
+
+        for i in todo:
+            tendency = dataset[i : i + 1] - dataset[i - self.idelta : i - self.idelta + 1]
+            stats = compute_statistics(tendency, self.variables_names, allow_nans=self.allow_nans)
+            self.tmp_statistics.write([i], stats, dates=dataset.dates[i : i + 1])
+
+    def positions(self, dates, start, end, missing):
+        """Return the positions of the dates whose tendencies are aggregated: the dates between
+        `start` and `end` for which both dates of the tendency are in that range and not missing.
+        """
+        dates = np.asarray(dates)
+        first = int(np.searchsorted(dates, start))
+        stop = int(np.searchsorted(dates, end, side="right"))
+        return [i for i in range(first + self.idelta, stop) if i not in missing and i - self.idelta not in missing]
+
+    def __repr__(self):
+        return f"Tendencies({frequency_to_string(self.delta)})"
@@ -9,11 +9,49 @@
 
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
 LOG = logging.getLogger(__name__)
 
+# Number of threads used to compress and write whole chunks
+WRITE_THREADS = 4
+
+
+def contiguous_runs(indexes):
+    """Split `indexes` into runs of consecutive values, returned as (position, start, stop) tuples,
+    where `position` is the position of `start` in `indexes`.
+    """
+    indexes = np.asarray(indexes)
+    if len(indexes) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indexes) != 1) + 1
+    starts = np.concatenate([[0], breaks])
+    stops = np.concatenate([breaks, [len(indexes)]])
+    return [(int(a), int(indexes[a]), int(indexes[b - 1]) + 1) for a, b in zip(starts, stops)]
+
+
+def chunk_aligned_blocks(start, stop, chunk):
+    """Split the range `start`:`stop` at the multiples of `chunk`. Return the blocks as
+    (start, stop, aligned) tuples, where `aligned` is True for blocks that cover whole chunks.
+    """
+    blocks = []
+    first = -(-start // chunk) * chunk
+    last = stop // chunk * chunk
+
+    if first >= last:
+        # No whole chunk in the range
+        return [(start, stop, start % chunk == 0 and stop % chunk == 0)]
+
+    if start < first:
+        blocks.append((start, first, False))
+    for a in range(first, last, chunk):
+        blocks.append((a, a + chunk, True))
+    if last < stop:
+        blocks.append((last, stop, False))
+    return blocks
+
 
 class ViewCacheArray:
     """A class that provides a caching mechanism for writing to a NumPy-like array.
@@ -22,21 +60,49 @@ class ViewCacheArray:
     dimension. The array is used to store the final data, while the cache is used to
     temporarily store the data before flushing it to the array.
 
-    The `flush` method copies the contents of the cache to the final array.
+    The `flush` method copies the contents of the cache to the final array. Consecutive indexes
+    are written as slices: blocks that cover whole chunks of the first dimension are compressed
+    and written in parallel threads, and only the partial chunks at the edges need a
+    read-modify-write of the chunk.
 
     """
 
-    def __init__(self, array, *, shape, indexes):
+    def __init__(self, array, *, shape, indexes, threads=None):
         assert len(indexes) == shape[0], (len(indexes), shape[0])
         self.array = array
         self.dtype = array.dtype
         self.cache = np.full(shape, np.nan, dtype=self.dtype)
         self.indexes = indexes
+        self.threads = WRITE_THREADS if threads is None else threads
 
     def __setitem__(self, key, value):
         self.cache[key] = value
 
+    def blocks(self):
+        """The (start, stop, aligned) blocks of the final array to write, and their position in the cache."""
+        chunk = getattr(self.array, "chunks", (1,))[0]
+        for position, start, stop in contiguous_runs(self.indexes):
+            for a, b, aligned in chunk_aligned_blocks(start, stop, chunk):
+                yield position + a - start, a, b, aligned
+
+    def _write(self, block):
+        i, start, stop, _ = block
+        self.array[start:stop] = self.cache[i : i + stop - start]
+
     def flush(self):
-        for i in range(self.cache.shape[0]):
-            global_i = self.indexes[i]
-            self.array[global_i] = self.cache[i]
+        blocks = list(self.blocks())
+        aligned = [b for b in blocks if b[3]]
+        edges = [b for b in blocks if not b[3]]
+
+        if self.threads > 1 and len(aligned) > 1:
+            # Whole chunks are independent, they can be compressed and written concurrently
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                list(executor.map(self._write, aligned))
+        else:
+            for block in aligned:
+                self._write(block)
+
+        for block in edges:
+            self._write(block)
+
+        LOG.debug(f"Flushed {len(self.indexes)} dates in {len(aligned)} chunk-aligned and {len(edges)} partial blocks")
@@ -9,12 +9,28 @@
 
 import datetime
 import logging
+import os
 import shutil
+import socket
+import threading
 
 import numpy as np
 
 LOG = logging.getLogger(__name__)
 
+# The thread synchronizers of the datasets, shared by all the registries of this process, so
+# that the threads loading a dataset lock the same chunks
+SYNCHRONIZERS = {}
+SYNCHRONIZERS_LOCK = threading.Lock()
+
+
+def thread_synchronizer(path):
+    """The thread synchronizer of the dataset in `path`, shared by the whole process."""
+    import zarr
+
+    with SYNCHRONIZERS_LOCK:
+        return SYNCHRONIZERS.setdefault(os.path.realpath(path), zarr.ThreadSynchronizer())
+
 
 def add_zarr_dataset(
     *,
@@ -80,8 +96,20 @@ def add_zarr_dataset(
 
 
 class ZarrBuiltRegistry:
+    """Keep track of the groups of dates loaded in a dataset being built.
+
+    While the dataset is loaded, the flag of each group is a marker file in
+    ``_build/done``, created with an atomic rename, so that any number of workers can
+    set their flags without locking, and all the flags are read with a single listing
+    of the directory. When all the groups are loaded, :meth:`consolidate` copies the
+    flags to the ``_build/flags`` array and removes the markers.
+    """
+
     name_lengths = "lengths"
     name_flags = "flags"
+    name_markers = "done"
+    # The leases of the workers of `load --worker`, see `leases.py`
+    name_leases = "leases"
     lengths = None
     flags = None
     z = None
@@ -91,9 +119,10 @@ class ZarrBuiltRegistry:
 
         assert isinstance(path, str), path
         self.zarr_path = path
+        self.markers_path = os.path.join(path, "_build", self.name_markers)
 
         if use_threads:
-            self.synchronizer = zarr.ThreadSynchronizer()
+            self.synchronizer = thread_synchronizer(path)
             self.synchronizer_path = None
         else:
             if synchronizer_path is None:
@@ -139,34 +168,99 @@ class ZarrBuiltRegistry:
         z.attrs["history"] = history
 
     def get_lengths(self):
-        z = self._open_read()
+        # Written once by `init`, no need to lock
+        z = self._open_read(sync=False)
         return list(z["_build"][self.name_lengths][:])
 
+    def _markers(self):
+        """The flags are marker files until they are consolidated, see :meth:`consolidate`."""
+        return os.path.isdir(self.markers_path)
+
+    def _marker(self, i):
+        return os.path.join(self.markers_path, str(i))
+
     def get_flags(self, **kwargs):
+        if self._markers():
+            done = set(os.listdir(self.markers_path))
+            return [str(i) in done for i in range(len(self.get_lengths()))]
+
         z = self._open_read(**kwargs)
         return list(z["_build"][self.name_flags][:])
 
     def get_flag(self, i):
+        if self._markers():
+            return os.path.exists(self._marker(i))
+
         z = self._open_read()
         return z["_build"][self.name_flags][i]
 
     def set_flag(self, i, value=True):
-        z = self._open_write()
-        z.attrs["latest_write_timestamp"] = (
-            datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
-        )
-        z["_build"][self.name_flags][i] = value
+        if not self._markers():
+            z = self._open_write()
+            z.attrs["latest_write_timestamp"] = (
+                datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat()
+            )
+            z["_build"][self.name_flags][i] = value
+            return
+
+        if not value:
+            try:
+                os.remove(self._marker(i))
+            except FileNotFoundError:
+                pass
+            return
+
+        # Renaming is atomic, a marker is never seen half written
+        tmp = os.path.join(self.markers_path, f".{i}.{os.getpid()}.{socket.gethostname()}.tmp")
+        with open(tmp, "w") as f:
+            f.write(datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat())
+        os.replace(tmp, self._marker(i))
 
     def ready(self):
         return all(self.get_flags())
 
-    def create(self, lengths, overwrite=False):
+    def create(self, lengths, overwrite=False, aligned=False, tendencies=()):
         self.new_dataset(name=self.name_lengths, array=np.array(lengths, dtype="i4"))
         self.new_dataset(name=self.name_flags, array=np.array([False] * len(lengths), dtype=bool))
-        self.add_to_history("initialised")
+        z = self._open_write()
+        z["_build"].attrs["aligned"] = aligned
+        z["_build"].attrs["tendencies"] = list(tendencies)
+
+        shutil.rmtree(self.markers_path, ignore_errors=True)
+        shutil.rmtree(os.path.join(self.zarr_path, "_build", self.name_leases), ignore_errors=True)
+        os.makedirs(self.markers_path)
+
+        self.add_to_history("initialised", aligned=aligned)
+
+    def consolidate(self):
+        """Copy the flags set by the markers to the zarr array, and remove the markers."""
+        if not self._markers():
+            return
+
+        flags = self.get_flags()
+        z = self._open_write()
+        z["_build"][self.name_flags][:] = flags
+
+        timestamps = [os.path.getmtime(self._marker(i)) for i, flag in enumerate(flags) if flag]
+        if timestamps:
+            latest = datetime.datetime.fromtimestamp(max(timestamps), datetime.timezone.utc).replace(tzinfo=None)
+            z.attrs["latest_write_timestamp"] = latest.isoformat()
+
+        shutil.rmtree(self.markers_path)
+        shutil.rmtree(os.path.join(self.zarr_path, "_build", self.name_leases), ignore_errors=True)
+
+    def aligned(self):
+        """True if each chunk of the dataset is written by a single group of dates."""
+        z = self._open_read(sync=False)
+        return z["_build"].attrs.get("aligned", False)
+
+    def tendencies(self):
+        """The deltas of the tendencies whose statistics are computed while loading."""
+        z = self._open_read(sync=False)
+        return list(z["_build"].attrs.get("tendencies", []))
 
     def reset(self, lengths):
-        return self.create(lengths, overwrite=True)
+        return self.create(lengths, overwrite=True, aligned=self.aligned(), tendencies=self.tendencies())
 
     def add_provenance(self, name):
         z = self._open_write()
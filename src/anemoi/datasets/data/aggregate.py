@@ -0,0 +1,241 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+from functools import cached_property
+
+import numpy as np
+from anemoi.utils.dates import frequency_to_string
+from anemoi.utils.dates import frequency_to_timedelta
+
+from . import MissingDateError
+from .debug import Node
+from .debug import debug_indexing
+from .forwards import Forwards
+from .indexing import apply_index_to_slices_changes
+from .indexing import expand_list_indexing
+from .indexing import index_to_slices
+from .indexing import update_tuple
+
+LOG = logging.getLogger(__name__)
+
+# Maximum size of the blocks read by sequential accesses
+BLOCK_BYTES = 64 * 1024 * 1024
+
+METHODS = {
+    "mean": np.mean,
+    "max": np.max,
+    "min": np.min,
+    "sum": np.sum,
+}
+
+# The statistics of the underlying dataset that remain exact after aggregation
+EXACT_STATISTICS = {
+    "mean": ("mean",),
+    "max": ("maximum",),
+    "min": ("minimum",),
+    "sum": ("mean",),
+}
+
+
+def _key(index):
+    return tuple((s.start, s.stop, s.step) for s in index)
+
+
+class Aggregate(Forwards):
+    """Aggregate the dates of a dataset over windows of a lower frequency, such as daily means.
+
+    Windows start at the first date of the dataset that is a multiple of the frequency, or at
+    midnight for frequencies of one day or more. Incomplete windows at the start and end of the
+    dataset are dropped. A window is missing if any of its dates is missing. The dates of the
+    dataset are the first dates of the windows.
+    """
+
+    def __init__(self, dataset, aggregate):
+        super().__init__(dataset)
+
+        if isinstance(aggregate, str):
+            aggregate = {"frequency": aggregate}
+
+        aggregate = dict(aggregate)
+        if "frequency" not in aggregate:
+            raise ValueError(f"Aggregate: missing frequency in {aggregate}")
+
+        method = aggregate.pop("method", "mean")
+        if method not in METHODS:
+            raise ValueError(f"Aggregate: unknown method {method!r}, expected one of {sorted(METHODS)}")
+
+        self.method = method
+        self._frequency = frequency_to_timedelta(aggregate.pop("frequency"))
+
+        if aggregate:
+            raise ValueError(f"Aggregate: unsupported options {sorted(aggregate)}")
+
+        seconds = int(self._frequency.total_seconds())
+        other_seconds = int(self.forward.frequency.total_seconds())
+
+        if seconds <= other_seconds or seconds % other_seconds != 0:
+            raise ValueError(
+                f"Aggregate frequency {frequency_to_string(self._frequency)} must be a multiple"
+                f" of the dataset frequency {frequency_to_string(self.forward.frequency)}"
+            )
+
+        # Number of dates in a window
+        self.ratio = seconds // other_seconds
+
+        align = min(seconds, 24 * 3600)
+        dates = self.forward.dates
+        self.offset = 0
+        while self.offset < len(dates) and (dates[self.offset].astype("datetime64[s]").astype(np.int64) % align) != 0:
+            self.offset += 1
+
+        self.windows = max(0, (len(dates) - self.offset) // self.ratio)
+        if self.windows == 0:
+            raise ValueError(f"Aggregate: no complete window of {frequency_to_string(self._frequency)} in the dataset")
+
+        # The last block of windows read, for sequential access
+        self.cache = None
+        self.warned = False
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["cache"] = None
+        return state
+
+    def __len__(self):
+        return self.windows
+
+    @property
+    def shape(self):
+        return (len(self),) + self.forward.shape[1:]
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @property
+    def starts(self):
+        """The indices of the first dates of the windows in the underlying dataset."""
+        return slice(self.offset, self.offset + self.windows * self.ratio, self.ratio)
+
+    @cached_property
+    def dates(self):
+        return self.forward.dates[self.starts]
+
+    @cached_property
+    def missing(self):
+        result = set()
+        for i in self.forward.missing:
+            window = (i - self.offset) // self.ratio
+            if i >= self.offset and window < self.windows:
+                result.add(window)
+        return result
+
+    def date_chunk_ids(self):
+        return np.asarray(self.forward.date_chunk_ids())[self.starts]
+
+    @property
+    def statistics(self):
+        """The statistics of the underlying dataset, scaled by the number of dates in a window for
+        sums. Only those listed in `EXACT_STATISTICS` are those of the aggregated values, the others
+        are approximations: a warning is issued the first time they are used.
+        """
+        stats = {k: np.asarray(v) for k, v in self.forward.statistics.items()}
+        if self.method == "sum":
+            stats = {k: v * self.ratio for k, v in stats.items()}
+
+        if not self.warned:
+            self.warned = True
+            exact = ", ".join(EXACT_STATISTICS[self.method])
+            LOG.warning(
+                f"Aggregate: only the {exact} of the statistics are exact for the {self.method}"
+                f" over {frequency_to_string(self._frequency)}, the others are those of the underlying dataset"
+            )
+
+        return stats
+
+    def statistics_tendencies(self, delta=None):
+        raise NotImplementedError("Aggregate: the statistics of the tendencies of aggregated values are not available")
+
+    def partial_statistics(self):
+        raise NotImplementedError(f"Partial statistics are not available for {self.__class__.__name__}")
+
+    @cached_property
+    def block(self):
+        """The number of windows read at once by sequential accesses, so that a block covers a chunk of the dataset."""
+        ids = np.asarray(self.forward.date_chunk_ids())
+        runs = np.diff(np.flatnonzero(np.diff(ids) != 0), prepend=-1, append=len(ids) - 1)
+        window = self.ratio * int(np.prod(self.shape[1:])) * np.dtype(self.dtype).itemsize
+        return max(1, min(int(runs.max()) // self.ratio, BLOCK_BYTES // window))
+
+    def _reduce(self, index, count):
+        """Read `count` consecutive windows as one contiguous block and reduce them."""
+        start = index[0].start
+        rows = slice(self.offset + start * self.ratio, self.offset + (start + count) * self.ratio)
+        values = self.forward[update_tuple(index, 0, rows)[0]]
+        values = values.reshape((count, self.ratio) + values.shape[1:])
+        return METHODS[self.method](values, axis=1).astype(self.dtype, copy=False)
+
+    def _read(self, index):
+        """Return the aggregated values for `index`, a tuple of slices with one slice per dimension."""
+        start, stop, step = index[0].indices(len(self))
+        windows = range(start, stop, step)
+
+        common = set(windows) & self.missing
+        if common:
+            self._report_missing(min(common))
+
+        if len(windows) == 1:
+            # Sequential reads of single windows are served from the last block read
+            block = start // self.block
+            key = (block, _key(index[1:]))
+            if self.cache is None or self.cache[0] != key:
+                first = block * self.block
+                count = min(self.block, len(self) - first)
+                if set(range(first, first + count)) & self.missing:
+                    first, count = start, 1
+                    key = None
+                values = self._reduce(update_tuple(index, 0, slice(first, first + count))[0], count)
+                if key is None:
+                    return values
+                self.cache = (key, values)
+            _, values = self.cache
+            i = start - block * self.block
+            return values[i : i + 1].copy()
+
+        if step == 1:
+            return self._reduce(update_tuple(index, 0, slice(start, stop))[0], len(windows))
+
+        return np.concatenate([self._reduce(update_tuple(index, 0, slice(w, w + 1))[0], 1) for w in windows])
+
+    @debug_indexing
+    @expand_list_indexing
+    def _get_tuple(self, index):
+        index = tuple(i + n if isinstance(i, int) and i < 0 else i for i, n in zip(index, self.shape))
+        index, changes = index_to_slices(index, self.shape)
+        return apply_index_to_slices_changes(self._read(index), changes)
+
+    @debug_indexing
+    def __getitem__(self, n):
+        if not isinstance(n, tuple):
+            n = (n,)
+        return self._get_tuple(n)
+
+    def read_into_slices(self, out, index):
+        out[...] = self._read(index)
+
+    def _report_missing(self, n):
+        raise MissingDateError(f"Date {self.dates[n]} is missing (index={n})")
+
+    def tree(self):
+        return Node(self, [self.forward.tree()], frequency=frequency_to_string(self._frequency), method=self.method)
+
+    def subclass_metadata_specific(self):
+        return {"aggregate": {"frequency": frequency_to_string(self._frequency), "method": self.method}}
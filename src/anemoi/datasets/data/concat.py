@@ -17,6 +17,7 @@ from anemoi.utils.dates import frequency_to_timedelta
 from .debug import Node
 from .debug import debug_indexing
 from .forwards import Combined
+from .forwards import read_into_along_axis
 from .indexing import apply_index_to_slices_changes
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
@@ -71,6 +72,23 @@ class ConcatMixin:
 
         return np.concatenate(result)
 
+    def read_into_slices(self, out, index):
+        read_into_along_axis(self.datasets, out, index, 0)
+
+    def date_chunk_ids(self):
+        result = []
+        offset = 0
+        for d in self.datasets:
+            ids = np.asarray(d.date_chunk_ids())
+            result.append(ids + offset)
+            if len(ids):
+                offset += ids.max() + 1
+        return np.concatenate(result)
+
+    def partial_statistics(self):
+        partial = [d.partial_statistics() for d in self.datasets]
+        return {k: np.concatenate([p[k] for p in partial], axis=0) for k in partial[0]}
+
     @cached_property
     def missing(self):
         result = set()
@@ -49,6 +49,49 @@ def _tidy(v):
     return v
 
 
+def _balanced_owners(ids, missing, world_size):
+    """Assign groups of dates sharing the same id to ranks, so that each rank gets a contiguous
+    range of ids and roughly the same number of non-missing dates. Returns the rank of each date.
+    """
+    groups, inverse = np.unique(ids, return_inverse=True)
+
+    valid = np.ones(len(ids))
+    if missing:
+        valid[sorted(missing)] = 0
+
+    weights = np.bincount(inverse, weights=valid, minlength=len(groups))
+    if weights.sum() == 0:
+        weights = np.bincount(inverse, minlength=len(groups)).astype(float)
+
+    # Fill the ranks in order, moving to the next rank when the middle of a group is past the
+    # share of the current one, or when the groups left are only enough for one per rank
+    total = weights.sum()
+    owners = np.zeros(len(groups), dtype=int)
+    rank, done, count = 0, 0.0, 0
+    for i, weight in enumerate(weights):
+        if count and rank < world_size - 1:
+            if len(groups) - i <= world_size - 1 - rank or done + weight / 2 > total * (rank + 1) / world_size:
+                rank, count = rank + 1, 0
+        owners[i] = rank
+        done += weight
+        count += 1
+
+    return owners[inverse]
+
+
+class _DaskAdapter:
+    """The minimal array interface used by `dask.array.from_array`."""
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.shape = dataset.shape
+        self.dtype = dataset.dtype
+        self.ndim = len(dataset.shape)
+
+    def __getitem__(self, index):
+        return self.dataset[index]
+
+
 class Dataset:
     arguments = {}
     _name = None
@@ -94,6 +137,32 @@ class Dataset:
             ds = fill_missing_dates_factory(self, fill_missing_dates, kwargs)
             return ds._subset(**kwargs).mutate()
 
+        if "read_threads" in kwargs:
+            from .read_threads import ReadThreads
+
+            read_threads = kwargs.pop("read_threads")
+            return ReadThreads(self, read_threads)._subset(**kwargs).mutate()
+
+        # Must be applied to the zarr dataset itself
+        if "level" in kwargs:
+            from .pyramid import Level
+
+            level = kwargs.pop("level")
+            return Level(self, level)._subset(**kwargs).mutate()
+
+        # Before the subsets of dates, which apply to the computed dates
+        if "tendencies" in kwargs:
+            from .tendencies import Tendencies
+
+            tendencies = kwargs.pop("tendencies")
+            return Tendencies(self, tendencies)._subset(**kwargs).mutate()
+
+        if "aggregate" in kwargs:
+            from .aggregate import Aggregate
+
+            aggregate = kwargs.pop("aggregate")
+            return Aggregate(self, aggregate)._subset(**kwargs).mutate()
+
         if "start" in kwargs or "end" in kwargs:
             start = kwargs.pop("start", None)
             end = kwargs.pop("end", None)
@@ -168,7 +237,7 @@ class Dataset:
             bbox = kwargs.pop("area")
             return Cropping(self, bbox)._subset(**kwargs).mutate()
 
-        if "number" in kwargs or "numbers" or "member" in kwargs or "members" in kwargs:
+        if "number" in kwargs or "numbers" in kwargs or "member" in kwargs or "members" in kwargs:
             from .ensemble import Number
 
             members = {}
@@ -178,6 +247,12 @@ class Dataset:
 
             return Number(self, **members)._subset(**kwargs).mutate()
 
+        if "normalise" in kwargs:
+            from .rescale import Normalise
+
+            normalise = kwargs.pop("normalise")
+            return Normalise(self, normalise)._subset(**kwargs).mutate()
+
         if "set_missing_dates" in kwargs:
             from .missing import MissingDates
 
@@ -196,6 +271,8 @@ class Dataset:
             if skip_missing_dates:
                 return SkipMissingDates(self, expected_access)._subset(**kwargs).mutate()
 
+            return self._subset(**kwargs).mutate()
+
         if "interpolate_frequency" in kwargs:
             from .interpolate import InterpolateFrequency
 
@@ -211,6 +288,8 @@ class Dataset:
             if shuffle:
                 return Subset(self, self._shuffle_indices(), dict(shuffle=True))._subset(**kwargs).mutate()
 
+            return self._subset(**kwargs).mutate()
+
         raise NotImplementedError("Unsupported arguments: " + ", ".join(kwargs))
 
     def _frequency_to_indices(self, frequency):
@@ -283,6 +362,242 @@ class Dataset:
     def dates_interval_to_indices(self, start, end):
         return self._dates_to_indices(start, end)
 
+    def read_into(self, out, index=slice(None)):
+        """Read `self[index]` directly into a caller-provided array, such as a pinned buffer.
+
+        Parameters
+        ----------
+        out : numpy.ndarray
+            The array to write into. It must have the shape and dtype of `self[index]`.
+        index : int, slice or tuple, optional
+            The index, as it would be passed to `__getitem__`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The `out` array.
+        """
+        from .indexing import index_to_slices
+
+        if out.dtype != self.dtype:
+            raise ValueError(f"read_into: expected dtype {self.dtype}, got {out.dtype}")
+
+        if isinstance(index, tuple) and any(isinstance(i, (list, tuple)) or hasattr(i, "tolist") for i in index):
+            # List indexing, no direct path
+            out[...] = self[index]
+            return out
+
+        index, changes = index_to_slices(index, self.shape)
+        shape = tuple(len(range(*s.indices(n))) for s, n in zip(index, self.shape))
+        expected = tuple(n for i, n in enumerate(shape) if i not in changes)
+
+        if out.shape != expected:
+            raise ValueError(f"read_into: expected shape {expected}, got {out.shape}")
+
+        self.read_into_slices(np.expand_dims(out, changes) if changes else out, index)
+        return out
+
+    def read_into_slices(self, out, index):
+        """Write the values selected by `index`, a tuple of slices with one slice per dimension, into `out`.
+        Override this method to avoid the temporary arrays created by `__getitem__`.
+        """
+        out[...] = self[index]
+
+    @property
+    def lazy(self):
+        """A deferred view of the dataset, computed in blocks of dates with bounded memory.
+
+        Slicing it and applying elementwise operations does not read anything. The values
+        are read by `compute()`, `to_numpy(out=...)` and reductions such as `mean(axis=0)`.
+
+        Returns
+        -------
+        LazyArray
+            The deferred array, with the shape and dtype of the dataset.
+        """
+        from .lazy import LazySource
+
+        return LazySource(self)
+
+    def to_dask(self):
+        """Return the dataset as a dask array, with one dask chunk per storage chunk of dates.
+
+        Each chunk is read through the dataset, so any combination of datasets can be exported.
+
+        Returns
+        -------
+        dask.array.Array
+            The dask array, with the shape and dtype of the dataset.
+        """
+        import dask.array as da
+
+        ids = self.date_chunk_ids()
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(ids)) + 1, [len(ids)]])
+        chunks = (tuple(int(n) for n in np.diff(bounds)),) + tuple((n,) for n in self.shape[1:])
+
+        return da.from_array(_DaskAdapter(self), chunks=chunks, name=False, lock=False, asarray=True, fancy=False)
+
+    def to_xarray(self):
+        """Return the dataset as an xarray DataArray backed by `to_dask()`.
+
+        Returns
+        -------
+        xarray.DataArray
+            The data array, with the dimensions "time", "variable", "ensemble" and "cell",
+            and the dates, variables, latitudes and longitudes as coordinates.
+        """
+        import xarray as xr
+
+        return xr.DataArray(
+            self.to_dask(),
+            dims=("time", "variable", "ensemble", "cell"),
+            coords=dict(
+                time=self.dates,
+                variable=self.variables,
+                latitude=("cell", self.latitudes),
+                longitude=("cell", self.longitudes),
+            ),
+            name="data",
+        )
+
+    async def aget(self, index):
+        """Asynchronous version of `self[index]`, that does not block the event loop.
+
+        Zarr reads are synchronous, so the read runs in the default executor of the loop.
+        Remote stores (HTTP and S3) fetch the chunks needed by the read, across the whole
+        tree, concurrently in a shared thread pool.
+
+        Parameters
+        ----------
+        index : int, slice or tuple
+            The index, as it would be passed to `__getitem__`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values.
+        """
+        import asyncio
+
+        return await asyncio.get_running_loop().run_in_executor(None, self.__getitem__, index)
+
+    async def aiter(self, indices, prefetch=2):
+        """Asynchronously iterate over `self[index]` for each index of `indices`, in order.
+
+        Parameters
+        ----------
+        indices : iterable
+            The indices to read, e.g. a list of batches.
+        prefetch : int, optional
+            The number of reads started ahead of the one being awaited.
+
+        Yields
+        ------
+        numpy.ndarray
+            The values.
+        """
+        import asyncio
+        from collections import deque
+
+        pending = deque()
+        try:
+            for index in indices:
+                pending.append(asyncio.ensure_future(self.aget(index)))
+                if len(pending) > prefetch:
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def partial_statistics(self):
+        """The sums, squares, count, minimum and maximum of each variable for each date, as computed
+        when the dataset was built. Override this method in the classes that can derive them from
+        those of the datasets they are built from.
+
+        Returns
+        -------
+        dict
+            Arrays of shape (dates, variables), for the keys "sums", "squares", "count", "minimum" and "maximum".
+        """
+        raise NotImplementedError(f"Partial statistics are not available for {self.__class__.__name__}")
+
+    @property
+    def exact_statistics(self):
+        """The statistics of the dates of this dataset, computed from the partial statistics stored
+        in the zarr without reading the data. Unlike `statistics`, which are those of the period
+        selected when the dataset was built, these match subsets of the dates exactly.
+        """
+        partial = self.partial_statistics()
+
+        count = partial["count"].sum(axis=0)
+        mean = partial["sums"].sum(axis=0) / count
+        variance = partial["squares"].sum(axis=0) / count - mean * mean
+
+        return dict(
+            mean=mean,
+            stdev=np.sqrt(np.maximum(variance, 0)),
+            minimum=np.nanmin(partial["minimum"], axis=0),
+            maximum=np.nanmax(partial["maximum"], axis=0),
+        )
+
+    def date_chunk_ids(self):
+        """For each date index, an identifier of the storage chunk the date is read from.
+        Dates that share an identifier are read together. Override this method when
+        the layout of the underlying store is known.
+        """
+        return np.arange(len(self))
+
+    def shard(self, rank, world_size, align="chunks"):
+        """Return the part of the dataset that a data-parallel rank should read.
+
+        Parameters
+        ----------
+        rank : int
+            The rank of the caller, between 0 and `world_size` - 1.
+        world_size : int
+            The number of data-parallel ranks.
+        align : str or None, optional
+            With "chunks", whole storage chunks are assigned to each rank, so that
+            no two ranks fetch the same chunk. With None, the dates are split
+            regardless of the storage layout.
+
+        Returns
+        -------
+        Dataset
+            A subset of the dataset, in the same order as the original.
+        """
+        from .subset import Subset
+
+        if not 0 <= rank < world_size:
+            raise ValueError(f"Invalid rank {rank} for world_size {world_size}")
+
+        if align not in ("chunks", None):
+            raise ValueError(f"Invalid value for `align`: {align}, expected 'chunks' or None")
+
+        ids = np.arange(len(self))
+        if align == "chunks":
+            ids = np.asarray(self.date_chunk_ids())
+            assert len(ids) == len(self), (len(ids), len(self))
+
+            if len(np.unique(ids)) < world_size:
+                LOG.warning(
+                    "Dataset %r has fewer date chunks than ranks (%s), shards will share chunks",
+                    self,
+                    world_size,
+                )
+                ids = np.arange(len(self))
+
+        owners = _balanced_owners(ids, self.missing, world_size)
+        indices = np.nonzero(owners == rank)[0].tolist()
+
+        if not indices:
+            raise ValueError(f"Shard {rank}/{world_size} of {self} is empty")
+
+        return Subset(self, indices, dict(shard=f"{rank}/{world_size}")).mutate()
+
     def provenance(self):
         return {}
 
@@ -440,6 +755,16 @@ class Dataset:
     def __repr__(self):
         return self.__class__.__name__ + "()"
 
+    def __getstate__(self):
+        """Return the state to pickle, e.g. when sending the dataset to DataLoader workers.
+
+        Values of cached properties (dates, shapes, derived statistics...) are not pickled,
+        they are recomputed on demand in the worker processes. Small precomputed artefacts
+        set in ``__init__``, such as masks and index arrays, are kept.
+        """
+        cached = {name for cls in type(self).__mro__ for name, v in vars(cls).items() if isinstance(v, cached_property)}
+        return {k: v for k, v in self.__dict__.items() if k not in cached}
+
     @property
     def grids(self):
         return (self.shape[-1],)
@@ -21,10 +21,28 @@ from .indexing import expand_list_indexing
 from .indexing import index_to_slices
 from .indexing import length_to_slices
 from .indexing import update_tuple
+from .parallel import map_children
 
 LOG = logging.getLogger(__name__)
 
 
+def read_into_along_axis(datasets, out, index, axis):
+    """Let each dataset write its part of `index` into its section of `out` along `axis`."""
+    lengths = [d.shape[axis] for d in datasets]
+    slices = length_to_slices(index[axis], lengths)
+    parts = []
+    pos = 0
+    for d, s in zip(datasets, slices):
+        if s is None:
+            continue
+        n = len(range(*s.indices(d.shape[axis])))
+        view, _ = update_tuple((slice(None),) * out.ndim, axis, slice(pos, pos + n))
+        parts.append((d, out[view], update_tuple(index, axis, s)[0]))
+        pos += n
+
+    map_children(lambda part: part[0].read_into_slices(part[1], part[2]), parts)
+
+
 class Forwards(Dataset):
     def __init__(self, forward):
         self.forward = forward.mutate()
@@ -118,6 +136,9 @@ class Forwards(Dataset):
     def source(self, index):
         return self.forward.source(index)
 
+    def date_chunk_ids(self):
+        return self.forward.date_chunk_ids()
+
     def subclass_metadata_specific(self):
         raise NotImplementedError(
             f"subclass_metadata_specific() must be implemented in derived class {self.__class__.__name__}"
@@ -220,6 +241,15 @@ class Combined(Forwards):
     def missing(self):
         raise NotImplementedError("missing() not implemented for Combined")
 
+    def date_chunk_ids(self):
+        # Two dates are in the same chunk if they are in the same chunk for any of the datasets
+        length = len(self)
+        boundaries = np.ones(max(0, length - 1), dtype=bool)
+        for d in self.datasets:
+            ids = np.asarray(d.date_chunk_ids())[:length]
+            boundaries &= ids[1:] != ids[:-1]
+        return np.concatenate([[0], np.cumsum(boundaries)])
+
     def get_dataset_names(self, names):
         for d in self.datasets:
             d.get_dataset_names(names)
@@ -256,7 +286,8 @@ class GivenAxis(Combined):
         index, changes = index_to_slices(index, self.shape)
         lengths = [d.shape[self.axis] for d in self.datasets]
         slices = length_to_slices(index[self.axis], lengths)
-        result = [d[update_tuple(index, self.axis, i)[0]] for (d, i) in zip(self.datasets, slices) if i is not None]
+        parts = [(d, update_tuple(index, self.axis, i)[0]) for (d, i) in zip(self.datasets, slices) if i is not None]
+        result = map_children(lambda part: part[0][part[1]], parts)
         result = np.concatenate(result, axis=self.axis)
         return apply_index_to_slices_changes(result, changes)
 
@@ -272,7 +303,10 @@ class GivenAxis(Combined):
         if isinstance(n, slice):
             return self._get_slice(n)
 
-        return np.concatenate([d[n] for d in self.datasets], axis=self.axis - 1)
+        return np.concatenate(map_children(lambda d: d[n], self.datasets), axis=self.axis - 1)
+
+    def read_into_slices(self, out, index):
+        read_into_along_axis(self.datasets, out, index, self.axis)
 
     @cached_property
     def missing(self):
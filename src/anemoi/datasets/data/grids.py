@@ -25,6 +25,7 @@ from .indexing import length_to_slices
 from .indexing import update_tuple
 from .misc import _auto_adjust
 from .misc import _open
+from .parallel import map_children
 
 LOG = logging.getLogger(__name__)
 
@@ -288,11 +289,10 @@ class Cutout(GridsBase):
                 index.
         """
         index, changes = index_to_slices(index, self.shape)
-        # Select data from each LAM
-        lam_data = [lam[index[:3]] for lam in self.lams]
+        # Select data from each LAM and from the globe
+        *lam_data, globe_data_sliced = map_children(lambda d: d[index[:3]], list(self.lams) + [self.globe])
 
-        # First apply spatial indexing on `self.globe` and then apply the mask
-        globe_data_sliced = self.globe[index[:3]]
+        # Spatial indexing has been applied on `self.globe`, now apply the mask
         globe_data = globe_data_sliced[..., self.global_mask]
 
         # Concatenate LAM data with global data, apply the grid slicing
@@ -300,6 +300,36 @@ class Cutout(GridsBase):
 
         return apply_index_to_slices_changes(result, changes)
 
+    def read_into_slices(self, out, index):
+        """Writes the data selected by `index` into `out`, without concatenating
+        intermediate arrays.
+
+        Args:
+            out (np.ndarray): Array to write into, with the full dimensionality
+                of the dataset.
+            index (tuple): Tuple of slices, one per dimension.
+        """
+        if index[3] != slice(0, self.shape[3], 1):
+            # Subsetting the grid, not worth optimising
+            out[...] = self[index]
+            return
+
+        parts = []
+        pos = 0
+        for lam in self.lams:
+            n = lam.shape[3]
+            parts.append((lam, out[..., pos : pos + n]))
+            pos += n
+
+        def read(part):
+            d, view = part
+            if d is self.globe:
+                np.take(d[index[:3]], np.flatnonzero(self.global_mask), axis=3, out=view, mode="clip")
+            else:
+                d.read_into_slices(view, index[:3] + (slice(0, d.shape[3], 1),))
+
+        map_children(read, parts + [(self.globe, out[..., pos:])])
+
     def collect_supporting_arrays(self, collected, *path):
         """Collects supporting arrays, including masks for each LAM and the global
         dataset.
@@ -113,6 +113,10 @@ class InterpolateFrequency(Forwards):
     def shape(self):
         return (self._len,) + self.forward.shape[1:]
 
+    def date_chunk_ids(self):
+        ids = np.asarray(self.forward.date_chunk_ids())
+        return ids[np.arange(self._len) // self.ratio]
+
     def tree(self):
         return Node(self, [self.forward.tree()], frequency=self.frequency)
 
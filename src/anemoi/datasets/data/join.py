@@ -17,12 +17,14 @@ from .debug import Node
 from .debug import Source
 from .debug import debug_indexing
 from .forwards import Combined
+from .forwards import read_into_along_axis
 from .indexing import apply_index_to_slices_changes
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
 from .indexing import update_tuple
 from .misc import _auto_adjust
 from .misc import _open
+from .parallel import map_children
 
 LOG = logging.getLogger(__name__)
 
@@ -48,7 +50,7 @@ class Join(Combined):
         index, previous = update_tuple(index, 1, slice(None))
 
         # TODO: optimize if index does not access all datasets, so we don't load chunks we don't need
-        result = [d[index] for d in self.datasets]
+        result = map_children(lambda d: d[index], self.datasets)
 
         result = np.concatenate(result, axis=1)
         return apply_index_to_slices_changes(result[:, previous], changes)
@@ -65,7 +67,10 @@ class Join(Combined):
         if isinstance(n, slice):
             return self._get_slice(n)
 
-        return np.concatenate([d[n] for d in self.datasets])
+        return np.concatenate(map_children(lambda d: d[n], self.datasets))
+
+    def read_into_slices(self, out, index):
+        read_into_along_axis(self.datasets, out, index, 1)
 
     @cached_property
     def shape(self):
@@ -153,6 +158,10 @@ class Join(Combined):
             for k in self.datasets[0].statistics_tendencies(delta)
         }
 
+    def partial_statistics(self):
+        partial = [d.partial_statistics() for d in self.datasets]
+        return {k: np.concatenate([p[k] for p in partial], axis=1) for k in partial[0]}
+
     def source(self, index):
         i = index
         for dataset in self.datasets:
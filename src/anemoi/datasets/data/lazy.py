@@ -0,0 +1,356 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""Deferred arrays over datasets, computed in blocks of dates with bounded memory.
+
+``ds.lazy`` is a :class:`LazyArray` with the shape and dtype of ``ds``. Slicing it and
+applying elementwise operations builds new lazy arrays without reading anything. Values
+are only read by :meth:`LazyArray.compute`, :meth:`LazyArray.to_numpy` and the reductions,
+which process the first axis in blocks of at most `BLOCK_BYTES` bytes.
+"""
+
+import logging
+import math
+
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+# Maximum size of the blocks read at once
+BLOCK_BYTES = 256 * 1024 * 1024
+
+
+def _expand(key, ndim):
+    """Return `key` as a tuple with one int or slice per dimension."""
+    if not isinstance(key, tuple):
+        key = (key,)
+
+    for k in key:
+        if not (k is Ellipsis or isinstance(k, (int, np.integer, slice))):
+            raise TypeError(f"Lazy arrays only support integers and slices, not {k!r}")
+
+    if key.count(Ellipsis) > 1:
+        raise IndexError("Only one Ellipsis is allowed")
+
+    if Ellipsis in key:
+        i = key.index(Ellipsis)
+        key = key[:i] + (slice(None),) * (ndim - len(key) + 1) + key[i + 1 :]
+
+    if len(key) > ndim:
+        raise IndexError(f"Too many indices for a lazy array with {ndim} dimensions")
+
+    return tuple(int(k) if isinstance(k, np.integer) else k for k in key) + (slice(None),) * (ndim - len(key))
+
+
+def _as_slice(r):
+    return slice(r.start, r.stop, r.step)
+
+
+class LazyArray:
+    """A deferred array. Subclasses implement `_get`, which returns the values for a slice of the first axis."""
+
+    shape = ()
+    dtype = None
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return math.prod(self.shape)
+
+    @property
+    def nbytes(self):
+        return self.size * np.dtype(self.dtype).itemsize
+
+    def __len__(self):
+        if not self.shape:
+            raise TypeError("len() of a 0-d lazy array")
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(shape={self.shape}, dtype={np.dtype(self.dtype)})"
+
+    def _get(self, rows):
+        raise NotImplementedError()
+
+    def _blocks(self):
+        """Yield slices of the first axis, each selecting at most `BLOCK_BYTES` bytes."""
+        if not self.shape:
+            yield None
+            return
+
+        row = max(1, self.nbytes // max(self.shape[0], 1))
+        step = max(1, BLOCK_BYTES // row)
+        for start in range(0, self.shape[0], step):
+            yield slice(start, min(start + step, self.shape[0]))
+
+    # Evaluation
+
+    def to_numpy(self, out=None):
+        """Compute the values, block by block.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            The array to write into, with the shape of the lazy array.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values.
+        """
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+
+        if out.shape != self.shape:
+            raise ValueError(f"to_numpy: expected shape {self.shape}, got {out.shape}")
+
+        for rows in self._blocks():
+            self._write(out, rows)
+
+        return out
+
+    def _write(self, out, rows):
+        if rows is None:
+            out[...] = self._get(None)
+        else:
+            out[rows] = self._get(rows)
+
+    def compute(self):
+        """Compute the values, block by block, and return them as a numpy array."""
+        return self.to_numpy()
+
+    def __array__(self, dtype=None, copy=None):
+        result = self.compute()
+        return result if dtype is None else result.astype(dtype)
+
+    # Composition
+
+    def __getitem__(self, key):
+        raise NotImplementedError()
+
+    def astype(self, dtype):
+        return LazyElementwise(lambda x: x.astype(dtype), [self], dtype=dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs or ufunc.nout != 1:
+            return NotImplemented
+        return LazyElementwise(ufunc, inputs)
+
+    def __add__(self, other):
+        return LazyElementwise(np.add, [self, other])
+
+    def __radd__(self, other):
+        return LazyElementwise(np.add, [other, self])
+
+    def __sub__(self, other):
+        return LazyElementwise(np.subtract, [self, other])
+
+    def __rsub__(self, other):
+        return LazyElementwise(np.subtract, [other, self])
+
+    def __mul__(self, other):
+        return LazyElementwise(np.multiply, [self, other])
+
+    def __rmul__(self, other):
+        return LazyElementwise(np.multiply, [other, self])
+
+    def __truediv__(self, other):
+        return LazyElementwise(np.true_divide, [self, other])
+
+    def __rtruediv__(self, other):
+        return LazyElementwise(np.true_divide, [other, self])
+
+    def __pow__(self, other):
+        return LazyElementwise(np.power, [self, other])
+
+    def __neg__(self):
+        return LazyElementwise(np.negative, [self])
+
+    def __abs__(self):
+        return LazyElementwise(np.absolute, [self])
+
+    # Reductions, streamed over the blocks of the first axis
+
+    def _axes(self, axis):
+        if axis is None:
+            return tuple(range(self.ndim))
+        if isinstance(axis, int):
+            axis = (axis,)
+        if any(not -self.ndim <= a < self.ndim for a in axis):
+            raise ValueError(f"axis {axis} is out of bounds for a lazy array of dimension {self.ndim}")
+        return tuple(sorted(set(a % self.ndim for a in axis)))
+
+    def _reduce(self, axis, partial, combine, finish):
+        axes = self._axes(axis)
+
+        if self.ndim == 0:
+            return finish(partial(np.asarray(self._get(None)), axes))
+
+        if self.shape[0] == 0:
+            return np.squeeze(finish(partial(np.empty(self.shape, dtype=self.dtype), axes)), axis=axes)
+
+        result = None
+        parts = []
+        for rows in self._blocks():
+            values = partial(self._get(rows), axes)
+            if 0 in axes:
+                result = values if result is None else combine(result, values)
+            else:
+                parts.append(finish(values))
+
+        if 0 in axes:
+            result = finish(result)
+        else:
+            result = np.concatenate(parts, axis=0)
+
+        return np.squeeze(result, axis=axes)
+
+    def sum(self, axis=None):
+        return self._reduce(
+            axis,
+            lambda x, axes: np.sum(x, axis=axes, keepdims=True),
+            np.add,
+            lambda x: x,
+        )
+
+    def min(self, axis=None):
+        return self._reduce(
+            axis,
+            lambda x, axes: np.min(x, axis=axes, keepdims=True),
+            np.minimum,
+            lambda x: x,
+        )
+
+    def max(self, axis=None):
+        return self._reduce(
+            axis,
+            lambda x, axes: np.max(x, axis=axes, keepdims=True),
+            np.maximum,
+            lambda x: x,
+        )
+
+    def mean(self, axis=None):
+        return self._moments(axis, ddof=None)
+
+    def var(self, axis=None, ddof=0):
+        return self._moments(axis, ddof=ddof)
+
+    def std(self, axis=None, ddof=0):
+        return np.sqrt(self.var(axis, ddof=ddof))
+
+    def _moments(self, axis, ddof):
+        """Return the mean, or the variance if `ddof` is not None. The moments of the blocks are
+        combined with the pairwise algorithm of Chan et al., which is numerically stable.
+        """
+
+        def partial(x, axes):
+            count = math.prod(x.shape[a] for a in axes)
+            mean = np.mean(x, axis=axes, keepdims=True, dtype=np.float64)
+            m2 = np.sum(np.square(x - mean), axis=axes, keepdims=True) if ddof is not None else 0
+            return count, mean, m2
+
+        def combine(a, b):
+            na, mean_a, m2_a = a
+            nb, mean_b, m2_b = b
+            n = na + nb
+            delta = mean_b - mean_a
+            return n, mean_a + delta * nb / n, m2_a + m2_b + np.square(delta) * na * nb / n
+
+        def finish(x):
+            n, mean, m2 = x
+            if ddof is None:
+                return mean
+            return m2 / max(n - ddof, 0)
+
+        return self._reduce(axis, partial, combine, finish)
+
+
+class LazySource(LazyArray):
+    """The values of a dataset, selected by a tuple with an int or a slice per dimension of the dataset."""
+
+    def __init__(self, dataset, index=None):
+        self.dataset = dataset
+        if index is None:
+            index = tuple(slice(0, n, 1) for n in dataset.shape)
+        self.index = index
+        # The dimensions of the dataset that are kept
+        self.axes = [d for d, i in enumerate(index) if isinstance(i, slice)]
+        self.shape = tuple(len(range(*index[d].indices(dataset.shape[d]))) for d in self.axes)
+        self.dtype = dataset.dtype
+
+    def __getitem__(self, key):
+        key = _expand(key, self.ndim)
+        index = list(self.index)
+        for d, k in zip(self.axes, key):
+            r = range(*index[d].indices(self.dataset.shape[d]))[k]
+            if isinstance(r, range) and r.step < 0:
+                raise IndexError("Lazy arrays do not support negative steps")
+            index[d] = _as_slice(r) if isinstance(r, range) else r
+        return LazySource(self.dataset, tuple(index))
+
+    def _index(self, rows):
+        if rows is None:
+            return self.index
+        d = self.axes[0]
+        index = list(self.index)
+        index[d] = _as_slice(range(*index[d].indices(self.dataset.shape[d]))[rows])
+        return tuple(index)
+
+    def _get(self, rows):
+        return self.dataset[self._index(rows)]
+
+    def _write(self, out, rows):
+        if out.dtype != self.dtype:
+            return super()._write(out, rows)
+        # No temporary arrays
+        view = out if rows is None else out[rows]
+        self.dataset.read_into(view, self._index(rows))
+
+
+class LazyElementwise(LazyArray):
+    """An elementwise function of lazy arrays of the same shape and of constants broadcast to that shape."""
+
+    def __init__(self, func, operands, dtype=None):
+        self.func = func
+        # Python scalars are kept as they are, so that they do not change the dtype of the result
+        self.operands = [o if isinstance(o, (LazyArray, int, float, complex)) else np.asarray(o) for o in operands]
+
+        self.shape = np.broadcast_shapes(*[np.shape(o) for o in self.operands])
+        for o in self.operands:
+            if isinstance(o, LazyArray) and o.shape != self.shape:
+                raise ValueError(f"Lazy arrays must have the same shape, got {o.shape} and {self.shape}")
+
+        if dtype is None:
+            dtype = np.asarray(func(*[self._sample(o) for o in self.operands])).dtype
+        self.dtype = np.dtype(dtype)
+
+    @staticmethod
+    def _sample(o):
+        if isinstance(o, LazyArray):
+            return np.ones(1, dtype=o.dtype)
+        if isinstance(o, np.ndarray):
+            return o.ravel()[:1]
+        return o
+
+    def _constant(self, o, key):
+        if isinstance(o, np.ndarray) and key is not None:
+            return np.broadcast_to(o, self.shape)[key]
+        return o
+
+    def __getitem__(self, key):
+        key = _expand(key, self.ndim)
+        operands = [o[key] if isinstance(o, LazyArray) else self._constant(o, key) for o in self.operands]
+        return LazyElementwise(self.func, operands, dtype=self.dtype)
+
+    def _get(self, rows):
+        values = [o._get(rows) if isinstance(o, LazyArray) else self._constant(o, rows) for o in self.operands]
+        return np.asarray(self.func(*values), dtype=self.dtype)
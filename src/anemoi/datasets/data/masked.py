@@ -69,6 +69,11 @@ class Masked(Forwards):
         result = apply_index_to_slices_changes(result, changes)
         return result
 
+    def read_into_slices(self, out, index):
+        positions = np.flatnonzero(self.mask)[index[self.axis]]
+        result = self.forward[update_tuple(index, self.axis, slice(None))[0]]
+        np.take(result, positions, axis=self.axis, out=out, mode="clip")
+
     def collect_supporting_arrays(self, collected, *path):
         super().collect_supporting_arrays(collected, *path)
         collected.append((path, self.mask_name, self.mask))
@@ -119,6 +119,21 @@ class Merge(Combined):
 
         return result
 
+    def date_chunk_ids(self):
+        offsets = [0]
+        ids = []
+        for d in self.datasets:
+            ids.append(np.asarray(d.date_chunk_ids()))
+            offsets.append(offsets[-1] + (ids[-1].max() + 1 if len(ids[-1]) else 0))
+
+        result = []
+        for dataset, row in self._indices:
+            if dataset == self._missing_index:
+                result.append(offsets[-1] + len(result))
+            else:
+                result.append(offsets[dataset] + ids[dataset][row])
+        return np.array(result)
+
     def check_same_lengths(self, d1, d2):
         # Turned off because we are concatenating along the first axis
         pass
@@ -171,7 +171,6 @@ def _concat_or_join(datasets, kwargs):
 
 def _open(a):
     from .stores import Zarr
-    from .stores import zarr_lookup
 
     if isinstance(a, Dataset):
         return a.mutate()
@@ -180,7 +179,7 @@ def _open(a):
         return Zarr(a).mutate()
 
     if isinstance(a, str):
-        return Zarr(zarr_lookup(a)).mutate()
+        return Zarr.from_name(a).mutate()
 
     if isinstance(a, PurePath):
         return _open(str(a)).mutate()
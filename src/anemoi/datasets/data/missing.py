@@ -199,6 +199,15 @@ class SkipMissingDates(Forwards):
     def frequency(self):
         return self.forward.frequency
 
+    @property
+    def missing(self):
+        # By construction, none of the selected windows contains a missing date
+        return set()
+
+    def date_chunk_ids(self):
+        ids = np.asarray(self.forward.date_chunk_ids())
+        return ids[[i[0] for i in self.indices]]
+
     def tree(self):
         return Node(self, [self.forward.tree()], expected_access=self.expected_access)
 
@@ -236,6 +245,9 @@ class MissingDataset(Forwards):
     def __getitem__(self, n):
         raise MissingDateError(f"Date {self.dates[n]} is missing (index={n})")
 
+    def date_chunk_ids(self):
+        return np.zeros(len(self), dtype=int)
+
     def tree(self):
         return Node(self, [self.forward.tree()], start=self.start, end=self.end)
 
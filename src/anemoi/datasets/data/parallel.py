@@ -0,0 +1,79 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+LOG = logging.getLogger(__name__)
+
+# The thread pools used to read the children of combined datasets, by number of threads
+EXECUTORS = {}
+LOCK = threading.Lock()
+LOCAL = threading.local()
+
+
+def _reset():
+    # Threads are not inherited by forked processes
+    global EXECUTORS, LOCK
+    EXECUTORS = {}
+    LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def _executor(threads):
+    with LOCK:
+        if threads not in EXECUTORS:
+            EXECUTORS[threads] = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="anemoi-datasets-read")
+        return EXECUTORS[threads]
+
+
+@contextmanager
+def parallel_reads(threads):
+    """Read the children of the combined datasets concurrently, with `threads` threads, in the
+    current thread until the context exits. 0 reads them one after the other.
+    """
+    previous = getattr(LOCAL, "threads", 0)
+    LOCAL.threads = threads
+    try:
+        yield
+    finally:
+        LOCAL.threads = previous
+
+
+def _nested(func):
+    def wrapped(item):
+        LOCAL.nested = True
+        try:
+            return func(item)
+        finally:
+            LOCAL.nested = False
+
+    return wrapped
+
+
+def map_children(func, items):
+    """Return ``[func(item) for item in items]``, calling `func` concurrently if parallel reads are enabled.
+
+    Only the outermost combined dataset of a tree fans out, reads of nested combinations
+    run in the calling thread, so that a tree never uses more than the threads set with
+    :func:`parallel_reads`.
+    """
+    items = list(items)
+    threads = getattr(LOCAL, "threads", 0)
+    if threads < 1 or len(items) < 2 or getattr(LOCAL, "nested", False):
+        return [func(item) for item in items]
+
+    return list(_executor(threads).map(_nested(func), items))
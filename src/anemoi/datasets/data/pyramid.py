@@ -0,0 +1,112 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+from functools import cached_property
+
+import numpy as np
+
+from . import MissingDateError
+from .debug import Node
+from .debug import debug_indexing
+from .forwards import Forwards
+from .indexing import expand_list_indexing
+from .stores import Zarr
+
+LOG = logging.getLogger(__name__)
+
+
+class Level(Forwards):
+    """A coarsened level of the pyramid stored in a zarr dataset, see ``anemoi-datasets pyramid``.
+
+    The dates, variables and statistics are those of the dataset, the grid is that of the level.
+    """
+
+    def __init__(self, dataset, level):
+        super().__init__(dataset)
+
+        if not isinstance(self.forward, Zarr):
+            raise ValueError(f"Level: `level` can only be used on a dataset opened from a zarr, not {self.forward}")
+
+        self.level = int(level)
+
+        if f"pyramid_{self.level}_data" not in self.forward.z:
+            available = sorted(
+                int(k.split("_")[1])
+                for k in self.forward.z.array_keys()
+                if k.startswith("pyramid_") and k.endswith("_data")
+            )
+            raise ValueError(f"Level: no level {self.level} in {self.forward}, available levels are {available}")
+
+    @cached_property
+    def data(self):
+        return self.forward.z[f"pyramid_{self.level}_data"]
+
+    @cached_property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def grids(self):
+        return (self.shape[-1],)
+
+    @property
+    def latitudes(self):
+        return self.forward.metadata_cache.get(
+            f"pyramid_{self.level}_latitudes",
+            lambda: self.forward.z[f"pyramid_{self.level}_latitudes"][:],
+        )
+
+    @property
+    def longitudes(self):
+        return self.forward.metadata_cache.get(
+            f"pyramid_{self.level}_longitudes",
+            lambda: self.forward.z[f"pyramid_{self.level}_longitudes"][:],
+        )
+
+    @property
+    def field_shape(self):
+        return tuple(self.data.attrs.get("field_shape", (self.shape[-1],)))
+
+    @property
+    def resolution(self):
+        return self.data.attrs["resolution"]
+
+    def date_chunk_ids(self):
+        return np.arange(len(self)) // self.data.chunks[0]
+
+    def _check_missing(self, first):
+        if isinstance(first, int):
+            dates = {first % len(self)}
+        elif isinstance(first, slice):
+            dates = set(range(*first.indices(len(self))))
+        else:
+            dates = set(first)
+
+        common = dates & self.missing
+        if common:
+            n = min(common)
+            raise MissingDateError(f"Date {self.dates[n]} is missing (index={n})")
+
+    @debug_indexing
+    @expand_list_indexing
+    def __getitem__(self, n):
+        self._check_missing(n[0] if isinstance(n, tuple) else n)
+        return self.data[n]
+
+    def read_into_slices(self, out, index):
+        self._check_missing(index[0])
+        self.data.get_basic_selection(index, out=out)
+
+    def tree(self):
+        return Node(self, [self.forward.tree()], level=self.level)
+
+    def subclass_metadata_specific(self):
+        return {"level": self.level}
@@ -0,0 +1,43 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+
+from .debug import Node
+from .debug import debug_indexing
+from .forwards import Forwards
+from .parallel import parallel_reads
+
+LOG = logging.getLogger(__name__)
+
+
+class ReadThreads(Forwards):
+    """Read the children of the combined datasets of the tree concurrently, with at most `threads` threads."""
+
+    def __init__(self, dataset, threads):
+        super().__init__(dataset)
+        if not isinstance(threads, int) or threads < 0:
+            raise ValueError(f"read_threads must be a positive integer, got {threads!r}")
+        self.threads = threads
+
+    @debug_indexing
+    def __getitem__(self, n):
+        with parallel_reads(self.threads):
+            return self.forward[n]
+
+    def read_into_slices(self, out, index):
+        with parallel_reads(self.threads):
+            self.forward.read_into_slices(out, index)
+
+    def tree(self):
+        return Node(self, [self.forward.tree()], threads=self.threads)
+
+    def subclass_metadata_specific(self):
+        return {"read_threads": self.threads}
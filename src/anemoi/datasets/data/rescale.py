@@ -19,7 +19,6 @@ from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
-from .indexing import update_tuple
 
 LOG = logging.getLogger(__name__)
 
@@ -56,47 +55,33 @@ def make_rescale(variable, rescale):
     assert False
 
 
-class Rescale(Forwards):
-    def __init__(self, dataset, rescale):
-        super().__init__(dataset)
-        for n in rescale:
-            assert n in dataset.variables, n
-
-        variables = dataset.variables
-
-        self._a = np.ones(len(variables))
-        self._b = np.zeros(len(variables))
-
-        self.rescale = {}
-        for i, v in enumerate(variables):
-            if v in rescale:
-                a, b = make_rescale(v, rescale[v])
-                self.rescale[v] = a, b
-                self._a[i], self._b[i] = a, b
-
-        self._a = self._a[np.newaxis, :, np.newaxis, np.newaxis]
-        self._b = self._b[np.newaxis, :, np.newaxis, np.newaxis]
+class Affine(Forwards):
+    """Apply a per-variable affine transform `a * x + b` to the values, in place in the
+    buffers given to :meth:`read_into`.
+    """
 
-        self._a = self._a.astype(self.forward.dtype)
-        self._b = self._b.astype(self.forward.dtype)
-
-    def tree(self):
-        return Node(self, [self.forward.tree()], rescale=self.rescale)
+    def __init__(self, dataset, a, b):
+        super().__init__(dataset)
 
-    def subclass_metadata_specific(self):
-        return dict(rescale=self.rescale)
+        self._a = np.asarray(a)[np.newaxis, :, np.newaxis, np.newaxis].astype(self.forward.dtype)
+        self._b = np.asarray(b)[np.newaxis, :, np.newaxis, np.newaxis].astype(self.forward.dtype)
 
     @debug_indexing
     @expand_list_indexing
     def _get_tuple(self, index):
         index, changes = index_to_slices(index, self.shape)
-        index, previous = update_tuple(index, 1, slice(None))
+        # Only transform the variables that are requested
         result = self.forward[index]
-        result = result * self._a + self._b
-        result = result[:, previous]
+        result = result * self._a[:, index[1]] + self._b[:, index[1]]
         result = apply_index_to_slices_changes(result, changes)
         return result
 
+    def read_into_slices(self, out, index):
+        # `out` belongs to the caller, it can be transformed in place
+        self.forward.read_into_slices(out, index)
+        out *= self._a[:, index[1]]
+        out += self._b[:, index[1]]
+
     @debug_indexing
     def __get_slice_(self, n):
         data = self.forward[n]
@@ -112,23 +97,28 @@ class Rescale(Forwards):
             return self.__get_slice_(n)
 
         data = self.forward[n]
-
         return data * self._a[0] + self._b[0]
 
     @cached_property
     def statistics(self):
         result = {}
-        a = self._a.squeeze()
-        assert np.all(a >= 0)
+        a = self._a.squeeze(axis=(0, 2, 3))
+        b = self._b.squeeze(axis=(0, 2, 3))
 
-        b = self._b.squeeze()
-        for k, v in self.forward.statistics.items():
-            if k in ("maximum", "minimum", "mean"):
+        stats = self.forward.statistics
+        for k, v in stats.items():
+            if k == "mean":
                 result[k] = v * a + b
                 continue
 
+            if k in ("maximum", "minimum"):
+                # A negative scale swaps the extremes
+                other = stats["minimum" if k == "maximum" else "maximum"]
+                result[k] = np.where(a >= 0, v, other) * a + b
+                continue
+
             if k in ("stdev",):
-                result[k] = v * a
+                result[k] = v * np.abs(a)
                 continue
 
             raise NotImplementedError("rescale statistics", k)
@@ -137,14 +127,170 @@ class Rescale(Forwards):
 
     def statistics_tendencies(self, delta=None):
         result = {}
-        a = self._a.squeeze()
-        assert np.all(a >= 0)
+        a = self._a.squeeze(axis=(0, 2, 3))
 
-        for k, v in self.forward.statistics_tendencies(delta).items():
-            if k in ("maximum", "minimum", "mean", "stdev"):
+        stats = self.forward.statistics_tendencies(delta)
+        for k, v in stats.items():
+            if k == "mean":
                 result[k] = v * a
                 continue
 
+            if k in ("maximum", "minimum"):
+                other = stats["minimum" if k == "maximum" else "maximum"]
+                result[k] = np.where(a >= 0, v, other) * a
+                continue
+
+            if k in ("stdev",):
+                result[k] = v * np.abs(a)
+                continue
+
             raise NotImplementedError("rescale tendencies statistics", k)
 
         return result
+
+    def partial_statistics(self):
+        a = self._a.squeeze(axis=(0, 2, 3)).astype(np.float64)
+        b = self._b.squeeze(axis=(0, 2, 3)).astype(np.float64)
+
+        partial = self.forward.partial_statistics()
+        count, sums, squares = partial["count"], partial["sums"], partial["squares"]
+
+        return dict(
+            sums=a * sums + b * count,
+            squares=a * a * squares + 2 * a * b * sums + b * b * count,
+            count=count,
+            minimum=np.where(a >= 0, partial["minimum"], partial["maximum"]) * a + b,
+            maximum=np.where(a >= 0, partial["maximum"], partial["minimum"]) * a + b,
+        )
+
+
+class Rescale(Affine):
+    def __init__(self, dataset, rescale):
+        for n in rescale:
+            assert n in dataset.variables, n
+
+        variables = dataset.variables
+
+        a = np.ones(len(variables))
+        b = np.zeros(len(variables))
+
+        self.rescale = {}
+        for i, v in enumerate(variables):
+            if v in rescale:
+                self.rescale[v] = make_rescale(v, rescale[v])
+                a[i], b[i] = self.rescale[v]
+
+        super().__init__(dataset, a, b)
+
+    def tree(self):
+        return Node(self, [self.forward.tree()], rescale=self.rescale)
+
+    def subclass_metadata_specific(self):
+        return dict(rescale=self.rescale)
+
+
+NORMALISERS = {
+    "mean-std": lambda s: (s["stdev"], s["mean"]),
+    "std": lambda s: (s["stdev"], 0.0),
+    "min-max": lambda s: (s["maximum"] - s["minimum"], s["minimum"]),
+    "max": lambda s: (s["maximum"], 0.0),
+    "none": lambda s: (1.0, 0.0),
+}
+
+
+def make_normalise(variable, method, statistics):
+    """Returns the scale and offset such that `scale * x + offset` normalises a variable."""
+    if method not in NORMALISERS:
+        raise ValueError(f"Invalid normalisation '{method}' for '{variable}', expected one of {list(NORMALISERS)}")
+
+    divisor, shift = NORMALISERS[method](statistics)
+
+    if divisor == 0:
+        LOG.warning("Cannot normalise '%s' with '%s' (zero divisor), only shifting it", variable, method)
+        divisor = 1.0
+
+    return 1.0 / divisor, -shift / divisor
+
+
+class Normalise(Affine):
+    """Normalise the variables using the statistics of the dataset. If the dataset is rescaled,
+    the two transforms are folded into a single one.
+    """
+
+    def __init__(self, dataset, normalise):
+        if isinstance(normalise, str):
+            normalise = {"default": normalise}
+
+        for n in normalise:
+            assert n == "default" or n in dataset.variables, n
+
+        self.normalise = normalise
+
+        # The statistics are already rescaled, if applicable
+        stats = dataset.statistics
+
+        self.rescale = {}
+        variables = dataset.variables
+        a = np.ones(len(variables))
+        b = np.zeros(len(variables))
+
+        for i, v in enumerate(variables):
+            method = normalise.get(v, normalise.get("default", "none"))
+            a[i], b[i] = make_normalise(v, method, {k: s[i] for k, s in stats.items()})
+
+        # Only the normalisation is undone by `denormalise`
+        self._inverse_a = a[:, np.newaxis, np.newaxis].astype(dataset.dtype)
+        self._inverse_b = b[:, np.newaxis, np.newaxis].astype(dataset.dtype)
+
+        if isinstance(dataset, Rescale):
+            # Fold the rescaling: a * (ra * x + rb) + b
+            ra = dataset._a.squeeze(axis=(0, 2, 3))
+            rb = dataset._b.squeeze(axis=(0, 2, 3))
+            a, b = a * ra, a * rb + b
+            self.rescale = dataset.rescale
+            dataset = dataset.forward
+
+        super().__init__(dataset, a, b)
+
+    def denormalise(self, values, out=None, axis=None):
+        """Undo the normalisation, for example to convert predictions back to physical values.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Normalised values, with the shape of `self[i]` (variables, ensembles, values)
+            or of `self[i:j]` (dates, variables, ensembles, values), or any shape if `axis`
+            is given.
+        out : numpy.ndarray, optional
+            Where to write the result. Use `out=values` to denormalise in place.
+        axis : int, optional
+            The axis of the variables in `values`.
+
+        Returns
+        -------
+        numpy.ndarray
+            The denormalised values.
+        """
+        if axis is None:
+            if values.ndim not in (3, 4):
+                raise ValueError(
+                    f"Cannot tell the axis of the variables of an array of shape {values.shape}, use `axis`"
+                )
+            axis = values.ndim - 3
+
+        if values.shape[axis] != len(self.variables):
+            raise ValueError(f"Expected {len(self.variables)} variables along axis {axis}, got shape {values.shape}")
+
+        shape = [1] * values.ndim
+        shape[axis] = -1
+        a, b = self._inverse_a.reshape(shape), self._inverse_b.reshape(shape)
+
+        out = np.subtract(values, b, out=out)
+        out /= a
+        return out
+
+    def tree(self):
+        return Node(self, [self.forward.tree()], normalise=self.normalise, rescale=self.rescale)
+
+    def subclass_metadata_specific(self):
+        return dict(normalise=self.normalise, rescale=self.rescale)
@@ -18,6 +18,7 @@ from .forwards import Forwards
 from .indexing import apply_index_to_slices_changes
 from .indexing import expand_list_indexing
 from .indexing import index_to_slices
+from .indexing import make_slice_or_index_from_list_or_tuple
 from .indexing import update_tuple
 
 LOG = logging.getLogger(__name__)
@@ -71,6 +72,17 @@ class Select(Forwards):
 
         return row[self.indices]
 
+    def read_into_slices(self, out, index):
+        columns = [self.indices[i] for i in range(*index[1].indices(len(self.indices)))]
+        columns = make_slice_or_index_from_list_or_tuple(columns)
+
+        if isinstance(columns, slice):
+            self.dataset.read_into_slices(out, update_tuple(index, 1, columns)[0])
+            return
+
+        for i, c in enumerate(columns):
+            self.dataset.read_into_slices(out[:, i : i + 1], update_tuple(index, 1, slice(c, c + 1))[0])
+
     @cached_property
     def shape(self):
         return (len(self), len(self.indices)) + self.dataset.shape[2:]
@@ -96,6 +108,9 @@ class Select(Forwards):
             delta = self.frequency
         return {k: v[self.indices] for k, v in self.dataset.statistics_tendencies(delta).items()}
 
+    def partial_statistics(self):
+        return {k: v[:, self.indices] for k, v in self.dataset.partial_statistics().items()}
+
     def metadata_specific(self, **kwargs):
         return super().metadata_specific(indices=self.indices, **kwargs)
 
@@ -133,6 +148,12 @@ class Rename(Forwards):
     def name_to_index(self):
         return {k: i for i, k in enumerate(self.variables)}
 
+    def read_into_slices(self, out, index):
+        self.forward.read_into_slices(out, index)
+
+    def partial_statistics(self):
+        return self.forward.partial_statistics()
+
     def tree(self):
         return Node(self, [self.forward.tree()], rename=self.rename)
 
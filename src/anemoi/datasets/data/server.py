@@ -0,0 +1,339 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""A reader service that serves the samples of a dataset to the processes of a node.
+
+The server owns the dataset tree, reads each requested sample once into a slot of a
+shared-memory buffer, and lets clients attach to that buffer by name. Slots are reference
+counted: a sample read for one client is shared with the other clients that ask for it
+while it is held, and is only overwritten once released. When all the slots are held,
+requests wait until a slot is released.
+"""
+
+import logging
+import multiprocessing
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client
+from multiprocessing.connection import Listener
+
+import numpy as np
+
+LOG = logging.getLogger(__name__)
+
+
+def _address(name):
+    # Linux abstract namespace, so that no socket file is left behind
+    return f"\0anemoi-datasets-{name}"
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    shm = shared_memory.SharedMemory(name=name)
+    # Only the server may unlink the memory
+    from multiprocessing import resource_tracker
+
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class _Slots:
+    """The reference-counted slots of the shared-memory buffer."""
+
+    def __init__(self, dataset, buffer):
+        self.dataset = dataset
+        self.buffer = buffer
+        self.condition = threading.Condition()
+
+        self.refcount = [0] * len(buffer)
+        self.index_of_slot = [None] * len(buffer)
+        self.slot_of_index = {}
+        self.loading = set()
+        # Released slots, least recently used first. Their content is kept until reused
+        self.free = OrderedDict((slot, None) for slot in range(len(buffer)))
+
+    def acquire(self, indices):
+        """Return the slots holding the samples at `indices`, reading the ones not already in memory.
+
+        All the slots of a batch are taken at once, so that clients waiting for slots cannot
+        deadlock each other.
+        """
+        wanted = set(indices)
+        if len(wanted) > len(self.buffer):
+            raise ValueError(f"Cannot serve {len(wanted)} samples with {len(self.buffer)} slots")
+
+        with self.condition:
+            while True:
+                missing = [i for i in wanted if i not in self.slot_of_index]
+                available = [s for s in self.free if self.index_of_slot[s] not in wanted]
+                if len(missing) <= len(available):
+                    break
+                # Back-pressure: wait for clients to release slots
+                self.condition.wait()
+
+            reading = list(zip(missing, available))
+            for index, slot in reading:
+                self.slot_of_index.pop(self.index_of_slot[slot], None)
+                self.index_of_slot[slot] = index
+                self.slot_of_index[index] = slot
+                self.loading.add(slot)
+
+            slots = [self.slot_of_index[i] for i in indices]
+            for slot in slots:
+                self.free.pop(slot, None)
+                self.refcount[slot] += 1
+
+        error = None
+        for index, slot in reading:
+            try:
+                self.dataset.read_into(self.buffer[slot], index)
+            except Exception as e:
+                error = e
+                with self.condition:
+                    del self.slot_of_index[index]
+                    self.index_of_slot[slot] = None
+            finally:
+                with self.condition:
+                    self.loading.discard(slot)
+                    self.condition.notify_all()
+
+        # Wait for the samples read on behalf of other clients
+        with self.condition:
+            while self.loading.intersection(slots):
+                self.condition.wait()
+            if error is None and any(self.index_of_slot[s] != i for s, i in zip(slots, indices)):
+                error = RuntimeError(f"Cannot read samples {indices}")
+
+        if error is not None:
+            self.release(slots)
+            raise error
+
+        return slots
+
+    def release(self, slots):
+        with self.condition:
+            for slot in slots:
+                self.refcount[slot] -= 1
+                if self.refcount[slot] == 0:
+                    self.free[slot] = None
+            self.condition.notify_all()
+
+
+def _serve(dataset, name, slots, ready):
+    shape = dataset.shape[1:]
+    dtype = np.dtype(dataset.dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+
+    shm = shared_memory.SharedMemory(create=True, size=max(slots * nbytes, 1))
+    try:
+        buffer = np.ndarray((slots,) + shape, dtype=dtype, buffer=shm.buf)
+        state = _Slots(dataset, buffer)
+        info = dict(memory=shm.name, shape=shape, dtype=dtype.str, slots=slots, length=len(dataset))
+
+        listener = Listener(_address(name), family="AF_UNIX")
+        running = threading.Event()
+        running.set()
+
+        def handle(conn):
+            held = []
+            try:
+                conn.send(info)
+                while True:
+                    action, *args = conn.recv()
+
+                    if action == "get":
+                        try:
+                            indices = [range(len(dataset))[i] for i in args[0]]
+                            acquired = state.acquire(indices)
+                        except Exception as e:
+                            LOG.exception("Cannot read %s", args[0])
+                            conn.send(("error", repr(e)))
+                        else:
+                            held.extend(acquired)
+                            conn.send(("ok", acquired))
+
+                    elif action == "release":
+                        remaining = list(held)
+                        try:
+                            for slot in args[0]:
+                                remaining.remove(slot)
+                        except ValueError:
+                            LOG.error("Cannot release slots %s, held %s", args[0], held)
+                            conn.send(("error", f"slots {args[0]} not held by this client"))
+                        else:
+                            held[:] = remaining
+                            state.release(args[0])
+                            conn.send(("ok", None))
+
+                    elif action == "shutdown":
+                        running.clear()
+                        conn.send(("ok", None))
+                        # Wake up the accept() below
+                        Client(_address(name), family="AF_UNIX").close()
+                        return
+
+            except (EOFError, OSError):
+                pass
+            finally:
+                # Slots of clients that went away are released
+                state.release(held)
+                conn.close()
+
+        ready.set()
+
+        while running.is_set():
+            conn = listener.accept()
+            if not running.is_set():
+                conn.close()
+                break
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+        listener.close()
+
+    finally:
+        shm.unlink()
+        try:
+            shm.close()
+        except BufferError:
+            # Views held by threads of clients still connected, the process is exiting anyway
+            pass
+
+
+class SampleServer:
+    """Serve the samples of a dataset to the processes of a node through shared memory.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        The dataset to serve, as returned by ``open_dataset``.
+    name : str
+        The name clients use to attach to the server.
+    slots : int, optional
+        The number of samples held in shared memory. Requests wait when all of them are in use.
+    context : str, optional
+        The multiprocessing start method of the server process.
+    """
+
+    def __init__(self, dataset, name, slots=16, context=None):
+        self.dataset = dataset
+        self.name = name
+        self.slots = slots
+        self.context = multiprocessing.get_context(context)
+        self.process = None
+
+    def start(self, timeout=60):
+        """Start the server process and wait until it accepts clients."""
+        ready = self.context.Event()
+        self.process = self.context.Process(
+            target=_serve,
+            args=(self.dataset, self.name, self.slots, ready),
+            daemon=True,
+        )
+        self.process.start()
+        if not ready.wait(timeout):
+            self.process.terminate()
+            raise RuntimeError(f"Sample server {self.name} did not start")
+        return self
+
+    def stop(self, timeout=60):
+        """Stop the server process and release the shared memory."""
+        if self.process is None:
+            return
+
+        try:
+            with Client(_address(self.name), family="AF_UNIX") as conn:
+                conn.recv()
+                conn.send(("shutdown",))
+                conn.recv()
+        except (EOFError, OSError):
+            pass
+
+        self.process.join(timeout)
+        if self.process.is_alive():
+            LOG.warning("Sample server %s did not stop, terminating it", self.name)
+            self.process.terminate()
+        self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+class SampleClient:
+    """Read samples from a :class:`SampleServer` running on the same node.
+
+    A client is not thread-safe, use one per thread or process.
+
+    Parameters
+    ----------
+    name : str
+        The name of the server.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.conn = Client(_address(name), family="AF_UNIX")
+        info = self.conn.recv()
+
+        self.shape = tuple(info["shape"])
+        self.dtype = np.dtype(info["dtype"])
+        self.slots = info["slots"]
+        self.length = info["length"]
+
+        self.memory = _attach(info["memory"])
+        self.buffer = np.ndarray((self.slots,) + self.shape, dtype=self.dtype, buffer=self.memory.buf)
+        self.buffer.flags.writeable = False
+
+    def __len__(self):
+        return self.length
+
+    def _request(self, *message):
+        self.conn.send(message)
+        status, result = self.conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Sample server {self.name}: {result}")
+        return result
+
+    @contextmanager
+    def batch(self, indices):
+        """Yield read-only views of the requested samples in shared memory.
+
+        The views are only valid inside the ``with`` block, after which the slots are released.
+        """
+        indices = [int(i) for i in indices]
+        if len(indices) > self.slots:
+            raise ValueError(f"Batch of {len(indices)} samples larger than the {self.slots} slots of {self.name}")
+
+        slots = self._request("get", indices)
+        try:
+            yield [self.buffer[slot] for slot in slots]
+        finally:
+            self._request("release", slots)
+
+    def __getitem__(self, n):
+        with self.batch([n]) as (sample,):
+            return sample.copy()
+
+    def close(self):
+        self.buffer = None
+        self.memory.close()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -37,6 +37,13 @@ class Statistics(Forwards):
             delta = self.frequency
         return self._statistic.statistics_tendencies(delta)
 
+    def read_into_slices(self, out, index):
+        self.forward.read_into_slices(out, index)
+
+    def partial_statistics(self):
+        # The values are not changed, only the statistics used for normalisation
+        return self.forward.partial_statistics()
+
     def subclass_metadata_specific(self):
         return dict(statistics=self._statistic.metadata_specific())
 
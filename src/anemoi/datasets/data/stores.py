@@ -8,9 +8,14 @@
 # nor does it submit to any jurisdiction.
 
 
+import json
 import logging
 import os
+import tempfile
+import threading
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from functools import cached_property
 from urllib.parse import urlparse
 
@@ -44,7 +49,53 @@ class ReadOnlyStore(zarr.storage.BaseStore):
         raise NotImplementedError()
 
 
-class HTTPStore(ReadOnlyStore):
+# Number of chunks fetched concurrently by remote stores
+FETCH_THREADS = 16
+
+FETCH_EXECUTOR = None
+FETCH_LOCK = threading.Lock()
+
+
+def _reset_fetch_executor():
+    # Threads and locks are not inherited by forked processes
+    global FETCH_EXECUTOR, FETCH_LOCK
+    FETCH_EXECUTOR = None
+    FETCH_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_fetch_executor)
+
+
+def _fetch_executor():
+    global FETCH_EXECUTOR
+
+    with FETCH_LOCK:
+        if FETCH_EXECUTOR is None:
+            FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=FETCH_THREADS, thread_name_prefix="anemoi-datasets-fetch")
+        return FETCH_EXECUTOR
+
+
+class RemoteStore(ReadOnlyStore):
+    """A store where each key is a separate request, so fetching several chunks concurrently pays off."""
+
+    def _get_or_none(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            return None
+
+    def getitems(self, keys, *, contexts):
+        # Zarr calls this with all the chunks needed to satisfy a selection
+        keys = list(keys)
+        if len(keys) < 2:
+            return super().getitems(keys, contexts=contexts)
+
+        values = _fetch_executor().map(self._get_or_none, keys)
+        return {k: v for k, v in zip(keys, values) if v is not None}
+
+
+class HTTPStore(RemoteStore):
     """We write our own HTTPStore because the one used by zarr (s3fs)
     does not play well with fork() and multiprocessing.
     """
@@ -64,7 +115,7 @@ class HTTPStore(ReadOnlyStore):
         return r.content
 
 
-class S3Store(ReadOnlyStore):
+class S3Store(RemoteStore):
     """We write our own S3Store because the one used by zarr (s3fs)
     does not play well with fork(). We also get to control the s3 client
     options using the anemoi configs.
@@ -165,7 +216,49 @@ def name_to_zarr_store(path_or_url):
     return store
 
 
+# Zarr groups already opened by this process, keyed by canonical path
+POOL = {}
+
+
+def _clear_pool():
+    # Some stores (e.g. S3) hold connections that must not be shared with a forked child
+    POOL.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_pool)
+
+
+def _canonical_path(path):
+    """Return the key of a zarr in the pool, and a stamp that changes when a local zarr is rewritten."""
+    if "://" in path:
+        return path, None
+
+    path = os.path.realpath(os.path.expanduser(path))
+    for name in (os.path.join(path, ".zattrs"), path):
+        try:
+            return path, os.stat(name).st_mtime_ns
+        except OSError:
+            pass
+
+    return path, None
+
+
 def open_zarr(path, dont_fail=False, cache=None):
+    if cache is not None or DEBUG_ZARR_LOADING:
+        return _open_zarr(path, dont_fail=dont_fail, cache=cache)
+
+    key, stamp = _canonical_path(path)
+    if key in POOL and POOL[key][0] == stamp:
+        return POOL[key][1]
+
+    z = _open_zarr(path, dont_fail=dont_fail)
+    if z is not None:
+        POOL[key] = (stamp, z)
+    return z
+
+
+def _open_zarr(path, dont_fail=False, cache=None):
     try:
         store = name_to_zarr_store(path)
 
@@ -190,6 +283,53 @@ def open_zarr(path, dont_fail=False, cache=None):
             raise zarr.errors.PathNotFoundError(path)
 
 
+class MetadataCache:
+    """Small arrays and dictionaries read once from a zarr, such as the coordinates and the statistics.
+
+    Arrays are made read-only, so that they can be shared safely between the nodes of a dataset
+    tree and shipped as they are when the dataset is pickled.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key, load):
+        if key not in self._entries:
+            self._entries[key] = _read_only(load())
+        return self._entries[key]
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """The number of bytes held by the cached arrays."""
+        return sum(_nbytes(v) for v in self._entries.values())
+
+    def __repr__(self):
+        return f"MetadataCache({sorted(self._entries)}, nbytes={self.nbytes})"
+
+
+def _read_only(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    if isinstance(value, dict):
+        for v in value.values():
+            _read_only(v)
+    return value
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    return 0
+
+
 class Zarr(Dataset):
     """A zarr dataset."""
 
@@ -203,15 +343,40 @@ class Zarr(Dataset):
             self.path = str(path)
             self.z = open_zarr(self.path)
 
-        # This seems to speed up the reading of the data a lot
-        self.data = self.z.data
         self.missing = set()
+        self.metadata_cache = MetadataCache()
+
+    @cached_property
+    def z(self):
+        # Only called after unpickling, store handles are reopened lazily
+        return open_zarr(self.path)
+
+    @cached_property
+    def data(self):
+        # This seems to speed up the reading of the data a lot
+        return self.z.data
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        if self.was_zarr:
+            # In-memory groups cannot be reopened from a path
+            state["z"] = self.z
+        return state
 
     @classmethod
     def from_name(cls, name):
         if name.endswith(".zip") or name.endswith(".zarr"):
             return Zarr(name)
-        return Zarr(zarr_lookup(name))
+
+        path = zarr_lookup(name)
+        try:
+            return Zarr(path)
+        except Exception:
+            # The dataset may have been moved since it was looked up
+            if not _forget_lookup(name, path):
+                raise
+            LOG.warning("Cannot open `%s` as `%s` anymore, looking it up again", name, path)
+            return Zarr(zarr_lookup(name))
 
     def __len__(self):
         return self.data.shape[0]
@@ -221,6 +386,9 @@ class Zarr(Dataset):
     def __getitem__(self, n):
         return self.data[n]
 
+    def read_into_slices(self, out, index):
+        self.data.get_basic_selection(index, out=out)
+
     def _unwind(self, index, rest, shape, axis, axes):
         if not isinstance(index, (int, slice, list, tuple)):
             try:
@@ -251,6 +419,9 @@ class Zarr(Dataset):
     def shape(self):
         return self.data.shape
 
+    def date_chunk_ids(self):
+        return np.arange(len(self)) // self.chunks[0]
+
     @cached_property
     def dtype(self):
         return self.z.data.dtype
@@ -261,6 +432,9 @@ class Zarr(Dataset):
 
     @property
     def latitudes(self):
+        return self.metadata_cache.get("latitudes", self._load_latitudes)
+
+    def _load_latitudes(self):
         try:
             return self.z.latitudes[:]
         except AttributeError:
@@ -269,6 +443,9 @@ class Zarr(Dataset):
 
     @property
     def longitudes(self):
+        return self.metadata_cache.get("longitudes", self._load_longitudes)
+
+    def _load_longitudes(self):
         try:
             return self.z.longitudes[:]
         except AttributeError:
@@ -278,10 +455,15 @@ class Zarr(Dataset):
     @property
     def statistics(self):
         return dict(
-            mean=self.z.mean[:],
-            stdev=self.z.stdev[:],
-            maximum=self.z.maximum[:],
-            minimum=self.z.minimum[:],
+            self.metadata_cache.get(
+                "statistics",
+                lambda: dict(
+                    mean=self.z.mean[:],
+                    stdev=self.z.stdev[:],
+                    maximum=self.z.maximum[:],
+                    minimum=self.z.minimum[:],
+                ),
+            )
         )
 
     def statistics_tendencies(self, delta=None):
@@ -299,16 +481,28 @@ class Zarr(Dataset):
             return f"statistics_tendencies_{delta}_{k}"
 
         return dict(
-            mean=self.z[func("mean")][:],
-            stdev=self.z[func("stdev")][:],
-            maximum=self.z[func("maximum")][:],
-            minimum=self.z[func("minimum")][:],
+            self.metadata_cache.get(
+                func("all"),
+                lambda: dict(
+                    mean=self.z[func("mean")][:],
+                    stdev=self.z[func("stdev")][:],
+                    maximum=self.z[func("maximum")][:],
+                    minimum=self.z[func("minimum")][:],
+                ),
+            )
         )
 
     @property
     def resolution(self):
         return self.z.attrs["resolution"]
 
+    def partial_statistics(self):
+        try:
+            return {k: self.z[f"partial_{k}"][:] for k in ("sums", "squares", "count", "minimum", "maximum")}
+        except KeyError:
+            # The dataset was built with an older version of anemoi-datasets
+            raise NotImplementedError(f"Partial statistics are not available for {self.__class__.__name__}")
+
     @property
     def field_shape(self):
         try:
@@ -328,9 +522,12 @@ class Zarr(Dataset):
 
     @property
     def name_to_index(self):
+        return dict(self.metadata_cache.get("name_to_index", self._load_name_to_index))
+
+    def _load_name_to_index(self):
         if "variables" in self.z.attrs:
             return {n: i for i, n in enumerate(self.z.attrs["variables"])}
-        return self.z.attrs["name_to_index"]
+        return dict(self.z.attrs["name_to_index"])
 
     @property
     def variables(self):
@@ -439,6 +636,12 @@ class ZarrWithMissingDates(Zarr):
 
         raise TypeError(f"Unsupported index {n} {type(n)}")
 
+    def read_into_slices(self, out, index):
+        common = set(range(*index[0].indices(len(self)))) & self.missing
+        if common:
+            self._report_missing(min(common))
+        super().read_into_slices(out, index)
+
     def _report_missing(self, n):
         raise MissingDateError(f"Date {self.missing_to_dates[n]} is missing (index={n})")
 
@@ -452,6 +655,100 @@ class ZarrWithMissingDates(Zarr):
 
 QUIET = set()
 
+# The locations found by `zarr_lookup`, by name
+LOOKED_UP = {}
+
+# How long, in seconds, the result of probing a remote location is remembered
+LOOKUP_CACHE_EXPIRES = {True: 24 * 3600, False: 10 * 60}
+
+
+def _lookup_cache_path():
+    cache = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(cache, "anemoi", "datasets", "lookup.json")
+
+
+def _load_lookup_cache():
+    try:
+        with open(_lookup_cache_path()) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    now = time.time()
+    return {k: v for k, v in cache.items() if v["time"] + LOOKUP_CACHE_EXPIRES[v["exists"]] > now}
+
+
+def _save_lookup_cache(cache):
+    path = _lookup_cache_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Atomic, so that concurrent processes never read a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        LOG.debug("Cannot save lookup cache %s: %s", path, e)
+
+
+def _zarr_exists(path):
+    """Check that a zarr exists, without opening it."""
+    if "://" not in path:
+        return any(os.path.exists(os.path.join(path, name)) for name in (".zgroup", ".zattrs"))
+
+    try:
+        store = name_to_zarr_store(path)
+        store[".zgroup"]
+        return True
+    except KeyError:
+        return False
+    except Exception as e:
+        LOG.debug("Cannot access %s: %s", path, e)
+        return False
+
+
+def _probe(candidates):
+    """Return the first candidate that exists, checking them in parallel. Only the results
+    for remote candidates are cached, local ones are cheap to check.
+    """
+    remote = [c for c in candidates if "://" in c]
+    cache = _load_lookup_cache() if remote else {}
+    exists = {c: cache[c]["exists"] for c in remote if c in cache}
+
+    unknown = [c for c in candidates if c not in exists]
+    if unknown:
+        with ThreadPoolExecutor(max_workers=min(len(unknown), 8)) as executor:
+            exists.update(zip(unknown, executor.map(_zarr_exists, unknown)))
+
+    now = time.time()
+    probed = [c for c in remote if c not in cache]
+    if probed:
+        cache.update({c: dict(exists=exists[c], time=now) for c in probed})
+        _save_lookup_cache(cache)
+
+    for c in candidates:
+        if exists[c]:
+            return c
+
+    return None
+
+
+def _forget_lookup(name, path):
+    """Forget that `zarr_lookup` found `name` in `path`, because it cannot be opened anymore.
+    Return False if `path` was not found by `zarr_lookup`.
+    """
+    if LOOKED_UP.get(name) != path:
+        return False
+
+    del LOOKED_UP[name]
+    load_config()["datasets"]["named"].pop(name, None)
+
+    cache = _load_lookup_cache()
+    if cache.pop(path, None) is not None:
+        _save_lookup_cache(cache)
+
+    return True
+
 
 def zarr_lookup(name, fail=True):
 
@@ -470,19 +767,17 @@ def zarr_lookup(name, fail=True):
     for location in config["path"]:
         if not location.endswith("/"):
             location += "/"
-        full = location + name + ".zarr"
-        tried.append(full)
-        try:
-            z = open_zarr(full, dont_fail=True)
-            if z is not None:
-                # Cache for next time
-                config["named"][name] = full
-                if name not in QUIET:
-                    LOG.info("Opening `%s` as `%s`", name, full)
-                    QUIET.add(name)
-                return full
-        except zarr.errors.PathNotFoundError:
-            pass
+        tried.append(location + name + ".zarr")
+
+    full = _probe(tried) if tried else None
+    if full is not None:
+        # Cache for next time
+        config["named"][name] = full
+        LOOKED_UP[name] = full
+        if name not in QUIET:
+            LOG.info("Opening `%s` as `%s`", name, full)
+            QUIET.add(name)
+        return full
 
     if fail:
         raise ValueError(f"Cannot find a dataset that matched '{name}'. Tried: {tried}")
@@ -121,6 +121,17 @@ class Subset(Forwards):
         result = apply_index_to_slices_changes(result, changes)
         return result
 
+    def read_into_slices(self, out, index):
+        indices = [self.indices[i] for i in range(*index[0].indices(self._len))]
+        indices = make_slice_or_index_from_list_or_tuple(indices)
+
+        if isinstance(indices, slice):
+            self.dataset.read_into_slices(out, update_tuple(index, 0, indices)[0])
+            return
+
+        for i, n in enumerate(indices):
+            self.dataset.read_into_slices(out[i : i + 1], update_tuple(index, 0, slice(n, n + 1))[0])
+
     def __len__(self):
         return len(self.indices)
 
@@ -142,6 +153,12 @@ class Subset(Forwards):
     def source(self, index):
         return Source(self, index, self.forward.source(index))
 
+    def date_chunk_ids(self):
+        return np.asarray(self.dataset.date_chunk_ids())[self.indices]
+
+    def partial_statistics(self):
+        return {k: v[self.indices] for k, v in self.dataset.partial_statistics().items()}
+
     def __repr__(self):
         return f"Subset({self.dataset},{self.dates[0]}...{self.dates[-1]}/{self.frequency})"
 
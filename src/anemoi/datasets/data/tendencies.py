@@ -0,0 +1,138 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+
+import logging
+from functools import cached_property
+
+import numpy as np
+from anemoi.utils.dates import frequency_to_string
+from anemoi.utils.dates import frequency_to_timedelta
+
+from . import MissingDateError
+from .debug import Node
+from .debug import debug_indexing
+from .forwards import Forwards
+from .indexing import apply_index_to_slices_changes
+from .indexing import expand_list_indexing
+from .indexing import index_to_slices
+from .indexing import update_tuple
+
+LOG = logging.getLogger(__name__)
+
+
+class Tendencies(Forwards):
+    """The tendencies ``x[t] - x[t - delta]`` of a dataset.
+
+    The first `delta` of the dates of the dataset have no tendency and are dropped. A date is
+    missing if either of the two dates it is computed from is missing. The statistics are the
+    statistics of the tendencies computed when the dataset was built.
+    """
+
+    def __init__(self, dataset, delta):
+        super().__init__(dataset)
+
+        if isinstance(delta, int):
+            delta = f"{delta}h"
+
+        self.delta = frequency_to_timedelta(delta)
+
+        seconds = int(self.delta.total_seconds())
+        frequency = int(self.forward.frequency.total_seconds())
+
+        if seconds <= 0 or seconds % frequency != 0:
+            raise ValueError(
+                f"Tendencies: delta {frequency_to_string(self.delta)} must be a positive"
+                f" multiple of the dataset frequency {frequency_to_string(self.forward.frequency)}"
+            )
+
+        # Number of dates between the two terms of a tendency
+        self.steps = seconds // frequency
+
+        if self.steps >= len(self.forward):
+            raise ValueError(f"Tendencies: delta {frequency_to_string(self.delta)} is longer than the dataset")
+
+    def __len__(self):
+        return len(self.forward) - self.steps
+
+    @property
+    def shape(self):
+        return (len(self),) + self.forward.shape[1:]
+
+    @property
+    def dates(self):
+        return self.forward.dates[self.steps :]
+
+    @cached_property
+    def missing(self):
+        result = set()
+        for i in self.forward.missing:
+            result.add(i - self.steps)
+            result.add(i)
+        return set(i for i in result if 0 <= i < len(self))
+
+    @property
+    def statistics(self):
+        return self.forward.statistics_tendencies(self.delta)
+
+    def statistics_tendencies(self, delta=None):
+        raise NotImplementedError("Tendencies: the statistics of tendencies of tendencies are not available")
+
+    def date_chunk_ids(self):
+        return np.asarray(self.forward.date_chunk_ids())[self.steps :]
+
+    def _read(self, index):
+        """Return the tendencies for `index`, a tuple of slices with one slice per dimension."""
+        start, stop, step = index[0].indices(len(self))
+
+        if step < 0:
+            rows = range(start, stop, step)[::-1]
+            return self._read(update_tuple(index, 0, slice(rows.start, rows.stop, rows.step))[0])[::-1]
+
+        count = len(range(start, stop, step))
+
+        common = set(range(start, stop, step)) & self.missing
+        if common:
+            self._report_missing(min(common))
+
+        if count and self.steps % step == 0 and self.steps // step <= count:
+            # Both terms are read at once: the later term of a tendency is the earlier term of another one
+            shift = self.steps // step
+            rows = slice(start, start + (count + shift - 1) * step + 1, step)
+            values = self.forward[update_tuple(index, 0, rows)[0]]
+            # The values of the dataset may be shared with its cache, they are not modified
+            return values[shift:] - values[:count]
+
+        later = self.forward[update_tuple(index, 0, slice(start + self.steps, stop + self.steps, step))[0]]
+        return later - self.forward[update_tuple(index, 0, slice(start, stop, step))[0]]
+
+    @debug_indexing
+    @expand_list_indexing
+    def _get_tuple(self, index):
+        index = tuple(i + n if isinstance(i, int) and i < 0 else i for i, n in zip(index, self.shape))
+        index, changes = index_to_slices(index, self.shape)
+        return apply_index_to_slices_changes(self._read(index), changes)
+
+    @debug_indexing
+    def __getitem__(self, n):
+        if not isinstance(n, tuple):
+            n = (n,)
+        return self._get_tuple(n)
+
+    def read_into_slices(self, out, index):
+        out[...] = self._read(index)
+
+    def _report_missing(self, n):
+        raise MissingDateError(f"Date {self.dates[n]} is missing (index={n})")
+
+    def tree(self):
+        return Node(self, [self.forward.tree()], tendencies=frequency_to_string(self.delta))
+
+    def subclass_metadata_specific(self):
+        return {"tendencies": frequency_to_string(self.delta)}
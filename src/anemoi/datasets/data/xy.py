@@ -15,6 +15,7 @@ from .debug import Node
 from .forwards import Combined
 from .misc import _auto_adjust
 from .misc import _open
+from .parallel import map_children
 
 LOG = logging.getLogger(__name__)
 
@@ -39,7 +40,7 @@ class ZipBase(Combined):
         return min(len(d) for d in self.datasets)
 
     def __getitem__(self, n):
-        return tuple(d[n] for d in self.datasets)
+        return tuple(map_children(lambda d: d[n], self.datasets))
 
     def check_same_resolution(self, d1, d2):
         pass
@@ -8,12 +8,19 @@
 # nor does it submit to any jurisdiction.
 
 
+import datetime
 import itertools
+import logging
 from functools import cached_property
 
 from anemoi.datasets.dates import DatesProvider
 from anemoi.datasets.dates import as_datetime
 
+LOG = logging.getLogger(__name__)
+
+# Target length of the groups of dates when `group_by` is "auto"
+AUTO_GROUP_DURATION = datetime.timedelta(days=31)
+
 
 def _shorten(dates):
     if isinstance(dates, (list, tuple)):
@@ -70,12 +77,27 @@ class Groups:
     2
     >>> len(list(g)[1])
     2
+
+    If `chunk` is given, the boundaries of contiguous groups are moved to the nearest multiple
+    of `chunk`, so that no chunk of the dataset is shared by two groups:
+
+    >>> g = Groups(group_by="daily", start="2023-01-01 00:00", end="2023-01-05 00:00", frequency=6, chunk=8)
+    >>> [len(_) for _ in g]
+    [8, 8, 1]
+    >>> g = Groups(group_by="auto", start="2023-01-01 00:00", end="2023-12-31 18:00", frequency=6, chunk=8)
+    >>> [len(_) for _ in g][:3]
+    [128, 128, 128]
     """
 
     def __init__(self, **kwargs):
         group_by = kwargs.pop("group_by")
+        chunk = kwargs.pop("chunk", None)
         self._dates = DatesProvider.from_config(**kwargs)
+        if group_by == "auto":
+            group_by = auto_group_size(getattr(self._dates, "frequency", None), chunk)
         self._grouper = Grouper.from_config(group_by)
+        if chunk is not None and chunk > 1:
+            self._grouper = self._grouper.aligned(chunk)
         self._filter = Filter(self._dates.missing)
 
     @property
@@ -112,6 +134,44 @@ class Groups:
         go = next(iter(self))
         return GroupOfDates([go.dates[0]], go.provider)
 
+    def shared_chunks(self, chunk):
+        """Return the indices of the chunks of `chunk` dates that are written by more than one group."""
+        position = {d: i for i, d in enumerate(self._dates.values)}
+        owner = {}
+        shared = set()
+        for n, group in enumerate(self):
+            for d in group:
+                c = position[d] // chunk
+                if owner.setdefault(c, n) != n:
+                    shared.add(c)
+        return sorted(shared)
+
+    def largest_aligned_chunk(self):
+        """Return the largest number of dates per chunk such that no chunk is written by more than one group.
+
+        This is one date per chunk if the groups are not made of consecutive dates.
+        """
+        position = {d: i for i, d in enumerate(self._dates.values)}
+        groups = list(self)
+        # Each boundary between two groups can be anywhere in the missing dates between them
+        bounds = [(position[a.dates[-1]] + 1, position[b.dates[0]]) for a, b in zip(groups, groups[1:])]
+        if not bounds:
+            return len(self._dates.values)
+        if any(start > end for start, end in bounds):
+            return 1
+        for chunk in range(bounds[0][1], 1, -1):
+            if all(end // chunk * chunk >= start for start, end in bounds):
+                return chunk
+        return 1
+
+
+def auto_group_size(frequency, chunk):
+    """The multiple of `chunk` dates that is the closest to a month of data."""
+    chunk = chunk or 1
+    if not frequency:
+        return chunk
+    return max(1, round(AUTO_GROUP_DURATION / frequency / chunk)) * chunk
+
 
 class Filter:
     def __init__(self, missing):
@@ -122,6 +182,10 @@ class Filter:
 
 
 class Grouper:
+    def aligned(self, chunk):
+        """Return a grouper whose group boundaries are multiples of `chunk`."""
+        return GrouperAlignedToChunks(self, chunk)
+
     @classmethod
     def from_config(cls, group_by):
 
@@ -163,6 +227,41 @@ class GrouperOneGroup(Grouper):
         yield GroupOfDates(dates.values, dates)
 
 
+class GrouperAlignedToChunks(Grouper):
+    """Move the boundaries of the groups of `grouper` to the nearest multiple of `chunk`.
+
+    This is only possible if the groups are contiguous, otherwise the groups are left unchanged.
+    """
+
+    def __init__(self, grouper, chunk):
+        self.grouper = grouper
+        self.chunk = chunk
+
+    def __call__(self, dates):
+        groups = list(self.grouper(dates))
+        values = list(dates)
+
+        if [d for g in groups for d in g.dates] != values:
+            LOG.debug(f"Groups of {self.grouper} are not contiguous, they cannot be aligned to chunks of {self.chunk}")
+            yield from groups
+            return
+
+        start = 0
+        boundary = 0
+        for group in groups:
+            boundary += len(group)
+            # The end of the dataset is also the end of its last chunk
+            end = min(len(values), (boundary + self.chunk // 2) // self.chunk * self.chunk)
+            if boundary == len(values):
+                end = boundary
+            if end > start:
+                yield GroupOfDates(values[start:end], dates)
+                start = end
+
+        if start < len(values):
+            yield GroupOfDates(values[start:], dates)
+
+
 class GrouperByKey(Grouper):
     """Group dates by a key."""
 
@@ -180,6 +279,9 @@ class GrouperByFixedSize(Grouper):
     def __init__(self, size):
         self.size = size
 
+    def aligned(self, chunk):
+        return GrouperByFixedSize(max(1, round(self.size / chunk)) * chunk)
+
     def __call__(self, dates):
         batch = []
 
@@ -21,7 +21,7 @@ def plot_mask(path, mask, lats, lons, global_lats, global_lons):
 
     s = 1
 
-    global_lons[global_lons >= 180] -= 360
+    global_lons = np.where(global_lons >= 180, global_lons - 360, global_lons)
 
     plt.figure(figsize=(10, 5))
     plt.scatter(global_lons, global_lats, s=s, marker="o", c="r")
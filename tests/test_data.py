@@ -9,27 +9,37 @@
 
 
 import datetime
+import pickle
+import threading
 from functools import cache
 from functools import wraps
 from unittest.mock import patch
 
 import numpy as np
+import pytest
 import zarr
 from anemoi.utils.dates import frequency_to_string
 from anemoi.utils.dates import frequency_to_timedelta
 
 from anemoi.datasets import open_dataset
+from anemoi.datasets.create.pyramid import build_pyramid_level
+from anemoi.datasets.data import MissingDateError
+from anemoi.datasets.data import lazy
+from anemoi.datasets.data import parallel
 from anemoi.datasets.data.concat import Concat
+from anemoi.datasets.data.dataset import _balanced_owners
 from anemoi.datasets.data.ensemble import Ensemble
 from anemoi.datasets.data.grids import GridsBase
 from anemoi.datasets.data.join import Join
 from anemoi.datasets.data.misc import as_first_date
 from anemoi.datasets.data.misc import as_last_date
+from anemoi.datasets.data.rescale import Rescale
 from anemoi.datasets.data.select import Rename
 from anemoi.datasets.data.select import Select
 from anemoi.datasets.data.statistics import Statistics
 from anemoi.datasets.data.stores import Zarr
 from anemoi.datasets.data.subset import Subset
+from anemoi.datasets.data.xy import Zip
 
 VALUES = 10
 
@@ -65,6 +75,7 @@ def create_zarr(
     ensemble=None,
     grids=None,
     missing=False,
+    chunks=None,
 ):
     root = zarr.group()
     assert isinstance(frequency, datetime.timedelta)
@@ -91,7 +102,7 @@ def create_zarr(
         "data",
         data=data,
         dtype=data.dtype,
-        chunks=data.shape,
+        chunks=data.shape if chunks is None else chunks,
         compressor=None,
     )
     root.create_dataset(
@@ -131,25 +142,44 @@ def create_zarr(
 
     root.create_dataset(
         "mean",
-        data=np.mean(data, axis=0),
+        data=np.mean(data, axis=(0, 2, 3)),
         compressor=None,
     )
     root.create_dataset(
         "stdev",
-        data=np.std(data, axis=0),
+        data=np.std(data, axis=(0, 2, 3)),
         compressor=None,
     )
     root.create_dataset(
         "maximum",
-        data=np.max(data, axis=0),
+        data=np.max(data, axis=(0, 2, 3)),
         compressor=None,
     )
     root.create_dataset(
         "minimum",
-        data=np.min(data, axis=0),
+        data=np.min(data, axis=(0, 2, 3)),
         compressor=None,
     )
 
+    for name, values in (
+        ("sums", np.sum(data, axis=(2, 3))),
+        ("squares", np.sum(data * data, axis=(2, 3))),
+        ("count", np.full(data.shape[:2], data.shape[2] * data.shape[3])),
+        ("minimum", np.min(data, axis=(2, 3))),
+        ("maximum", np.max(data, axis=(2, 3))),
+    ):
+        root.create_dataset(f"partial_{name}", data=values, compressor=None)
+
+    for steps in (1, 2):
+        tendencies = data[steps:] - data[:-steps]
+        delta = frequency_to_string(frequency * steps)
+        for name, func in (("mean", np.mean), ("stdev", np.std), ("maximum", np.max), ("minimum", np.min)):
+            root.create_dataset(
+                f"statistics_tendencies_{delta}_{name}",
+                data=func(tendencies, axis=(0, 2, 3)),
+                compressor=None,
+            )
+
     return root
 
 
@@ -1131,6 +1161,525 @@ def test_cropping():
     assert test.ds.shape == (365 * 4, 4, 1, 8)
 
 
+def test_shard():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), chunks=(100, 4, 1, VALUES))
+    ds = open_dataset(root)
+
+    world_size = 4
+    shards = [ds.shard(rank, world_size) for rank in range(world_size)]
+
+    indices = [shard.indices for shard in shards]
+    assert sorted(sum(indices, [])) == list(range(len(ds)))
+
+    chunks = [set(i // 100 for i in x) for x in indices]
+    for i in range(world_size):
+        for j in range(i + 1, world_size):
+            assert not chunks[i] & chunks[j]
+
+    for i in range(world_size):
+        assert abs(len(indices[i]) - len(ds) / world_size) <= 100
+
+    assert (shards[1][0] == ds[indices[1][0]]).all()
+    assert (shards[1].dates == ds.dates[indices[1]]).all()
+
+
+def test_shard_subset_and_shuffle():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), chunks=(100, 4, 1, VALUES))
+
+    ds = open_dataset(root, start="2021-03-01", end="2021-10-31")
+    shards = [ds.shard(rank, 3) for rank in range(3)]
+    assert sum(len(s) for s in shards) == len(ds)
+    chunks = [set(i // 100 for i in s.indices) for s in shards]
+    assert not (chunks[0] & chunks[1]) and not (chunks[1] & chunks[2])
+
+    ds = open_dataset(root, shuffle=True)
+    shards = [ds.shard(rank, 3) for rank in range(3)]
+    assert sorted(sum([s.indices for s in shards], [])) == list(range(len(ds)))
+    chunks = [set(i // 100 for i in s.indices) for s in shards]
+    assert not (chunks[0] & chunks[1]) and not (chunks[1] & chunks[2])
+    # The shuffled order is kept within a shard
+    assert shards[0].indices == [i for i in ds.indices if i // 100 in chunks[0]]
+
+
+def test_shard_missing_dates():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), chunks=(10, 4, 1, VALUES), missing=True)
+    ds = open_dataset(root)
+    assert ds.missing
+
+    shards = [ds.shard(rank, 2) for rank in range(2)]
+    valid = [len(set(s.indices) - ds.missing) for s in shards]
+    assert abs(valid[0] - valid[1]) <= 10
+    assert sum(len(s.missing) for s in shards) == len(ds.missing)
+
+    skip = open_dataset(root, skip_missing_dates=True, expected_access=2)
+    shards = [skip.shard(rank, 2) for rank in range(2)]
+    assert sum(len(s) for s in shards) == len(skip)
+    a, b = shards[1][0]
+    assert (a == ds[skip.indices[shards[1].indices[0]][0]]).all()
+
+
+def test_subset_options_after_number():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), missing=True)
+    base = open_dataset(root)
+
+    # Options handled after 'number' are reached
+    shuffled = open_dataset(root, shuffle=True)
+    assert sorted(shuffled.indices) == list(range(len(base)))
+    assert len(open_dataset(root, shuffle=False)) == len(base)
+    assert len(open_dataset(root, skip_missing_dates=False, expected_access=2)) == len(base)
+
+    # The windows of SkipMissingDates are never missing, whatever the indices of the missing dates
+    skip = open_dataset(root, skip_missing_dates=True, expected_access=2)
+    assert len(skip) < len(base)
+    assert skip.missing == set()
+
+
+def test_shard_uneven_chunks():
+    # Chunks emptied by missing dates still give each rank at least one chunk
+    ids = np.repeat([0, 1, 2], 10)
+    missing = set(range(11, 30))
+    assert list(_balanced_owners(ids, missing, 3)) == [0] * 10 + [1] * 10 + [2] * 10
+    assert list(_balanced_owners(np.arange(6), set(), 3)) == [0, 0, 1, 1, 2, 2]
+    assert list(_balanced_owners(np.arange(4), set(), 3)) == [0, 1, 1, 2]
+
+
+@mockup_open_zarr
+def test_read_into():
+    ds = open_dataset(
+        [
+            {"dataset": "test-2021-2021-6h-o96-abcd-1", "select": ["d", "a"], "rescale": {"a": (2.0, 1.0)}},
+            {"dataset": "test-2021-2021-6h-o96-efgh-2", "start": "2021-01-01", "end": "2021-12-31"},
+        ],
+        frequency="12h",
+    )
+
+    for index in (
+        0,
+        7,
+        slice(0, 10),
+        slice(3, 20, 3),
+        (5, slice(1, 5)),
+        (slice(0, 4), slice(0, 6, 2), 0, slice(2, 8)),
+        (slice(0, 4), (0, 3), 0),
+    ):
+        expected = ds[index]
+        out = np.full(expected.shape, np.nan, dtype=ds.dtype)
+        assert ds.read_into(out, index) is out
+        assert (out == expected).all(), index
+
+    concat = open_dataset("test-2021-2021-6h-o96-abcd", "test-2022-2022-6h-o96-abcd", area=(18, 11, 11, 18))
+    expected = concat[1455:1465]
+    out = np.zeros_like(expected)
+    concat.read_into(out, slice(1455, 1465))
+    assert (out == expected).all()
+
+
+@mockup_open_zarr
+def test_normalise():
+    ds = open_dataset("test-2021-2021-6h-o96-abcd")
+    mean = ds.statistics["mean"][:, np.newaxis, np.newaxis]
+    stdev = ds.statistics["stdev"][:, np.newaxis, np.newaxis]
+    maximum = ds.statistics["maximum"][:, np.newaxis, np.newaxis]
+
+    test = open_dataset("test-2021-2021-6h-o96-abcd", normalise={"default": "mean-std", "b": "max", "d": "none"})
+
+    expected = (ds[10] - mean) / stdev
+    expected[1] = ds[10][1] / maximum[1]
+    expected[3] = ds[10][3]
+
+    assert np.allclose(test[10], expected)
+    assert np.allclose(test[5:8], [test[5], test[6], test[7]])
+    assert np.allclose(test[10, 1:3], expected[1:3])
+    assert np.allclose(test.denormalise(test[10]), ds[10])
+    assert np.allclose(test.denormalise(test[10, :, 0], axis=0), ds[10, :, 0])
+    assert np.allclose(test.denormalise(test[10, :, 0].T, axis=1), ds[10, :, 0].T)
+    with pytest.raises(ValueError):
+        test.denormalise(test[10, :, 0])
+    assert np.allclose(test.statistics["mean"][[0, 2]], 0)
+    assert np.allclose(test.statistics["stdev"][[0, 2]], 1)
+
+    # The values returned by the underlying dataset are not modified
+    values = ds[10]
+    copy = values.copy()
+    with patch.object(type(test.forward), "__getitem__", lambda self, n: values):
+        assert np.allclose(test[10], expected)
+        assert np.allclose(test[10], expected)
+    assert np.array_equal(values, copy)
+
+
+@mockup_open_zarr
+def test_normalise_rescaled():
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", rescale={"a": (2.0, 1.0)})
+    test = open_dataset("test-2021-2021-6h-o96-abcd", rescale={"a": (2.0, 1.0)}, normalise="mean-std")
+
+    # Rescaling and normalisation are folded
+    assert not isinstance(test.forward, Rescale)
+
+    mean = ds.statistics["mean"][:, np.newaxis, np.newaxis]
+    stdev = ds.statistics["stdev"][:, np.newaxis, np.newaxis]
+
+    assert np.allclose(test[10], (ds[10] - mean) / stdev)
+    assert np.allclose(test.denormalise(test[0:3]), ds[0:3])
+
+
+@mockup_open_zarr
+def test_metadata_cache():
+    ds = open_dataset("test-2021-2021-6h-o96-abcd")
+    assert isinstance(ds, Zarr)
+
+    assert ds.latitudes is ds.latitudes
+    assert not ds.latitudes.flags.writeable
+    assert ds.statistics["mean"] is ds.statistics["mean"]
+    assert not ds.statistics["stdev"].flags.writeable
+
+    # Callers get their own dictionaries
+    ds.statistics.pop("mean")
+    ds.name_to_index.pop("a")
+    assert "mean" in ds.statistics
+    assert ds.name_to_index == {"a": 0, "b": 1, "c": 2, "d": 3}
+
+    assert ds.metadata_cache.nbytes == ds.latitudes.nbytes + sum(v.nbytes for v in ds.statistics.values())
+
+    # Cached arrays are shipped to DataLoader workers
+    copy = pickle.loads(pickle.dumps(ds))
+    assert "latitudes" in copy.metadata_cache
+    assert (copy.latitudes == ds.latitudes).all()
+
+
+def _zarr_leaves(ds):
+    if isinstance(ds, Zarr):
+        return [ds]
+    children = getattr(ds, "datasets", None) or [ds.forward]
+    return [z for child in children for z in _zarr_leaves(child)]
+
+
+@mockup_open_zarr
+def test_pickle():
+    ds = open_dataset(
+        join=[{"dataset": "test-2021-2021-6h-o96-abcd", "select": ["d", "a"]}, "test-2021-2021-6h-o96-efgh"],
+        start="2021-02-01",
+        end="2021-11-30",
+        frequency="12h",
+    )
+    expected = ds[3:7]
+    dates = ds.dates
+
+    copy = pickle.loads(pickle.dumps(ds))
+
+    # Store handles and cached properties are not shipped
+    for z in _zarr_leaves(copy):
+        assert "z" not in z.__dict__
+        assert "data" not in z.__dict__
+        assert "dates" not in z.__dict__
+    assert "dates" not in copy.__dict__
+
+    assert (copy.dates == dates).all()
+    assert (copy[3:7] == expected).all()
+    assert copy.variables == ds.variables
+
+
+@mockup_open_zarr
+def test_parallel_reads():
+    datasets = [
+        dict(
+            join=[
+                "test-2021-2021-6h-o96-abcd",
+                {"join": ["test-2021-2021-6h-o96-efgh", "test-2021-2021-6h-o96-ijkl"]},
+            ]
+        ),
+        dict(grids=["test-2021-2021-6h-o96-abcd-1-1", "test-2021-2021-6h-o96-abcd-2-1-25"]),
+        dict(zip=["test-2021-2021-6h-o96-abcd", "test-2021-2021-6h-o96-efgh"]),
+    ]
+    indices = [7, (slice(3, 9), slice(1, 5)), (2, slice(None), 0, slice(0, 30, 2))]
+
+    for config in datasets:
+        ds = open_dataset(config)
+        threaded = open_dataset(config, read_threads=4)
+        for i in indices if "zip" not in config else [7]:
+            assert np.array_equal(threaded[i], ds[i], equal_nan=True)
+
+    # The number of threads is carried by the tree
+    used = []
+    executor = parallel._executor
+    with patch.object(parallel, "_executor", lambda threads: used.append(threads) or executor(threads)):
+        open_dataset(datasets[0])[7]
+        assert used == []
+        open_dataset(datasets[0], read_threads=2)[7]
+        assert set(used) == {2}
+
+    # Nested reads run in the thread of the outermost one
+    with parallel.parallel_reads(4):
+        names = parallel.map_children(
+            lambda _: parallel.map_children(lambda _: threading.current_thread().name, range(2)), range(3)
+        )
+    for inner in names:
+        assert len(set(inner)) == 1
+        assert inner[0].startswith("anemoi-datasets-read")
+
+    with pytest.raises(ValueError):
+        open_dataset(datasets[0], read_threads=-1)
+
+
+@mockup_open_zarr
+def test_lazy():
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", select=["d", "a", "b"])
+    values = ds[:]
+
+    with patch.object(lazy, "BLOCK_BYTES", 10000):
+        x = ds.lazy
+        assert x.shape == ds.shape and x.dtype == ds.dtype
+
+        y = x[10:500:3, 1:]
+        assert y.shape == values[10:500:3, 1:].shape
+        assert (y.compute() == values[10:500:3, 1:]).all()
+        assert (y[5, 0].compute() == values[10:500:3, 1:][5, 0]).all()
+
+        mean = ds.statistics["mean"][:, np.newaxis, np.newaxis]
+        z = (np.sqrt(abs(x - mean)) * 2.0)[100:200]
+        assert z.dtype == ds.dtype
+        assert np.allclose(z.compute(), (np.sqrt(abs(values - mean)) * 2.0)[100:200])
+
+        out = np.zeros(z.shape, dtype=z.dtype)
+        assert z.to_numpy(out=out) is out
+        assert np.allclose(out, z.compute())
+
+        for axis in (None, 0, 1, (0, 3), -1):
+            assert np.allclose(x.mean(axis=axis), values.mean(axis=axis)), axis
+            assert np.allclose(x.std(axis=axis), values.std(axis=axis)), axis
+            assert np.allclose(x.sum(axis=axis), values.sum(axis=axis)), axis
+            assert np.allclose(x.max(axis=axis), values.max(axis=axis)), axis
+            assert np.allclose(x.min(axis=axis), values.min(axis=axis)), axis
+
+        assert np.allclose(x[7].mean(axis=0), values[7].mean(axis=0))
+
+
+def test_to_dask_and_xarray():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), chunks=(100, 4, 1, VALUES))
+    ds = open_dataset(open_dataset(root), start="2021-01-10", select=["c", "a"])
+
+    array = ds.to_dask()
+    assert array.shape == ds.shape
+    # The first 9 days are not selected, so the first chunk is partial
+    assert array.chunks[0][:3] == (64, 100, 100)
+    assert sum(array.chunks[0]) == len(ds)
+    assert (array[5:200].compute(scheduler="threads") == ds[5:200]).all()
+
+    data = ds.to_xarray()
+    assert list(data["variable"].values) == ["c", "a"]
+    assert (data.time.values == ds.dates).all()
+    assert (data.latitude.values == ds.latitudes).all()
+    assert np.allclose(data.mean("time").values, ds[:].mean(axis=0))
+
+
+@mockup_open_zarr
+def test_exact_statistics():
+    ds = open_dataset(
+        "test-2021-2021-6h-o96-abcd",
+        start="2021-03-01",
+        end="2021-05-31",
+        frequency="12h",
+        select=["d", "b"],
+        rescale={"b": (-2.0, 1.0)},
+    )
+    values = ds[:].astype(np.float64)
+
+    # The default statistics are those of the whole dataset
+    assert not np.allclose(ds.statistics["mean"], values.mean(axis=(0, 2, 3)))
+
+    stats = ds.exact_statistics
+    assert np.allclose(stats["mean"], values.mean(axis=(0, 2, 3)))
+    # The reference values are float32, the partial statistics were computed in float64
+    assert np.allclose(stats["stdev"], values.std(axis=(0, 2, 3)), rtol=1e-4)
+    assert np.allclose(stats["minimum"], values.min(axis=(0, 2, 3)))
+    assert np.allclose(stats["maximum"], values.max(axis=(0, 2, 3)))
+
+    concat = open_dataset(["test-2021-2021-6h-o96-abcd", "test-2022-2022-6h-o96-abcd"], frequency="1d")
+    values = concat[:].astype(np.float64)
+    assert np.allclose(concat.exact_statistics["stdev"], values.std(axis=(0, 2, 3)), rtol=1e-4)
+
+
+@mockup_open_zarr
+def test_tendencies():
+    base = open_dataset("test-2021-2021-6h-o96-abcd")
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", tendencies="12h")
+
+    assert len(ds) == len(base) - 2
+    assert (ds.dates == base.dates[2:]).all()
+    assert ds.shape == (len(base) - 2,) + base.shape[1:]
+
+    for index in (
+        0,
+        -1,
+        slice(0, 10),
+        slice(3, 20, 2),
+        slice(3, 50, 3),
+        slice(20, 3, -1),
+        (5, slice(1, 3)),
+        (slice(0, 4), (0, 3), 0),
+    ):
+        expected = _tendencies(base, 2)[index]
+        assert (ds[index] == expected).all(), index
+
+    for index in (3, slice(0, 10), slice(3, 50, 3), (slice(0, 4), slice(1, 3), 0)):
+        expected = _tendencies(base, 2)[index]
+        out = np.zeros(expected.shape, dtype=ds.dtype)
+        assert (ds.read_into(out, index) == expected).all(), index
+
+    # The first dates of a subset use the dates before it
+    subset = open_dataset("test-2021-2021-6h-o96-abcd", tendencies="12h", start="2021-02-01", select=["c", "a"])
+    first = list(base.dates).index(np.datetime64("2021-02-01T00:00:00"))
+    assert (subset[0] == base[first][[2, 0]] - base[first - 2][[2, 0]]).all()
+
+    stats = base.statistics_tendencies("12h")
+    assert (ds.statistics["mean"] == stats["mean"]).all()
+    assert (subset.statistics["stdev"] == stats["stdev"][[2, 0]]).all()
+
+    # The values returned by the underlying dataset are not modified
+    values = base[0:20]
+    copy = values.copy()
+    with patch.object(type(ds.forward), "__getitem__", lambda self, n: values[: len(range(*n[0].indices(20)))]):
+        ds[0:10]
+        ds[0:10:4]
+    assert np.array_equal(values, copy)
+
+    normalised = open_dataset("test-2021-2021-6h-o96-abcd", tendencies="6h", normalise="mean-std")
+    stats = base.statistics_tendencies("6h")
+    expected = (_tendencies(base, 1)[3] - stats["mean"][:, None, None]) / stats["stdev"][:, None, None]
+    assert np.allclose(normalised[3], expected)
+
+    with pytest.raises(ValueError):
+        open_dataset("test-2021-2021-6h-o96-abcd", tendencies="9h")
+
+
+def test_tendencies_missing_dates():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), missing=True)
+    base = open_dataset(root)
+    ds = open_dataset(root, tendencies="6h")
+
+    assert ds.missing == set(i - 1 for i in base.missing if i > 0) | set(i for i in base.missing if i < len(ds))
+
+    n = sorted(base.missing)[1]
+    with pytest.raises(MissingDateError):
+        ds[n]
+    with pytest.raises(MissingDateError):
+        ds[n - 1]
+    assert (ds[n + 1] == base[n + 2] - base[n + 1]).all()
+
+
+@mockup_open_zarr
+def test_aggregate():
+    base = open_dataset("test-2021-2021-6h-o96-abcd")
+    values = base[:].reshape((-1, 4) + base.shape[1:])
+
+    for method, func in (("mean", np.mean), ("max", np.max), ("min", np.min), ("sum", np.sum)):
+        ds = open_dataset("test-2021-2021-6h-o96-abcd", aggregate={"frequency": "1d", "method": method})
+        assert (ds[:] == func(values, axis=1)).all(), method
+
+    ds = open_dataset("test-2021-2021-6h-o96-abcd", aggregate={"frequency": "1d"})
+    expected = values.mean(axis=1)
+
+    assert len(ds) == 365
+    assert ds.frequency == datetime.timedelta(days=1)
+    assert (ds.dates == base.dates[::4]).all()
+
+    for index in (0, 7, -1, slice(3, 20, 3), (5, slice(1, 3)), (slice(0, 4), (0, 3), 0)):
+        assert (ds[index] == expected[index]).all(), index
+
+    # Sequential reads are served from the last block
+    assert all((ds[i] == expected[i]).all() for i in range(10))
+    assert ds.cache is not None
+    assert pickle.loads(pickle.dumps(ds)).cache is None
+
+    # Windows start at midnight
+    ds = open_dataset({"dataset": "test-2021-2021-6h-o96-abcd", "start": "2021-01-01T06:00:00"}, aggregate="1d")
+    assert len(ds) == 364
+    assert ds.dates[0] == np.datetime64("2021-01-02T00:00:00")
+
+    weekly = open_dataset("test-2021-2021-6h-o96-abcd", aggregate={"frequency": "7d", "method": "max"})
+    assert len(weekly) == 52
+    assert (weekly[1] == values[7:14].max(axis=(0, 1))).all()
+
+    # Only the statistics that remain exact are derived from those of the dataset
+    daily = open_dataset("test-2021-2021-6h-o96-abcd", aggregate={"frequency": "1d", "method": "sum"})
+    assert np.allclose(daily.statistics["mean"], base.statistics["mean"] * 4)
+    assert (weekly.statistics["maximum"] == base.statistics["maximum"]).all()
+    with pytest.raises(NotImplementedError):
+        weekly.partial_statistics()
+    with pytest.raises(NotImplementedError):
+        weekly.statistics_tendencies()
+
+    with pytest.raises(ValueError):
+        open_dataset("test-2021-2021-6h-o96-abcd", aggregate={"frequency": "1d", "method": "median"})
+
+
+def test_aggregate_missing_dates():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), missing=True)
+    base = open_dataset(root)
+    ds = open_dataset(root, aggregate="1d")
+
+    assert ds.missing == set(i // 4 for i in base.missing)
+
+    n = sorted(ds.missing)[1]
+    with pytest.raises(MissingDateError):
+        ds[n]
+    assert (ds[n + 1] == base[(n + 1) * 4 : (n + 2) * 4].mean(axis=0)).all()
+
+
+def test_pyramid():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), chunks=(100, 4, 1, VALUES), missing=True)
+    root.attrs["field_shape"] = [2, 5]
+    build_pyramid_level(root, 1)
+
+    base = open_dataset(root)
+    ds = open_dataset(root, level=1, start="2021-02-01", select=["b", "d"])
+
+    offset = list(base.dates).index(ds.dates[0])
+    fields = base[offset + 1 : offset + 3].reshape(2, 4, 1, 2, 5)[:, [1, 3]]
+    expected = np.stack(
+        [fields[..., 0:2].mean(axis=(-2, -1)), fields[..., 2:4].mean(axis=(-2, -1)), fields[..., 4].mean(axis=-1)],
+        axis=-1,
+    )
+
+    assert ds.shape == (len(ds), 2, 1, 3)
+    assert ds.field_shape == (1, 3)
+    assert np.allclose(ds[1:3], expected)
+    cells = [[0, 1, 5, 6], [2, 3, 7, 8], [4, 9]]
+    assert np.allclose(ds.latitudes, [base.latitudes[c].mean() for c in cells])
+    assert ds.dates[0] == np.datetime64("2021-02-01T00:00:00")
+    assert (ds.statistics["mean"] == base.statistics["mean"][[1, 3]]).all()
+
+    out = np.zeros((2, 2, 1, 3), dtype=ds.dtype)
+    assert np.allclose(ds.read_into(out, slice(1, 3)), expected)
+
+    with pytest.raises(MissingDateError):
+        ds[0]
+
+    with pytest.raises(ValueError):
+        open_dataset(root, level=2)
+
+
+def test_pyramid_unstructured():
+    root = create_zarr(frequency=datetime.timedelta(hours=6), grids=200)
+    rng = np.random.default_rng(0)
+    root["latitudes"][:] = rng.uniform(-90, 90, 200)
+    root["longitudes"][:] = rng.uniform(-180, 180, 200)
+    build_pyramid_level(root, 2)
+
+    base = open_dataset(root)
+    ds = open_dataset(root, level=2)
+    index = root["pyramid_2_index"][:]
+
+    assert ds.shape == base.shape[:-1] + (index.max() + 1,)
+    assert ds.shape[-1] < 200 / 4
+    for cell in (0, 5, ds.shape[-1] - 1):
+        assert np.allclose(ds[7, :, :, cell], base[7][..., index == cell].mean(axis=-1))
+
+
+def _tendencies(ds, steps):
+    values = ds[:]
+    return values[steps:] - values[:-steps]
+
+
 if __name__ == "__main__":
     for name, obj in list(globals().items()):
         if name.startswith("test_") and callable(obj):
@@ -14,6 +14,7 @@ import numpy as np
 import pytest
 
 from anemoi.datasets.create.statistics import default_statistics_dates
+from anemoi.datasets.dates.groups import Groups
 
 _ = datetime.datetime
 
@@ -77,5 +78,49 @@ def test_default_statistics_dates_80_percent(as_numpy):
     assert default_end((2000, 1, 1), (2002, 12, 23), 1, as_numpy=as_numpy) == datetime.datetime(2002, 5, 19, 14)
 
 
+@pytest.mark.parametrize("group_by", ["monthly", "daily", 7, 100, "auto"])
+@pytest.mark.parametrize("chunk", [1, 5, 8])
+def test_groups_aligned_to_chunks(group_by, chunk):
+    dates = dict(start="2023-01-01 00:00", end="2023-03-31 18:00", frequency=6, missing=["2023-02-01 12:00"])
+
+    groups = Groups(group_by=group_by, chunk=chunk, **dates)
+    assert groups.shared_chunks(chunk) == []
+
+    # All the dates are still loaded, once
+    loaded = [d for g in groups for d in g]
+    assert loaded == [d for d in groups.provider.values if d not in groups.provider.missing]
+
+    # Groups start on a chunk boundary
+    position = {d: i for i, d in enumerate(groups.provider.values)}
+    assert all(position[g.dates[0]] % chunk == 0 for g in groups)
+
+
+def test_groups_not_aligned():
+    dates = dict(start="2023-01-01 00:00", end="2023-01-31 00:00", frequency=24)
+
+    # Groups of dates that are not consecutive cannot be aligned
+    assert Groups(group_by="weekly", chunk=4, **dates).shared_chunks(4) != []
+    assert Groups(group_by="weekly", chunk=1, **dates).shared_chunks(1) == []
+
+    # Without a chunk, the groups are not aligned
+    assert Groups(group_by=3, **dates).shared_chunks(2) != []
+    assert [len(g) for g in Groups(group_by=3, chunk=2, **dates)] == [4] * 7 + [3]
+
+
+def test_groups_largest_aligned_chunk():
+    dates = dict(start="2023-01-01 00:00", end="2023-01-31 00:00", frequency=24)
+
+    assert Groups(group_by=6, **dates).largest_aligned_chunk() == 6
+    assert Groups(group_by=6, chunk=4, **dates).largest_aligned_chunk() == 8
+    assert Groups(group_by=100, **dates).largest_aligned_chunk() == 31
+
+    # The missing dates are not written, whichever chunk they are in
+    groups = Groups(group_by=6, missing=["2023-01-01 00:00", "2023-01-13 00:00"], **dates)
+    assert groups.largest_aligned_chunk() == 6
+
+    groups = Groups(group_by=8, **dates)
+    assert groups.shared_chunks(groups.largest_aligned_chunk()) == []
+
+
 if __name__ == "__main__":
     test_default_statistics_dates(2000, as_numpy=True)
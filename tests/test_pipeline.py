@@ -0,0 +1,133 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from anemoi.datasets.create.pipeline import Pipeline
+from anemoi.datasets.create.pipeline import Stage
+
+
+def test_pipeline():
+    written = []
+
+    pipeline = Pipeline(
+        [
+            Stage("fetch", lambda x: x * 2),
+            Stage("decode", lambda x: x + 1),
+            Stage("write", written.append),
+        ]
+    )
+    pipeline.run(range(10))
+    assert written == [x * 2 + 1 for x in range(10)]
+
+    written.clear()
+    pipeline.run_sequentially(range(10))
+    assert written == [x * 2 + 1 for x in range(10)]
+
+
+def test_pipeline_overlap():
+    active = set()
+    overlap = []
+    lock = threading.Lock()
+
+    def stage(name):
+        def func(x):
+            with lock:
+                active.add(name)
+                overlap.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.discard(name)
+            return x
+
+        return func
+
+    Pipeline([Stage(name, stage(name)) for name in ("fetch", "decode", "write")]).run(range(10))
+    assert max(overlap) == 3
+
+
+def test_pipeline_errors():
+    written = []
+
+    def decode(x):
+        if x == 3:
+            raise ValueError(x)
+        return x
+
+    with pytest.raises(ValueError):
+        Pipeline([Stage("fetch", decode, workers=2), Stage("write", written.append)]).run(range(100))
+
+    assert 3 not in written
+    assert len(written) < 100
+
+
+def test_pipeline_stop():
+    failed = []
+
+    def fetch(x):
+        if x == 3:
+            raise ValueError(x)
+        return x
+
+    pipeline = Pipeline([Stage("fetch", fetch), Stage("write", lambda x: x)], failed=failed.append)
+
+    def items(stop):
+        # A source that waits for more items until the pipeline fails
+        for i in range(5):
+            yield i
+        while not stop.wait(0.01):
+            pass
+
+    with pytest.raises(ValueError):
+        pipeline.run(items(pipeline.stop))
+    assert failed == [3]
+
+    failed.clear()
+    with pytest.raises(ValueError):
+        pipeline.run_sequentially(items(pipeline.stop))
+    assert failed == [3]
+
+
+def test_pipeline_memory():
+    in_flight = []
+    current = [0]
+    lock = threading.Lock()
+
+    def fetch(x):
+        with lock:
+            current[0] += 1
+            in_flight.append(current[0])
+        return x
+
+    def write(x):
+        time.sleep(0.01)
+        with lock:
+            current[0] -= 1
+
+    pipeline = Pipeline(
+        [Stage("fetch", fetch, workers=4), Stage("write", write)],
+        queue_size=10,
+        memory=200,
+        size=lambda x: 100,
+    )
+    pipeline.run(range(20))
+    assert max(in_flight) <= 2
+
+
+def test_pipeline_floating_point_errors():
+    def divide(x):
+        return np.float64(1) / x
+
+    with np.errstate(all="raise"):
+        with pytest.raises(FloatingPointError):
+            Pipeline([Stage("decode", divide), Stage("write", lambda x: x)]).run([np.float64(0)])
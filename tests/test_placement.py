@@ -0,0 +1,75 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import random
+
+import earthkit.data as ekd
+import numpy as np
+import pytest
+from earthkit.data.core.order import normalize_order_by
+
+from anemoi.datasets.create.input.result import Placement
+
+REMAPPING = {"param_level": "{param}_{levelist}"}
+PATCHES = {"number": {None: 0}}
+
+
+def _fields(dates=(20200101, 20200102), params=("2t", "msl"), numbers=(3, 1, 2), shuffle=True):
+    fields = [
+        dict(
+            param=param,
+            levtype="sfc",
+            date=date,
+            time=0,
+            step=0,
+            number=number,
+            values=np.random.rand(6).astype("float32"),
+            latitudes=np.arange(6.0),
+            longitudes=np.arange(6.0),
+        )
+        for date in dates
+        for param in params
+        for number in numbers
+    ]
+    if shuffle:
+        random.Random(42).shuffle(fields)
+    return ekd.from_source("list-of-dicts", fields)
+
+
+@pytest.mark.parametrize("param_level", ["ascending", "descending", ["msl", "2t"]])
+def test_placement(param_level):
+    ds = _fields()
+    order_by = normalize_order_by(["valid_datetime", {"param_level": param_level}, "number"])
+
+    cube = ds.cube(order_by, remapping=REMAPPING, patches=PATCHES, flatten_values=True)
+    placement = Placement(ds, order_by, remapping=REMAPPING, patches=PATCHES, flatten_values=True)
+
+    assert placement.user_coords == cube.user_coords
+    assert placement.extended_user_shape == cube.extended_user_shape
+
+    expected = np.zeros(cube.extended_user_shape)
+    for cubelet in cube.iterate_cubelets():
+        expected[cubelet.coords] = cubelet.to_numpy()
+
+    result = np.zeros(placement.extended_user_shape)
+    for index, field in placement:
+        result[index] = field.to_numpy(flatten=True)
+
+    assert (result == expected).all()
+
+
+def test_placement_not_a_hypercube():
+    order_by = normalize_order_by(["valid_datetime", "param_level", "number"])
+
+    ds = _fields()
+    with pytest.raises(ValueError):
+        Placement(ds + ds[:1], order_by, remapping=REMAPPING, patches=PATCHES, flatten_values=True)
+
+    with pytest.raises(ValueError):
+        Placement(ds[1:], order_by, remapping=REMAPPING, patches=PATCHES, flatten_values=True)
@@ -0,0 +1,142 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import zarr
+
+from anemoi.datasets.create.leases import Leases
+from anemoi.datasets.create.zarr import ZarrBuiltRegistry
+
+
+def _registry(tmp_path, groups):
+    path = str(tmp_path / "dataset.zarr")
+    zarr.open(path, mode="w").create_group("_build")
+    registry = ZarrBuiltRegistry(path)
+    registry.create(lengths=[4] * groups)
+    return registry
+
+
+def test_registry_markers(tmp_path):
+    registry = _registry(tmp_path, 100)
+    assert registry.get_flags() == [False] * 100
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(registry.set_flag, range(0, 100, 3)))
+
+    flags = registry.get_flags()
+    assert flags == [i % 3 == 0 for i in range(100)]
+    assert registry.get_flag(3) and not registry.get_flag(4)
+    assert not registry.ready()
+
+    # No lock files and no temporary files are left behind
+    assert sorted(os.listdir(registry.markers_path), key=int) == [str(i) for i in range(0, 100, 3)]
+
+    registry.set_flag(3, False)
+    assert not registry.get_flag(3)
+    registry.set_flag(3, False)
+
+
+def test_registry_consolidate(tmp_path):
+    registry = _registry(tmp_path, 5)
+    for i in range(5):
+        registry.set_flag(i)
+    assert registry.ready()
+
+    registry.consolidate()
+    assert not os.path.exists(registry.markers_path)
+
+    # The flags are now read from the zarr array
+    z = zarr.open(registry.zarr_path, mode="r")
+    assert list(z["_build"]["flags"][:]) == [True] * 5
+    assert "latest_write_timestamp" in z.attrs
+    assert registry.ready()
+
+    # Creating the registry again starts from scratch
+    registry.create(lengths=[4] * 5)
+    assert registry.get_flags() == [False] * 5
+
+
+def test_registry_reset(tmp_path):
+    path = str(tmp_path / "dataset.zarr")
+    zarr.open(path, mode="w").create_group("_build")
+    registry = ZarrBuiltRegistry(path)
+    registry.create(lengths=[4] * 3, aligned=True, tendencies=["6h", "1d"])
+    registry.set_flag(1)
+
+    # Resetting keeps the attributes set by init
+    registry.reset(lengths=[4] * 3)
+    assert registry.get_flags() == [False] * 3
+    assert registry.aligned()
+    assert registry.tendencies() == ["6h", "1d"]
+
+
+def test_leases(tmp_path):
+    path = str(tmp_path / "dataset.zarr")
+    workers = [Leases(path) for _ in range(4)]
+
+    def claim_all(leases):
+        claimed = []
+        while (i := leases.claim(range(20))) is not None:
+            claimed.append(i)
+        return claimed
+
+    # Each group is claimed by a single worker
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        claimed = list(executor.map(claim_all, workers))
+    assert sorted(sum(claimed, [])) == list(range(20))
+
+    workers[0].release(claimed[0][0])
+    assert Leases(path).claim(range(20)) == claimed[0][0]
+
+
+def test_leases_expire(tmp_path):
+    path = str(tmp_path / "dataset.zarr")
+
+    with Leases(path, timeout=0.5) as alive:
+        dead = Leases(path, timeout=0.5)
+        assert dead.claim([0]) == 0
+        assert alive.claim([0, 1]) == 1
+        assert alive.claim([0, 1]) is None
+
+        # Leases that are not renewed expire, the others are renewed in the background
+        time.sleep(1)
+        other = Leases(path, timeout=0.5)
+        assert other.claim([0, 1]) == 0
+        assert other.claim([0, 1]) is None
+
+        # A reclaimed lease is neither renewed nor released by its previous owner
+        dead.renew()
+        assert dead.held == set()
+        dead.release(0)
+        assert other.claim([0]) is None
+
+    # Leases are released on exit
+    assert other.claim([0, 1]) == 1
+    assert not [name for name in os.listdir(other.directory) if name.startswith(".")]
+
+
+def test_leases_reclaim_race(tmp_path):
+    path = str(tmp_path / "dataset.zarr")
+    dead = Leases(path, timeout=0.5)
+    assert dead.claim([0]) == 0
+    time.sleep(1)
+
+    # Both workers see the expired lease, the first one reclaims it
+    first, second = Leases(path, timeout=0.5), Leases(path, timeout=0.5)
+    mtime = second._expired(0)
+    assert first.claim([0]) == 0
+
+    # The second one must not take the new lease of the first one
+    second._expired = lambda i: mtime
+    assert second.claim([0]) is None
+    assert first._owned(0)
+    assert not [name for name in os.listdir(first.directory) if name.startswith(".")]
@@ -0,0 +1,128 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets import open_dataset
+from anemoi.datasets.data.server import SampleClient
+from anemoi.datasets.data.server import SampleServer
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = str(tmp_path / "test.zarr")
+    root = zarr.open(path, mode="w")
+
+    data = np.arange(20 * 2 * 1 * 10, dtype="float32").reshape(20, 2, 1, 10)
+    root.create_dataset("data", data=data, chunks=(5, 2, 1, 10))
+    root.create_dataset("dates", data=np.arange("2021-01-01T00", "2021-01-06T00", 6, dtype="datetime64[h]"))
+    root.create_dataset("latitudes", data=np.linspace(-45, 45, 10))
+    root.create_dataset("longitudes", data=np.linspace(0, 90, 10))
+    root.attrs["frequency"] = "6h"
+    root.attrs["variables"] = ["a", "b"]
+
+    return open_dataset(path)
+
+
+@pytest.fixture
+def name(tmp_path):
+    return f"test-{os.getpid()}-{tmp_path.name}"
+
+
+def test_sample_server(dataset, name):
+    with SampleServer(dataset, name, slots=4, context="fork"):
+        with SampleClient(name) as client:
+            assert len(client) == len(dataset)
+
+            with client.batch([3, 7, 3, -1]) as samples:
+                for i, sample in zip([3, 7, 3, 19], samples):
+                    assert (sample == dataset[i]).all()
+                    assert not sample.flags.writeable
+
+            assert (client[5] == dataset[5]).all()
+
+            with pytest.raises(ValueError):
+                with client.batch(range(5)):
+                    pass
+
+            with pytest.raises(RuntimeError):
+                with client.batch([100]):
+                    pass
+
+
+def test_sample_server_back_pressure(dataset, name):
+    with SampleServer(dataset, name, slots=2, context="fork"):
+        first = SampleClient(name)
+        second = SampleClient(name)
+        third = SampleClient(name)
+
+        done = threading.Event()
+
+        def read():
+            with second.batch([4]) as (sample,):
+                assert (sample == dataset[4]).all()
+            done.set()
+
+        with first.batch([0, 1]):
+            thread = threading.Thread(target=read)
+            thread.start()
+            # All the slots are held
+            assert not done.wait(0.5)
+
+            # Samples already in memory are shared
+            with third.batch([1]) as (sample,):
+                assert (sample == dataset[1]).all()
+
+        assert done.wait(10)
+        thread.join()
+
+        for client in (first, second, third):
+            client.close()
+
+
+def test_sample_server_release_not_held(dataset, name):
+    with SampleServer(dataset, name, slots=2, context="fork"):
+        first = SampleClient(name)
+        second = SampleClient(name)
+
+        with first.batch([0]) as (sample,):
+            # Slots held by another client cannot be released
+            with pytest.raises(RuntimeError):
+                second._request("release", [0, 0])
+
+            assert (sample == dataset[0]).all()
+
+        # The handlers are still serving both clients
+        assert (first[1] == dataset[1]).all()
+        assert (second[2] == dataset[2]).all()
+
+        first.close()
+        second.close()
+
+
+def test_sample_server_shutdown(dataset, name):
+    server = SampleServer(dataset, name, slots=2, context="fork").start()
+    client = SampleClient(name)
+    memory = client.memory.name
+    client.close()
+
+    server.stop()
+    assert server.process is None
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=memory)
+
+    with pytest.raises(OSError):
+        SampleClient(name)
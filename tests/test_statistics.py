@@ -0,0 +1,264 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import datetime
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets.create import DeltaDataset
+from anemoi.datasets.create.check import check_data_values
+from anemoi.datasets.create.statistics import TmpStatistics
+from anemoi.datasets.create.statistics import compute_statistics
+from anemoi.datasets.create.statistics.tendencies import Tendencies
+
+NAMES = ["2t", "msl", "sst", "cos_latitude"]
+
+
+def reference_statistics(array, check_variables_names, allow_nans=False):
+    """The statistics computed one variable and one date at a time, with the NaN-aware numpy functions."""
+    nvars = array.shape[1]
+    stats_shape = (array.shape[0], nvars)
+
+    count = np.zeros(stats_shape, dtype=np.int64)
+    sums = np.zeros(stats_shape, dtype=np.float64)
+    squares = np.zeros(stats_shape, dtype=np.float64)
+    minimum = np.zeros(stats_shape, dtype=np.float64)
+    maximum = np.zeros(stats_shape, dtype=np.float64)
+    has_nans = np.zeros(stats_shape, dtype=np.bool_)
+
+    for i, chunk in enumerate(array):
+        values = chunk.reshape((nvars, -1))
+
+        for j, name in enumerate(check_variables_names):
+            check_data_values(values[j, :], name=name, allow_nans=allow_nans)
+
+        minimum[i] = np.nanmin(values, axis=1)
+        maximum[i] = np.nanmax(values, axis=1)
+        sums[i] = np.nansum(values, axis=1)
+        squares[i] = np.nansum(values * values, axis=1)
+        count[i] = np.sum(~np.isnan(values), axis=1)
+        has_nans[i] = np.isnan(values).any()
+
+    return dict(minimum=minimum, maximum=maximum, sums=sums, squares=squares, count=count, has_nans=has_nans)
+
+
+def _array(nans=False):
+    rng = np.random.default_rng(42)
+    array = rng.normal(size=(5, len(NAMES), 3, 1000)).astype(np.float32)
+    array[:, 3] = np.clip(array[:, 3], -1, 1)
+    if nans:
+        array[1, 2, 0, :10] = np.nan
+        array[3, 2, :, :] = np.nan
+    return array
+
+
+@pytest.mark.parametrize("threads", [None, 4])
+@pytest.mark.parametrize("nans", [False, True])
+def test_compute_statistics(nans, threads):
+    array = _array(nans)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        expected = reference_statistics(array, NAMES, allow_nans=["sst"])
+    expected_warnings = [str(w.message) for w in caught]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        result = compute_statistics(array, NAMES, allow_nans=["sst"], threads=threads)
+    result_warnings = [str(w.message) for w in caught]
+
+    assert result_warnings == expected_warnings
+    for k, v in expected.items():
+        assert result[k].dtype == v.dtype, k
+        assert np.array_equal(result[k], v, equal_nan=True), k
+
+
+def test_compute_statistics_checks():
+    array = _array(nans=True)
+
+    # NaNs are only allowed in some variables
+    with pytest.raises(AssertionError):
+        compute_statistics(array, NAMES)
+
+    with pytest.raises(AssertionError):
+        reference_statistics(array, NAMES)
+
+    array = _array()
+    array[2, 3, 1, 5] = 1.5
+    array[4, 0, 2, 7] = 9999.0
+
+    with pytest.warns(UserWarning, match="maximum value in the data is 1.5"):
+        compute_statistics(array, NAMES, check_fields=True)
+
+    with pytest.warns(UserWarning, match="Max value 9999 for 2t"):
+        compute_statistics(array, NAMES)
+
+    # Each field is checked on its own
+    array[4, 0, 2] = np.nan
+    with pytest.warns(UserWarning, match="Empty array for 2t"):
+        compute_statistics(array, NAMES, allow_nans=True, check_fields=True)
+
+
+def test_tmp_statistics(tmp_path):
+    array = _array()
+    dates = [datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=6 * i) for i in range(len(array))]
+
+    tmp = TmpStatistics(str(tmp_path / "statistics"))
+    tmp.create(dates, NAMES)
+
+    # Groups of dates written in any order, including non-contiguous ones
+    for key in ([3, 4], [0, 2], [1]):
+        key = np.array(key)
+        stats = compute_statistics(array[key], NAMES)
+        tmp.write(key, stats, dates=[dates[i] for i in key])
+
+    # Dates written twice are skipped
+    tmp.write(np.array([0, 1]), compute_statistics(array[[2, 2]], NAMES), dates=dates[:2])
+
+    expected = compute_statistics(array, NAMES)
+    summary = tmp.get_aggregated(dates, NAMES, allow_nans=False)
+    assert np.array_equal(summary["minimum"], expected["minimum"].min(axis=0))
+    assert np.array_equal(summary["maximum"], expected["maximum"].max(axis=0))
+    assert np.array_equal(summary["count"], expected["count"].sum(axis=0))
+    assert np.allclose(summary["sums"], expected["sums"].sum(axis=0))
+
+    partial = tmp.get_per_date(dates[1:3], NAMES)
+    assert np.array_equal(partial["sums"], expected["sums"][1:3])
+
+    tmp.add_provenance(name="provenance_load")
+
+
+def test_tmp_statistics_concurrent_writers(tmp_path):
+    rng = np.random.default_rng(42)
+    array = rng.normal(size=(400, len(NAMES), 1, 10))
+    array[:, 3] = np.clip(array[:, 3], -1, 1)
+    dates = [datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=6 * i) for i in range(len(array))]
+    directory = str(tmp_path / "statistics")
+
+    # Groups of 25 dates, each in its own chunks
+    TmpStatistics(directory).create(dates, NAMES, chunk=25)
+    groups = np.arange(len(array)).reshape(16, 25)
+
+    def load(worker):
+        # Each worker has its own statistics, as with `create --threads`
+        tmp = TmpStatistics(directory)
+        for group in groups[worker::8]:
+            tmp.write(group, compute_statistics(array[group], NAMES), dates=[dates[i] for i in group])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(load, range(8)))
+
+    assert zarr.open_group(directory, mode="r")["sums"].chunks == (25, len(NAMES))
+
+    stats = TmpStatistics(directory).get_per_date(dates, NAMES)
+    assert np.array_equal(stats["count"], np.full((len(array), len(NAMES)), 10))
+    assert np.allclose(stats["sums"], array.sum(axis=(2, 3)))
+
+
+def test_tmp_statistics_missing_dates(tmp_path):
+    array = _array()
+    dates = [datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=6 * i) for i in range(len(array))]
+
+    tmp = TmpStatistics(str(tmp_path / "statistics"))
+    tmp.create(dates, NAMES)
+
+    key = np.array([0, 1, 3, 4])
+    tmp.write(key, compute_statistics(array[key], NAMES), dates=[dates[i] for i in key])
+
+    with pytest.raises(AssertionError, match="not precomputed"):
+        tmp.get_aggregated(dates, NAMES, allow_nans=False)
+
+    summary = tmp.get_aggregated([dates[i] for i in key], NAMES, allow_nans=False)
+    assert (summary["count"] == array[key].reshape(4, len(NAMES), -1).shape[-1] * 4).all()
+
+    partial = tmp.get_per_date(dates, NAMES)
+    assert (partial["count"][2] == 0).all()
+    assert np.isnan(partial["minimum"][2]).all()
+    assert (partial["count"][3] > 0).all()
+
+
+class _Dataset:
+    def __init__(self, array, dates, missing=()):
+        self.array = array
+        self.dates = np.array(dates, dtype="datetime64[s]")
+        self.missing = set(missing)
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+
+def test_tendencies(tmp_path):
+    rng = np.random.default_rng(42)
+    array = rng.normal(size=(12, len(NAMES), 3, 100)).astype(np.float32)
+    array[:, 3] = np.clip(array[:, 3], -1, 1) / 2
+    dates = [datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=6 * i) for i in range(len(array))]
+
+    tmp = TmpStatistics(str(tmp_path / "statistics_tendencies_12h"))
+    tmp.create(dates, NAMES)
+
+    def tendencies():
+        return Tendencies(tmp, datetime.timedelta(hours=12), datetime.timedelta(hours=6), NAMES)
+
+    def write(result):
+        positions, stats = result
+        tmp.write(positions, stats, dates=[dates[i] for i in positions])
+
+    # The first part loads the first two groups, the second group uses the buffer
+    first = tendencies()
+    assert first.compute(array[0:1], [0]) is None
+    write(first.compute(array[1:4], [1, 2, 3]))
+    positions, stats = first.compute(array[4:8], [4, 5, 6, 7])
+    assert positions == [4, 5, 6, 7]
+    write((positions, stats))
+
+    # The second part only reads the dates already written
+    second = tendencies()
+    positions, stats = second.compute(array[8:12], [8, 9, 10, 11], read=lambda i: None)
+    assert positions == [10, 11]
+    write((positions, stats))
+
+    dataset = _Dataset(array, dates)
+    positions = first.positions(dataset.dates, dataset.dates[0], dataset.dates[-1], missing={5})
+    assert positions == [2, 3, 4, 6, 8, 9, 10, 11]
+
+    # The dates not computed while loading are computed from the dataset
+    first.complete(dataset, positions)
+
+    expected = compute_statistics(array[positions] - array[[i - 2 for i in positions]], NAMES)
+    summary = tmp.get_aggregated(dataset.dates[positions], NAMES, allow_nans=False)
+    assert np.array_equal(summary["minimum"], expected["minimum"].min(axis=0))
+    assert np.array_equal(summary["maximum"], expected["maximum"].max(axis=0))
+    assert np.array_equal(summary["count"], expected["count"].sum(axis=0))
+    assert np.allclose(summary["sums"], expected["sums"].sum(axis=0))
+
+
+def test_delta_dataset_runs():
+    array = np.arange(12 * 2, dtype=np.float32).reshape(12, 2) ** 2
+    dates = [datetime.datetime(2020, 1, 1) + datetime.timedelta(hours=6 * i) for i in range(len(array))]
+    ds = DeltaDataset(_Dataset(array, dates, missing={5}), 2)
+
+    assert ds.runs(0, 12) == [
+        (0, 1, False),
+        (1, 2, False),
+        (2, 5, True),
+        (5, 6, False),
+        (6, 7, False),
+        (7, 8, False),
+        (8, 12, True),
+    ]
+    assert ds.runs(3, 4) == [(3, 4, True)]
+
+    # Each date is read once for a whole run
+    for a, b, readable in ds.runs(0, 12):
+        if readable:
+            assert np.array_equal(ds.read(a, b), np.concatenate([ds[i] for i in range(a, b)]))
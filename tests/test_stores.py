@@ -0,0 +1,199 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import asyncio
+import functools
+import http.server
+import json
+import os
+import threading
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets import open_dataset
+from anemoi.datasets.data import stores
+
+
+@pytest.fixture
+def locations(tmp_path, monkeypatch):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+
+    zarr.open(str(second / "foo.zarr"), mode="w").attrs["version"] = 1
+
+    config = {"datasets": {"named": {}, "path": [str(first), str(second)]}}
+    monkeypatch.setattr(stores, "load_config", lambda: config)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    return first, second
+
+
+def test_zarr_lookup(locations):
+    first, second = locations
+
+    assert stores.zarr_lookup("foo") == str(second) + "/foo.zarr"
+    assert stores.zarr_lookup("bar", fail=False) is None
+
+    with pytest.raises(ValueError):
+        stores.zarr_lookup("bar")
+
+    # Local locations are not cached, a new dataset is found at once
+    zarr.open(str(first / "bar.zarr"), mode="w")
+    assert stores.zarr_lookup("bar") == str(first) + "/bar.zarr"
+    assert not os.path.exists(stores._lookup_cache_path())
+
+    # A directory that is not a zarr is not a dataset
+    (first / "baz.zarr").mkdir()
+    assert stores.zarr_lookup("baz", fail=False) is None
+
+
+def test_zarr_lookup_uses_cache(locations, monkeypatch):
+    config = stores.load_config()
+    config["datasets"]["path"] = ["http://first", "http://second"]
+
+    probed = []
+    datasets = {"http://second/foo.zarr"}
+
+    def exists(path):
+        probed.append(path)
+        return path in datasets
+
+    monkeypatch.setattr(stores, "_zarr_exists", exists)
+
+    assert stores.zarr_lookup("foo") == "http://second/foo.zarr"
+    assert stores.zarr_lookup("bar", fail=False) is None
+    with open(stores._lookup_cache_path()) as f:
+        cache = json.load(f)
+    assert cache["http://first/foo.zarr"]["exists"] is False
+    assert cache["http://second/foo.zarr"]["exists"] is True
+
+    # Remote results are remembered until they expire
+    probed.clear()
+    datasets.add("http://first/bar.zarr")
+    assert stores.zarr_lookup("bar", fail=False) is None
+    assert probed == []
+
+    monkeypatch.setattr(stores, "LOOKUP_CACHE_EXPIRES", {True: 3600, False: 0})
+    assert stores.zarr_lookup("bar") == "http://first/bar.zarr"
+
+
+def test_zarr_lookup_moved(locations):
+    first, second = locations
+    assert open_dataset("foo").path == str(second) + "/foo.zarr"
+
+    # A dataset that cannot be opened where it was found is looked up again
+    os.rename(second / "foo.zarr", first / "foo.zarr")
+    assert open_dataset("foo").path == str(first) + "/foo.zarr"
+
+    with pytest.raises(ValueError):
+        open_dataset("bar")
+
+
+def test_open_zarr_pool(locations):
+    _, second = locations
+    path = str(second / "foo.zarr")
+
+    z = stores.open_zarr(path)
+    assert stores.open_zarr(os.path.join(str(second), ".", "foo.zarr")) is z
+    assert z.attrs["version"] == 1
+
+    # Rewritten datasets are reopened
+    zarr.open(path, mode="r+").attrs["version"] = 2
+    z = stores.open_zarr(path)
+    assert z.attrs["version"] == 2
+    assert stores.open_zarr(path) is z
+
+    # The pool is not inherited by forked children
+    stores._clear_pool()
+    assert stores.open_zarr(path) is not z
+
+
+@pytest.fixture
+def http_dataset(tmp_path):
+    root = zarr.open(str(tmp_path / "test.zarr"), mode="w")
+    data = np.arange(20 * 2 * 1 * 10, dtype="float32").reshape(20, 2, 1, 10)
+    root.create_dataset("data", data=data, chunks=(2, 2, 1, 10))
+    root.create_dataset("dates", data=np.arange("2021-01-01T00", "2021-01-06T00", 6, dtype="datetime64[h]"))
+    root.create_dataset("latitudes", data=np.linspace(-45, 45, 10))
+    root.create_dataset("longitudes", data=np.linspace(0, 90, 10))
+    root.attrs["frequency"] = "6h"
+    root.attrs["variables"] = ["a", "b"]
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}/test.zarr", data
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_store_getitems(http_dataset):
+    url, data = http_dataset
+    store = stores.name_to_zarr_store(url)
+    assert isinstance(store, stores.HTTPStore)
+
+    keys = ["data/0.0.0.0", "data/1.0.0.0", "data/99.0.0.0"]
+    chunks = store.getitems(keys, contexts={})
+    assert sorted(chunks) == keys[:2]
+
+
+def test_async_reads(http_dataset, monkeypatch):
+    url, data = http_dataset
+    ds = open_dataset(url)
+
+    fetched = []
+    getitems = stores.RemoteStore.getitems
+
+    def spy(self, keys, *, contexts):
+        keys = list(keys)
+        fetched.append(len(keys))
+        return getitems(self, keys, contexts=contexts)
+
+    monkeypatch.setattr(stores.RemoteStore, "getitems", spy)
+
+    async def read():
+        first = await ds.aget(slice(3, 17))
+        batches = [batch async for batch in ds.aiter([[0, 1], [2, 3], [4, 5], 6], prefetch=2)]
+        return first, batches
+
+    first, batches = asyncio.run(read())
+
+    assert (first == data[3:17]).all()
+    assert (batches[0] == data[[0, 1]]).all()
+    assert (batches[2] == data[[4, 5]]).all()
+    assert (batches[3] == data[6]).all()
+
+    # The chunks of a read are fetched together
+    assert fetched and max(fetched) > 1
+
+
+def test_async_reads_local(http_dataset, tmp_path):
+    _, data = http_dataset
+    ds = open_dataset(str(tmp_path / "test.zarr"))
+
+    async def read():
+        return [batch async for batch in ds.aiter([slice(0, 5), [7, 9]])]
+
+    batches = asyncio.run(read())
+    assert (batches[0] == data[0:5]).all()
+    assert (batches[1] == data[[7, 9]]).all()
+
+
+def test_no_partial_statistics(http_dataset, tmp_path):
+    ds = open_dataset(str(tmp_path / "test.zarr"))
+    with pytest.raises(NotImplementedError):
+        ds.partial_statistics()
@@ -0,0 +1,52 @@
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+import numpy as np
+import pytest
+import zarr
+
+from anemoi.datasets.create.writer import ViewCacheArray
+from anemoi.datasets.create.writer import chunk_aligned_blocks
+from anemoi.datasets.create.writer import contiguous_runs
+
+
+def test_contiguous_runs():
+    assert contiguous_runs([]) == []
+    assert contiguous_runs([3]) == [(0, 3, 4)]
+    assert contiguous_runs([0, 1, 2, 5, 6, 9]) == [(0, 0, 3), (3, 5, 7), (5, 9, 10)]
+
+
+def test_chunk_aligned_blocks():
+    assert chunk_aligned_blocks(3, 17, 5) == [(3, 5, False), (5, 10, True), (10, 15, True), (15, 17, False)]
+    assert chunk_aligned_blocks(5, 10, 5) == [(5, 10, True)]
+    assert chunk_aligned_blocks(1, 3, 5) == [(1, 3, False)]
+    assert chunk_aligned_blocks(0, 7, 1) == [(i, i + 1, True) for i in range(7)]
+
+
+@pytest.mark.parametrize("threads", [1, 4])
+@pytest.mark.parametrize(
+    "indexes",
+    [
+        list(range(20)),
+        list(range(3, 17)),
+        [0, 1, 2, 5, 6, 7, 8, 9, 10, 11, 19],
+        [13],
+    ],
+)
+def test_view_cache_array(indexes, threads):
+    array = zarr.zeros((20, 2, 3), chunks=(5, 2, 3), dtype="float32")
+    view = ViewCacheArray(array, shape=(len(indexes), 2, 3), indexes=np.array(indexes), threads=threads)
+
+    expected = np.zeros((20, 2, 3), dtype="float32")
+    for i, index in enumerate(indexes):
+        view[i] = index + 1
+        expected[index] = index + 1
+
+    view.flush()
+    assert (array[:] == expected).all()
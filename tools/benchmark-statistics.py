@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# (C) Copyright 2024 Anemoi contributors.
+#
+# This software is licensed under the terms of the Apache Licence Version 2.0
+# which can be obtained at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# In applying this licence, ECMWF does not waive the privileges and immunities
+# granted to it by virtue of its status as an intergovernmental organisation
+# nor does it submit to any jurisdiction.
+
+"""Compare the statistics computed when loading a group of dates with the previous implementation,
+which checked each field, then each variable of each date, with separate NaN-aware numpy passes.
+"""
+
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from anemoi.datasets.create.check import check_data_values
+from anemoi.datasets.create.statistics import compute_statistics
+
+
+def previous(array, names, allow_nans):
+    nvars = array.shape[1]
+    stats_shape = (array.shape[0], nvars)
+
+    # Checks done by Load.load_cube, one field at a time
+    for index in np.ndindex(array.shape[:3]):
+        check_data_values(array[index], name=names[index[1]], allow_nans=allow_nans)
+
+    count = np.zeros(stats_shape, dtype=np.int64)
+    sums = np.zeros(stats_shape, dtype=np.float64)
+    squares = np.zeros(stats_shape, dtype=np.float64)
+    minimum = np.zeros(stats_shape, dtype=np.float64)
+    maximum = np.zeros(stats_shape, dtype=np.float64)
+    has_nans = np.zeros(stats_shape, dtype=np.bool_)
+
+    for i, chunk in enumerate(array):
+        values = chunk.reshape((nvars, -1))
+        for j, name in enumerate(names):
+            check_data_values(values[j, :], name=name, allow_nans=allow_nans)
+        minimum[i] = np.nanmin(values, axis=1)
+        maximum[i] = np.nanmax(values, axis=1)
+        sums[i] = np.nansum(values, axis=1)
+        squares[i] = np.nansum(values * values, axis=1)
+        count[i] = np.sum(~np.isnan(values), axis=1)
+        has_nans[i] = np.isnan(values).any()
+
+    return dict(minimum=minimum, maximum=maximum, sums=sums, squares=squares, count=count, has_nans=has_nans)
+
+
+def timeit(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+parser = argparse.ArgumentParser(description="Benchmark the statistics computed when loading a dataset")
+parser.add_argument("--dates", type=int, default=31 * 4, help="Number of dates in the group")
+parser.add_argument("--variables", type=int, default=50, help="Number of variables")
+parser.add_argument("--members", type=int, default=1, help="Number of ensemble members")
+parser.add_argument("--points", type=int, default=40320, help="Number of grid points")
+parser.add_argument("--nans", type=float, default=0.0, help="Fraction of NaNs in the variables that allow them")
+parser.add_argument("--threads", type=int, nargs="+", default=[1, 4], help="Number of threads")
+parser.add_argument("--repeat", type=int, default=3, help="Number of runs, the best is reported")
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+array = rng.normal(size=(args.dates, args.variables, args.members, args.points)).astype(np.float32)
+names = [f"var_{i}" for i in range(args.variables)]
+allow_nans = names[: max(1, args.variables // 10)]
+if args.nans:
+    nans = rng.random(size=array[:, : len(allow_nans)].shape) < args.nans
+    array[:, : len(allow_nans)][nans] = np.nan
+
+print(f"Array of shape {array.shape}, {array.nbytes / 1024 / 1024:.1f} MiB")
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+
+    reference, expected = timeit(lambda: previous(array, names, allow_nans), args.repeat)
+    print(f"{'previous':>12}: {reference:8.3f}s")
+
+    for threads in args.threads:
+        elapsed, result = timeit(
+            lambda: compute_statistics(array, names, allow_nans=allow_nans, threads=threads, check_fields=True),
+            args.repeat,
+        )
+        for k, v in expected.items():
+            assert np.array_equal(result[k], v, equal_nan=True), k
+        print(f"{f'{threads} threads':>12}: {elapsed:8.3f}s, x{reference / elapsed:.1f}")